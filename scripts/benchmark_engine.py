@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Rule Engine Benchmark
+
+Compare the per-rule cost of the condition evaluation modes on synthetic
+rulesets of 1k and 10k rules, with each rule evaluated on its own, with
+predicates shared across the ruleset, and over a columnar batch of contexts.
+
+Usage:
+    python scripts/benchmark_engine.py [--rules 1000 10000] [--rounds 5]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from rule_manager.core.batch import BatchEvaluator, ColumnarContexts
+from rule_manager.core.compiler import ConditionCompiler
+from rule_manager.core.dsl import DSLEvaluator
+from rule_manager.core.ruleset import CompiledRuleset
+from rule_manager.models.base import Rule, RuleAction, RuleContext, RuleScope
+
+ATOMS = [
+    "environment == 'production'",
+    "environment == 'development'",
+    "user_role == 'admin'",
+    "user_role != 'guest'",
+    "prompt_length > {n}",
+    "prompt_length <= {n}",
+    "model_name in ['gpt-4', 'gpt-4o', 'claude-3-opus']",
+    "model_name not in ['gpt-3.5-turbo']",
+    "project_id == 'project_{n}'",
+    "user_id startswith 'team_{n}'",
+    "custom_attributes.request_count > {n}",
+    "user_id matches 'user_\\d+'",
+]
+
+
+def generate_conditions(rng: random.Random, count: int):
+    """Generate `count` rule conditions dicts mixing DSL and nested forms."""
+    rules = []
+    for _ in range(count):
+        atoms = [
+            rng.choice(ATOMS).format(n=rng.randrange(0, 5000, 100))
+            for _ in range(rng.randint(1, 4))
+        ]
+        conditions = {f"c{i}": atom for i, atom in enumerate(atoms[:-1])}
+        if rng.random() < 0.3:
+            conditions["nested"] = {"or": [atoms[-1], {"not": rng.choice(ATOMS[:4])}]}
+        else:
+            conditions[f"c{len(atoms)}"] = atoms[-1]
+        rules.append(conditions)
+    return rules
+
+
+def make_contexts(rng: random.Random, count: int):
+    return [
+        RuleContext(
+            user_id=f"user_{rng.randrange(1000)}",
+            project_id=f"project_{rng.randrange(0, 5000, 100)}",
+            model_name=rng.choice(["gpt-4", "gpt-3.5-turbo", "claude-3-opus"]),
+            prompt_length=rng.randrange(5000),
+            custom_attributes={
+                "environment": rng.choice(["production", "development"]),
+                "user_role": rng.choice(["admin", "guest", "member"]),
+                "request_count": rng.randrange(5000),
+            },
+        )
+        for _ in range(count)
+    ]
+
+
+def build_ruleset(mode: str, rules) -> CompiledRuleset:
+    compiler = ConditionCompiler(DSLEvaluator(), mode=mode, cache_size=len(rules))
+    return CompiledRuleset(
+        [
+            Rule(
+                name=f"rule_{i}",
+                scope=RuleScope.GLOBAL,
+                action=RuleAction.ALLOW,
+                conditions=conditions,
+            )
+            for i, conditions in enumerate(rules)
+        ],
+        compiler,
+    )
+
+
+def run_mode(mode: str, rules, contexts, rounds: int, shared: bool) -> float:
+    """Return the best observed cost per rule evaluation in nanoseconds."""
+    ruleset = build_ruleset(mode, rules)
+
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        for context in contexts:
+            memo = ruleset.new_memo()
+            for compiled in ruleset.rules:
+                try:
+                    if shared:
+                        compiled.matches(context, memo)
+                    else:
+                        compiled.conditions.evaluate(context)
+                except Exception:
+                    pass
+        elapsed = time.perf_counter_ns() - start
+        best = min(best, elapsed / (len(rules) * len(contexts)))
+    return best
+
+
+def run_batch(rules, contexts, rounds: int) -> float:
+    """Return the best observed batch cost per rule and context in nanoseconds."""
+    ruleset = build_ruleset("interpreter", rules)
+    batch = ColumnarContexts.from_contexts(contexts)
+
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        BatchEvaluator(ruleset).evaluate(batch)
+        elapsed = time.perf_counter_ns() - start
+        best = min(best, elapsed / (len(rules) * len(contexts)))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rules", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--contexts", type=int, default=20)
+    parser.add_argument("--batch-contexts", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    contexts = make_contexts(rng, args.contexts)
+    batch_contexts = make_contexts(rng, args.batch_contexts)
+
+    print(
+        f"{'rules':>8} {'predicates':>10} {'interpreter ns':>15} "
+        f"{'codegen ns':>11} {'shared ns':>10} {'batch ns':>9} {'speedup':>8}"
+    )
+    for count in args.rules:
+        rules = generate_conditions(rng, count)
+        interpreted = run_mode("interpreter", rules, contexts, args.rounds, False)
+        generated = run_mode("codegen", rules, contexts, args.rounds, False)
+        shared = run_mode("codegen", rules, contexts, args.rounds, True)
+        batched = run_batch(rules, batch_contexts, args.rounds)
+        predicates = build_ruleset("interpreter", rules).stats()["distinct_predicates"]
+        print(
+            f"{count:>8} {predicates:>10} {interpreted:>15.0f} {generated:>11.0f} "
+            f"{shared:>10.0f} {batched:>9.1f} {interpreted / batched:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
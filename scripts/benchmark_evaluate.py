@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Evaluation Dispatch Benchmark
+
+Measure the cost of the rule loop with one awaited coroutine per rule (how
+rules used to be evaluated) and with direct calls, and the per-request cost
+of RuleEngine evaluation through the synchronous core, at each verbosity,
+and through the async API.
+
+Usage:
+    python scripts/benchmark_evaluate.py [--rules 100 1000] [--requests 200]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from benchmark_engine import generate_conditions, make_contexts
+
+from rule_manager.core.engine import RuleEngine
+from rule_manager.models.base import Rule, RuleAction, RuleScope, RuleSet
+from rule_manager.storage.yaml_store import YAMLRuleStore
+
+
+async def build_engine(rules_dir: str, conditions) -> RuleEngine:
+    store = YAMLRuleStore(rules_dir)
+    rules = [
+        Rule(
+            name=f"rule_{i}",
+            scope=RuleScope.GLOBAL,
+            action=RuleAction.ALLOW,
+            conditions=rule_conditions,
+        )
+        for i, rule_conditions in enumerate(conditions)
+    ]
+    await store.save_rules(RuleSet(scope=RuleScope.GLOBAL, rules=rules))
+    # Without the index every rule is evaluated on every request
+    return RuleEngine(store, enable_rule_index=False, max_evaluation_time_ms=0)
+
+
+def evaluate_rule(compiled_rule, context, memo):
+    try:
+        return compiled_rule.matches(context, memo)
+    except Exception as e:
+        return str(e)
+
+
+async def per_rule_coroutines(engine: RuleEngine, snapshot, context) -> None:
+    async def evaluate_rule_async(compiled_rule, memo):
+        return evaluate_rule(compiled_rule, context, memo)
+
+    memo = snapshot.ruleset.new_memo()
+    for compiled_rule in snapshot.ruleset.rules:
+        await evaluate_rule_async(compiled_rule, memo)
+
+
+def direct_calls(engine: RuleEngine, snapshot, context) -> None:
+    memo = snapshot.ruleset.new_memo()
+    for compiled_rule in snapshot.ruleset.rules:
+        evaluate_rule(compiled_rule, context, memo)
+
+
+async def measure(engine: RuleEngine, contexts, rounds: int):
+    """Return the best per-request cost in microseconds for each path."""
+    snapshot = await engine.get_snapshot()
+    paths = ["coroutines", "direct", "full", "matched", "decision", "async"]
+    best = dict.fromkeys(paths, float("inf"))
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        for context in contexts:
+            await per_rule_coroutines(engine, snapshot, context)
+        elapsed = time.perf_counter_ns() - start
+        best["coroutines"] = min(best["coroutines"], elapsed / len(contexts) / 1000)
+
+        start = time.perf_counter_ns()
+        for context in contexts:
+            direct_calls(engine, snapshot, context)
+        elapsed = time.perf_counter_ns() - start
+        best["direct"] = min(best["direct"], elapsed / len(contexts) / 1000)
+
+        for verbosity in ("full", "matched", "decision"):
+            start = time.perf_counter_ns()
+            for context in contexts:
+                engine.evaluate_snapshot(snapshot, context, verbosity=verbosity)
+            elapsed = time.perf_counter_ns() - start
+            best[verbosity] = min(best[verbosity], elapsed / len(contexts) / 1000)
+
+        start = time.perf_counter_ns()
+        for context in contexts:
+            await engine.evaluate_rules(context)
+        elapsed = time.perf_counter_ns() - start
+        best["async"] = min(best["async"], elapsed / len(contexts) / 1000)
+    return best
+
+
+async def run(args) -> None:
+    rng = random.Random(args.seed)
+    contexts = make_contexts(rng, args.requests)
+
+    print(
+        f"{'rules':>8} {'coroutine loop us':>18} {'direct loop us':>15} "
+        f"{'overhead ns/rule':>17} {'full us':>9} {'matched us':>11} "
+        f"{'decision us':>12} {'async API us':>13}"
+    )
+    for count in args.rules:
+        with tempfile.TemporaryDirectory() as rules_dir:
+            engine = await build_engine(rules_dir, generate_conditions(rng, count))
+            best = await measure(engine, contexts, args.rounds)
+        overhead = (best["coroutines"] - best["direct"]) * 1000 / count
+        print(
+            f"{count:>8} {best['coroutines']:>18.1f} {best['direct']:>15.1f} "
+            f"{overhead:>17.0f} {best['full']:>9.1f} {best['matched']:>11.1f} "
+            f"{best['decision']:>12.1f} {best['async']:>13.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rules", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from ..models.errors import EvaluationOverloadedError, EvaluationTimeoutError
+
+
+class Deadline:
+    """
+    The time budget of one evaluation request, checked cooperatively by
+    the evaluation loops.
+    """
+
+    __slots__ = ("budget_ms", "expires_at")
+
+    def __init__(self, budget_ms: int, remaining_ms: Optional[float] = None):
+        self.budget_ms = budget_ms
+        if remaining_ms is None:
+            remaining_ms = budget_ms
+        self.expires_at = time.monotonic() + remaining_ms / 1000
+
+    def remaining(self) -> float:
+        """Seconds left in the budget, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def extend(self, seconds: float) -> None:
+        """Leave `seconds` spent on work outside the budget unaccounted."""
+        self.expires_at += seconds
+
+    def check(self) -> None:
+        if time.monotonic() >= self.expires_at:
+            raise EvaluationTimeoutError(self.budget_ms)
+
+
+class AdmissionController:
+    """
+    Limits concurrent evaluations to `max_concurrent`, with at most
+    `max_queued` requests waiting for a slot. Requests beyond that are
+    rejected immediately with a retryable error, and time spent waiting
+    counts against each request's `timeout_ms` budget.
+
+    A `max_concurrent` of 0 disables the limit, a `timeout_ms` of 0 the
+    deadline.
+    """
+
+    def __init__(
+        self, max_concurrent: int = 100, max_queued: int = 1000, timeout_ms: int = 1000
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.timeout_ms = timeout_ms
+        self._semaphore = (
+            asyncio.Semaphore(max_concurrent) if max_concurrent > 0 else None
+        )
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[Optional[Deadline]]:
+        """
+        Hold an evaluation slot for the duration of the block. Yields the
+        request's deadline, or None without a time budget.
+        """
+        deadline = Deadline(self.timeout_ms) if self.timeout_ms > 0 else None
+        await self._acquire(deadline)
+        self.active += 1
+        self.admitted += 1
+        try:
+            yield deadline
+        except EvaluationTimeoutError:
+            self.timed_out += 1
+            raise
+        finally:
+            self.active -= 1
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    async def _acquire(self, deadline: Optional[Deadline]) -> None:
+        semaphore = self._semaphore
+        if semaphore is None:
+            return
+
+        if not semaphore.locked():
+            await semaphore.acquire()
+            return
+
+        if self.queued >= self.max_queued:
+            self.rejected += 1
+            raise EvaluationOverloadedError(
+                f"{self.active} evaluations running and {self.queued} queued"
+            )
+
+        self.queued += 1
+        try:
+            await asyncio.wait_for(
+                semaphore.acquire(), deadline.remaining() if deadline else None
+            )
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise EvaluationTimeoutError(deadline.budget_ms)
+        finally:
+            self.queued -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "timeout_ms": self.timeout_ms,
+            "active": self.active,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
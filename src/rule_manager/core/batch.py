@@ -0,0 +1,452 @@
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .admission import Deadline
+from .compiler import node_key
+from .dsl import (
+    And,
+    Comparison,
+    ListExpr,
+    Literal,
+    Membership,
+    Node,
+    Not,
+    Or,
+    RegexMatch,
+    Variable,
+    compile_accessor,
+)
+from .ruleset import CompiledRule, CompiledRuleset
+from ..models.base import RuleAction, RuleContext
+
+try:
+    # Optional: vectorized comparisons over numeric and string columns
+    import numpy as _np
+except ImportError:
+    _np = None
+
+_NUMPY_COMPARE = {"==", "!=", "<", "<=", ">", ">="}
+
+# A mask is a Python int used as a bitset: bit i is row i
+Mask = int
+
+
+class _Error:
+    """Marks a value whose evaluation raised for that row."""
+
+    __slots__ = ()
+
+
+_ERROR = _Error()
+
+
+class ColumnarContexts:
+    """
+    A batch of rule contexts stored as columns.
+
+    Columns are keyed by variable name as written in rule conditions
+    (`model_name`, `environment`, `custom_attributes.environment`, ...)
+    and may be lists or NumPy arrays. Missing columns read as None, like
+    missing context values. A batch built from contexts keeps them, and
+    reads variables that are not plain columns (nested paths such as
+    `custom_attributes.org.tier`, model methods) through the same
+    accessors as per-context evaluation.
+    """
+
+    def __init__(
+        self,
+        columns: Mapping[str, Sequence[Any]],
+        size: Optional[int] = None,
+        contexts: Optional[Sequence[RuleContext]] = None,
+    ):
+        lengths = {len(column) for column in columns.values()}
+        if size is not None:
+            lengths.add(size)
+        if contexts is not None:
+            lengths.add(len(contexts))
+        if len(lengths) > 1:
+            raise ValueError(
+                f"All columns must have the same length, got {sorted(lengths)}"
+            )
+        self.columns = dict(columns)
+        self.size = lengths.pop() if lengths else 0
+        self.contexts = contexts
+
+    @classmethod
+    def from_contexts(cls, contexts: Sequence[RuleContext]) -> "ColumnarContexts":
+        """
+        Transpose a list of contexts into columns.
+        """
+        fields = [
+            name for name in RuleContext.model_fields if name != "custom_attributes"
+        ]
+        columns: Dict[str, List[Any]] = {
+            name: [getattr(context, name) for context in contexts] for name in fields
+        }
+        keys = {key for context in contexts for key in context.custom_attributes}
+        for key in keys - set(fields):
+            columns[key] = [context.custom_attributes.get(key) for context in contexts]
+        return cls(columns, size=len(contexts), contexts=list(contexts))
+
+    def column(self, name: str) -> Sequence[Any]:
+        column = self.columns.get(name)
+        if column is not None:
+            return column
+        if self.contexts is not None:
+            column = self.columns[name] = self._access(name)
+            return column
+        if name.startswith("custom_attributes."):
+            column = self.columns.get(name[len("custom_attributes.") :])
+        if column is None:
+            return [None] * self.size
+        return column
+
+    def _access(self, name: str) -> List[Any]:
+        _, accessor = compile_accessor(name)
+        values: List[Any] = []
+        for context in self.contexts or ():
+            try:
+                values.append(accessor(context))
+            except Exception:
+                values.append(_ERROR)
+        return values
+
+    def take(self, rows: Sequence[int]) -> "ColumnarContexts":
+        """
+        Return a batch of the given rows, in the given order.
+        """
+        columns: Dict[str, Sequence[Any]] = {}
+        for name, column in self.columns.items():
+            if _np is not None and isinstance(column, _np.ndarray):
+                columns[name] = column[list(rows)]
+            else:
+                columns[name] = [column[row] for row in rows]
+        contexts = None
+        if self.contexts is not None:
+            contexts = [self.contexts[row] for row in rows]
+        return ColumnarContexts(columns, size=len(rows), contexts=contexts)
+
+
+class BatchEvaluationResult:
+    """
+    Rule match masks and final actions for a batch of contexts.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        rule_names: List[str],
+        matches: List[Mask],
+        errors: List[Mask],
+        final_actions: List[RuleAction],
+    ):
+        self.size = size
+        self.rule_names = rule_names
+        self.matches = dict(zip(rule_names, matches))
+        self.errors = dict(zip(rule_names, errors))
+        self.final_actions = final_actions
+
+    @classmethod
+    def merge(
+        cls, size: int, parts: Sequence[Tuple[Sequence[int], "BatchEvaluationResult"]]
+    ) -> "BatchEvaluationResult":
+        """
+        Combine the results of evaluating disjoint subsets of a batch, each
+        given with the rows of the batch it holds, possibly against
+        different rulesets. A rule missing from a part never matches its
+        rows; rule names keep the priority order of every part.
+        """
+        rule_names: List[str] = []
+        for _, part in parts:
+            position = 0
+            for name in part.rule_names:
+                if name in rule_names:
+                    position = rule_names.index(name) + 1
+                else:
+                    rule_names.insert(position, name)
+                    position += 1
+
+        matches = dict.fromkeys(rule_names, 0)
+        errors = dict.fromkeys(rule_names, 0)
+        final_actions = [RuleAction.ALLOW] * size
+        for rows, part in parts:
+            for name in part.rule_names:
+                matches[name] |= _scatter(part.matches[name], rows)
+                errors[name] |= _scatter(part.errors[name], rows)
+            for row, action in zip(rows, part.final_actions):
+                final_actions[row] = action
+
+        return cls(
+            size,
+            rule_names,
+            [matches[name] for name in rule_names],
+            [errors[name] for name in rule_names],
+            final_actions,
+        )
+
+    def matched(self, rule_name: str) -> List[bool]:
+        """Return, per context, whether a rule matched."""
+        return _to_bools(self.matches[rule_name], self.size)
+
+    def match_count(self, rule_name: str) -> int:
+        return bin(self.matches[rule_name]).count("1")
+
+    def matched_rules(self, row: int) -> List[str]:
+        """Return the names of the rules that matched one context."""
+        bit = 1 << row
+        return [name for name in self.rule_names if self.matches[name] & bit]
+
+
+class BatchEvaluator:
+    """
+    Evaluates a compiled ruleset against a batch of columnar contexts.
+
+    Each distinct predicate is computed once over the whole batch into a
+    bitset of matching rows (and one of rows where it raised). Rule
+    conditions combine those masks with the same short-circuit semantics as
+    per-context evaluation, and the final action of each context comes from
+    the first matching rule in priority order.
+    """
+
+    def __init__(self, ruleset: CompiledRuleset):
+        self.ruleset = ruleset
+
+    def evaluate(
+        self, batch: ColumnarContexts, deadline: Optional[Deadline] = None
+    ) -> BatchEvaluationResult:
+        full = (1 << batch.size) - 1
+        atoms: Dict[int, Tuple[Mask, Mask]] = {}
+        matches: List[Mask] = []
+        errors: List[Mask] = []
+
+        for compiled_rule in self.ruleset.rules:
+            if deadline is not None:
+                deadline.check()
+            matched, failed = self._evaluate_rule(compiled_rule, batch, atoms, full)
+            matches.append(matched & ~failed)
+            errors.append(failed)
+
+        final_actions = [RuleAction.ALLOW] * batch.size
+        remaining = full
+        for compiled_rule, matched in zip(self.ruleset.rules, matches):
+            hit = matched & remaining
+            if not hit:
+                continue
+            action = compiled_rule.rule.action
+            for row in _rows(hit):
+                final_actions[row] = action
+            remaining &= ~hit
+            if not remaining:
+                break
+
+        return BatchEvaluationResult(
+            batch.size,
+            [compiled_rule.rule.name for compiled_rule in self.ruleset.rules],
+            matches,
+            errors,
+            final_actions,
+        )
+
+    def _evaluate_rule(
+        self,
+        compiled_rule: CompiledRule,
+        batch: ColumnarContexts,
+        atoms: Dict[int, Tuple[Mask, Mask]],
+        full: Mask,
+    ) -> Tuple[Mask, Mask]:
+        conditions = compiled_rule.conditions
+        if conditions is None:
+            return full, 0
+        if conditions.root is None:
+            # Conditions failed to compile: every context reports an error
+            return 0, full
+
+        slots = dict(zip(conditions.atom_keys, compiled_rule.slots))
+        atom_nodes = dict(zip(conditions.atom_keys, conditions.atoms))
+
+        def atom(node: Node) -> Tuple[Mask, Mask]:
+            key = node_key(node)
+            slot = slots[key]
+            masks = atoms.get(slot)
+            if masks is None:
+                masks = atoms[slot] = _to_masks(_values(atom_nodes[key], batch))
+            return masks
+
+        return _combine(conditions.root, atom, full)
+
+
+def _combine(node: Node, atom: Any, full: Mask) -> Tuple[Mask, Mask]:
+    """
+    Combine predicate masks through the logical structure of a tree.
+    Returns the (true, error) masks; operands are only charged with errors
+    on rows where they would have been evaluated.
+    """
+    if isinstance(node, (And, Or)):
+        is_and = isinstance(node, And)
+        value = full if is_and else 0
+        failed = 0
+        for operand in node.operands:
+            # Rows not yet decided by an earlier operand
+            active = (value if is_and else ~value & full) & ~failed
+            if not active:
+                break
+            operand_value, operand_failed = _combine(operand, atom, full)
+            failed |= active & operand_failed
+            if is_and:
+                value &= operand_value | ~active
+            else:
+                value |= active & operand_value
+        return value & ~failed, failed
+
+    if isinstance(node, Not):
+        value, failed = _combine(node.operand, atom, full)
+        return ~value & full & ~failed, failed
+
+    if isinstance(node, Literal):
+        return (full if node.value else 0), 0
+
+    return atom(node)
+
+
+def _values(node: Node, batch: ColumnarContexts) -> Sequence[Any]:
+    """
+    Evaluate a value expression over every row, with `_ERROR` in place of
+    values that raised.
+    """
+    size = batch.size
+
+    if isinstance(node, Literal):
+        return [node.value] * size
+
+    if isinstance(node, Variable):
+        return batch.column(node.name)
+
+    if isinstance(node, ListExpr):
+        if not node.items:
+            return [[] for _ in range(size)]
+        columns = [_values(item, batch) for item in node.items]
+        return [
+            _ERROR if any(value is _ERROR for value in row) else list(row)
+            for row in zip(*columns)
+        ]
+
+    if isinstance(node, Comparison):
+        vectorized = _numpy_compare(node, batch)
+        if vectorized is not None:
+            return vectorized
+        function = node.function
+        left = _values(node.left, batch)
+        if isinstance(node.right, Literal):
+            literal = node.right.value
+            return [_apply(function, value, literal) for value in left]
+        right = _values(node.right, batch)
+        return [_apply(function, a, b) for a, b in zip(left, right)]
+
+    if isinstance(node, RegexMatch):
+        match = node.patterns.match
+        left = _values(node.left, batch)
+        return [_apply(match, node.compiled, value) for value in left]
+
+    if isinstance(node, Membership):
+        contains = node.contains
+        return [
+            _ERROR if value is _ERROR else contains(value)
+            for value in _values(node.left, batch)
+        ]
+
+    if isinstance(node, Not):
+        return [
+            value if value is _ERROR else not value
+            for value in _values(node.operand, batch)
+        ]
+
+    if isinstance(node, (And, Or)):
+        # A logical operator nested inside a comparison operand
+        columns = [_values(operand, batch) for operand in node.operands]
+        short_circuit = isinstance(node, Or)
+        results: List[Any] = []
+        for row in zip(*columns) if columns else ((),) * size:
+            result: Any = not short_circuit
+            for value in row:
+                if value is _ERROR:
+                    result = _ERROR
+                    break
+                if bool(value) is short_circuit:
+                    result = short_circuit
+                    break
+            results.append(result)
+        return results
+
+    raise ValueError(f"Unsupported expression node: {type(node).__name__}")
+
+
+def _apply(function: Any, left: Any, right: Any) -> Any:
+    if left is _ERROR or right is _ERROR:
+        return _ERROR
+    try:
+        return function(left, right)
+    except Exception:
+        return _ERROR
+
+
+def _numpy_compare(node: Comparison, batch: ColumnarContexts) -> Optional[Any]:
+    """
+    Compare a NumPy column with a constant in one vectorized operation,
+    when the column's dtype guarantees Python semantics.
+    """
+    if _np is None or node.operator not in _NUMPY_COMPARE:
+        return None
+    if not isinstance(node.left, Variable) or not isinstance(node.right, Literal):
+        return None
+
+    column = batch.column(node.left.name)
+    literal = node.right.value
+    if not isinstance(column, _np.ndarray) or isinstance(literal, bool):
+        return None
+    if column.dtype.kind in "iuf" and isinstance(literal, (int, float)):
+        pass
+    elif column.dtype.kind == "U" and isinstance(literal, str):
+        pass
+    else:
+        return None
+
+    if node.operator == "==":
+        return column == literal
+    if node.operator == "!=":
+        return column != literal
+    if node.operator == "<":
+        return column < literal
+    if node.operator == "<=":
+        return column <= literal
+    if node.operator == ">":
+        return column > literal
+    return column >= literal
+
+
+def _to_masks(values: Sequence[Any]) -> Tuple[Mask, Mask]:
+    if _np is not None and isinstance(values, _np.ndarray) and values.dtype == bool:
+        packed = _np.packbits(values, bitorder="little").tobytes()
+        return int.from_bytes(packed, "little"), 0
+
+    true_bits = "".join(
+        "1" if value is not _ERROR and value else "0" for value in reversed(values)
+    )
+    error_bits = "".join("1" if value is _ERROR else "0" for value in reversed(values))
+    return int(true_bits or "0", 2), int(error_bits or "0", 2)
+
+
+def _rows(mask: Mask) -> Iterator[int]:
+    bits = bin(mask)[:1:-1]
+    return (row for row, bit in enumerate(bits) if bit == "1")
+
+
+def _scatter(mask: Mask, rows: Sequence[int]) -> Mask:
+    """Map bit i of a mask over a subset of a batch to bit rows[i]."""
+    scattered = 0
+    for row in _rows(mask):
+        scattered |= 1 << rows[row]
+    return scattered
+
+
+def _to_bools(mask: Mask, size: int) -> List[bool]:
+    bits = bin(mask)[:1:-1].ljust(size, "0")
+    return [bit == "1" for bit in bits[:size]]
@@ -0,0 +1,532 @@
+import ast
+import json
+import time
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .dsl import (
+    And,
+    Comparison,
+    DSLEvaluator,
+    ListExpr,
+    Literal,
+    Membership,
+    Node,
+    Not,
+    Or,
+    RegexMatch,
+    Variable,
+)
+from ..models.base import RuleContext
+from ..models.errors import RuleDSLSyntaxError
+from ..utils.cache import LRUCache
+
+EVALUATION_MODES = ("interpreter", "codegen")
+
+_COMPARE_OPS = {
+    "==": ast.Eq,
+    "!=": ast.NotEq,
+    "<": ast.Lt,
+    "<=": ast.LtE,
+    ">": ast.Gt,
+    ">=": ast.GtE,
+    "in": ast.In,
+    "not in": ast.NotIn,
+}
+
+_CONSTANT_TYPES = (str, int, float, bool, type(None))
+
+
+class CompiledConditions:
+    """
+    The whole `conditions` dict of a rule compiled into one callable.
+
+    The tree's atomic predicates (comparisons and bare values) are listed in
+    `atoms`, keyed by `atom_keys`, with `functions` evaluating each one.
+    Their results are memoized in a `memo` list that `slots` maps into, so a
+    ruleset can share one memo between all rules that test the same predicate.
+    `conjuncts` holds the top-level entries in evaluation order.
+    """
+
+    __slots__ = (
+        "source",
+        "root",
+        "atoms",
+        "atom_keys",
+        "function",
+        "functions",
+        "conjuncts",
+        "_slots",
+    )
+
+    def __init__(
+        self,
+        source: str,
+        root: Optional[Node],
+        atoms: Tuple[Node, ...],
+        function: Callable[[Any, List[Any], Sequence[int]], bool],
+        functions: Tuple[Callable[[Any], Any], ...] = (),
+        conjuncts: Tuple[Tuple[str, Node], ...] = (),
+    ):
+        self.source = source
+        self.root = root
+        self.atoms = atoms
+        self.atom_keys = tuple(node_key(atom) for atom in atoms)
+        self.function = function
+        self.functions = functions
+        self.conjuncts = conjuncts
+        self._slots = tuple(range(len(atoms)))
+
+    @property
+    def order(self) -> Tuple[str, ...]:
+        return tuple(name for name, _ in self.conjuncts)
+
+    def evaluate(
+        self,
+        context: RuleContext,
+        memo: Optional[List[Any]] = None,
+        slots: Optional[Sequence[int]] = None,
+    ) -> bool:
+        if memo is None:
+            memo = [None] * len(self.atoms)
+        if slots is None:
+            slots = self._slots
+        try:
+            return self.function(context, memo, slots)
+        except RuleDSLSyntaxError:
+            raise
+        except Exception as e:
+            raise RuleDSLSyntaxError(f"Error in comparison: {e}", self.source)
+
+
+class ConditionCompiler:
+    """
+    Compiles rule `conditions` dicts into CompiledConditions.
+
+    String entries are DSL expressions; dict entries are the nested
+    `and`/`or`/`not` condition objects. All entries are ANDed together.
+
+    In "interpreter" mode the combined expression tree is walked on each
+    evaluation. In "codegen" mode it is translated into specialised Python
+    functions by building an `ast` tree from a fixed set of node types, so
+    no user-provided text is ever evaluated as code.
+    """
+
+    def __init__(
+        self,
+        dsl_evaluator: DSLEvaluator,
+        mode: str = "interpreter",
+        cache_size: int = 4096,
+    ):
+        if mode not in EVALUATION_MODES:
+            raise ValueError(f"Unknown evaluation mode: {mode}")
+        self.dsl_evaluator = dsl_evaluator
+        self.mode = mode
+        self._cache: LRUCache[CompiledConditions] = LRUCache(cache_size)
+
+    def compile(
+        self,
+        conditions: Dict[str, Any],
+        name: str = "rule",
+        order: Optional[Sequence[str]] = None,
+    ) -> CompiledConditions:
+        """
+        Compile a conditions dict, reusing earlier results for identical dicts.
+        Compilation errors are captured and raised again on evaluation.
+
+        `order` lists condition names to evaluate first; remaining entries
+        follow in their declared order.
+        """
+        source = json.dumps(conditions, default=str)
+        key = (source, tuple(order)) if order else source
+        compiled = self._cache.get(key)
+        if compiled is not None:
+            return compiled
+
+        try:
+            conjuncts = self.build_conjuncts(conditions, order)
+            root = self._combine(conjuncts)
+            atoms = collect_atoms(root)
+            if self.mode == "codegen":
+                function, functions = generate_function(root, atoms, name)
+            else:
+                function, functions = interpret_function(root, atoms)
+            compiled = CompiledConditions(
+                source, root, atoms, function, functions, tuple(conjuncts)
+            )
+        except RuleDSLSyntaxError as e:
+            compiled = CompiledConditions(source, None, (), partial(_raise, e))
+
+        self._cache.put(key, compiled)
+        return compiled
+
+    def build_tree(
+        self, conditions: Dict[str, Any], order: Optional[Sequence[str]] = None
+    ) -> Node:
+        """
+        Combine all condition entries into a single expression tree.
+        """
+        return self._combine(self.build_conjuncts(conditions, order))
+
+    def build_conjuncts(
+        self, conditions: Dict[str, Any], order: Optional[Sequence[str]] = None
+    ) -> List[Tuple[str, Node]]:
+        """
+        Compile each condition entry, returning (name, tree) pairs in
+        evaluation order.
+        """
+        names = list(conditions)
+        if order:
+            leading = [name for name in order if name in conditions]
+            names = leading + [name for name in names if name not in leading]
+
+        conjuncts = []
+        for condition_name in names:
+            condition_expr = conditions[condition_name]
+            if isinstance(condition_expr, str):
+                node = self.dsl_evaluator.compile(condition_expr).root
+            elif isinstance(condition_expr, dict):
+                node = self._build_complex(condition_expr)
+            else:
+                continue
+            conjuncts.append((condition_name, node))
+        return conjuncts
+
+    def _combine(self, conjuncts: List[Tuple[str, Node]]) -> Node:
+        if len(conjuncts) == 1:
+            return conjuncts[0][1]
+        return And(tuple(node for _, node in conjuncts))
+
+    def _build_complex(self, condition: Dict[str, Any]) -> Node:
+        if "and" in condition:
+            return And(tuple(self._build_item(item) for item in condition["and"]))
+        elif "or" in condition:
+            return Or(tuple(self._build_item(item) for item in condition["or"]))
+        elif "not" in condition:
+            return Not(self._build_item(condition["not"]))
+        else:
+            raise RuleDSLSyntaxError(
+                "Condition object must use one of 'and', 'or' or 'not'",
+                json.dumps(condition, default=str),
+            )
+
+    def _build_item(self, item: Any) -> Node:
+        if isinstance(item, str):
+            return self.dsl_evaluator.compile(item).root
+        elif isinstance(item, dict):
+            return self._build_complex(item)
+        else:
+            return Literal(bool(item))
+
+
+def node_key(node: Node) -> str:
+    """
+    Return a canonical string for a node; equal keys evaluate identically.
+    """
+    if isinstance(node, Literal):
+        return f"{type(node.value).__name__}:{node.value!r}"
+    if isinstance(node, Variable):
+        return f"${node.name}"
+    if isinstance(node, ListExpr):
+        return "[" + ", ".join(node_key(item) for item in node.items) + "]"
+    if isinstance(node, Comparison):
+        return f"({node_key(node.left)} {node.operator} {node_key(node.right)})"
+    if isinstance(node, RegexMatch):
+        return f"({node_key(node.left)} matches {node.pattern!r})"
+    if isinstance(node, Membership):
+        items = node_key(Literal(list(node.items)))
+        return f"({node_key(node.left)} {node.operator} {items})"
+    if isinstance(node, Not):
+        return f"(not {node_key(node.operand)})"
+    if isinstance(node, (And, Or)):
+        joiner = " and " if isinstance(node, And) else " or "
+        return "(" + joiner.join(node_key(operand) for operand in node.operands) + ")"
+    raise RuleDSLSyntaxError(f"Unsupported expression node: {type(node).__name__}")
+
+
+def collect_atoms(root: Node) -> Tuple[Node, ...]:
+    """
+    Return the distinct atomic predicates of a tree, in evaluation order.
+    Logical operators are structure; literals are folded into it.
+    """
+    atoms: Dict[str, Node] = {}
+
+    def visit(node: Node) -> None:
+        if isinstance(node, (And, Or)):
+            for operand in node.operands:
+                visit(operand)
+        elif isinstance(node, Not):
+            visit(node.operand)
+        elif not isinstance(node, Literal):
+            atoms.setdefault(node_key(node), node)
+
+    visit(root)
+    return tuple(atoms.values())
+
+
+class _Failed:
+    """A memoized predicate evaluation error."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: RuleDSLSyntaxError):
+        self.error = error
+
+
+class TimedMemo(list):
+    """
+    A memo that also records, in `costs`, the time in ns each predicate
+    took when it was computed into it.
+    """
+
+    def __init__(self, size: int):
+        super().__init__([None] * size)
+        self.costs: List[Optional[int]] = [None] * size
+
+
+def _predicate(
+    functions: Sequence[Callable[[Any], Any]],
+    index: int,
+    context: Any,
+    memo: List[Any],
+    slots: Sequence[int],
+) -> bool:
+    slot = slots[index]
+    value = memo[slot]
+    if value is None:
+        timed = memo.__class__ is TimedMemo
+        if timed:
+            start = time.perf_counter_ns()
+        try:
+            value = bool(functions[index](context))
+        except RuleDSLSyntaxError as e:
+            value = _Failed(e)
+        except Exception as e:
+            value = _Failed(RuleDSLSyntaxError(f"Error in comparison: {e}"))
+        if timed:
+            cost = time.perf_counter_ns() - start
+            memo.costs[slot] = cost  # type: ignore[attr-defined]
+        memo[slot] = value
+    if value.__class__ is _Failed:
+        raise value.error.with_traceback(None)
+    return value
+
+
+def _raise(error: Exception, *args: Any) -> bool:
+    raise error.with_traceback(None)
+
+
+def interpret_function(
+    root: Node, atoms: Tuple[Node, ...]
+) -> Tuple[Callable[[Any, List[Any], Sequence[int]], bool], Tuple[Any, ...]]:
+    """
+    Build a function walking the tree, with atoms evaluated through the memo.
+    Returns the function and the per-atom evaluation functions.
+    """
+    index = {node_key(atom): i for i, atom in enumerate(atoms)}
+    functions = tuple(atom.evaluate for atom in atoms)
+
+    def build(node: Node) -> Callable[[Any, List[Any], Sequence[int]], bool]:
+        if isinstance(node, (And, Or)):
+            parts = tuple(build(operand) for operand in node.operands)
+            if isinstance(node, And):
+                return lambda c, m, s: all(part(c, m, s) for part in parts)
+            return lambda c, m, s: any(part(c, m, s) for part in parts)
+        if isinstance(node, Not):
+            part = build(node.operand)
+            return lambda c, m, s: not part(c, m, s)
+        if isinstance(node, Literal):
+            value = bool(node.value)
+            return lambda c, m, s: value
+        return partial(_predicate, functions, index[node_key(node)])
+
+    return build(root), functions
+
+
+def generate_function(
+    root: Node, atoms: Tuple[Node, ...], name: str = "rule"
+) -> Tuple[Callable[[Any, List[Any], Sequence[int]], bool], Tuple[Any, ...]]:
+    """
+    Translate a tree into a Python function `(context, memo, slots) -> bool`.
+    Each atom becomes its own function whose result is memoized; these are
+    returned alongside the main function.
+    """
+    generator = _CodeGenerator()
+    index = {node_key(atom): i for i, atom in enumerate(atoms)}
+
+    functions = [
+        generator.function(f"_a{i}", ["context"], generator.emit(atom, False))
+        for i, atom in enumerate(atoms)
+    ]
+    body = generator.call("_bool", generator.emit_formula(root, index))
+    functions.append(
+        generator.function("_conditions", ["context", "memo", "slots"], body)
+    )
+
+    module = ast.fix_missing_locations(ast.Module(body=functions, type_ignores=[]))
+    code = compile(module, f"<conditions:{name}>", "exec")
+
+    # The module is built only from the node types handled by _CodeGenerator;
+    # names refer to the namespace below and literals are ast.Constant values.
+    namespace = generator.namespace
+    exec(code, namespace)  # nosec B102
+    namespace["_functions"] = tuple(namespace[f"_a{i}"] for i in range(len(atoms)))
+    return namespace["_conditions"], namespace["_functions"]
+
+
+class _CodeGenerator:
+    def __init__(self):
+        self.namespace: Dict[str, Any] = {
+            "__builtins__": {},
+            "_bool": bool,
+            "_str": str,
+            "_predicate": _predicate,
+        }
+
+    def bind(self, value: Any) -> ast.expr:
+        name = f"_k{len(self.namespace)}"
+        self.namespace[name] = value
+        return ast.Name(id=name, ctx=ast.Load())
+
+    def function(self, name: str, args: List[str], body: ast.expr) -> ast.stmt:
+        fields: Dict[str, Any] = {}
+        if "type_params" in ast.FunctionDef._fields:
+            fields["type_params"] = []
+        return ast.FunctionDef(
+            name=name,
+            args=ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg(arg=arg) for arg in args],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            body=[ast.Return(value=body)],
+            decorator_list=[],
+            returns=None,
+            **fields,
+        )
+
+    def load(self, name: str) -> ast.expr:
+        return ast.Name(id=name, ctx=ast.Load())
+
+    def call(self, name: str, *args: ast.expr) -> ast.expr:
+        return ast.Call(func=self.load(name), args=list(args), keywords=[])
+
+    def emit(self, node: Node, as_value: bool = True) -> ast.expr:
+        if isinstance(node, Literal):
+            if type(node.value) in _CONSTANT_TYPES:
+                return ast.Constant(value=node.value)
+            return self.bind(node.value)
+
+        if isinstance(node, Variable):
+            context = self.load("context")
+            if node.kind == "field":
+                return ast.Attribute(value=context, attr=node.name, ctx=ast.Load())
+            if node.kind == "custom":
+                # context.custom_attributes.get(name)
+                attributes = ast.Attribute(
+                    value=context, attr="custom_attributes", ctx=ast.Load()
+                )
+                return ast.Call(
+                    func=ast.Attribute(value=attributes, attr="get", ctx=ast.Load()),
+                    args=[ast.Constant(value=node.name)],
+                    keywords=[],
+                )
+            return ast.Call(func=self.bind(node.get), args=[context], keywords=[])
+
+        if isinstance(node, ListExpr):
+            return ast.List(
+                elts=[self.emit(item) for item in node.items], ctx=ast.Load()
+            )
+
+        if isinstance(node, Comparison):
+            return self._emit_comparison(node)
+
+        if isinstance(node, RegexMatch):
+            matcher = self.bind(partial(node.patterns.match, node.compiled))
+            return ast.Call(func=matcher, args=[self.emit(node.left)], keywords=[])
+
+        if isinstance(node, Membership):
+            contains = self.bind(node.contains)
+            return ast.Call(func=contains, args=[self.emit(node.left)], keywords=[])
+
+        if isinstance(node, Not):
+            return ast.UnaryOp(op=ast.Not(), operand=self.emit(node.operand, False))
+
+        if isinstance(node, (And, Or)):
+            if not node.operands:
+                return ast.Constant(value=isinstance(node, And))
+            op = ast.And() if isinstance(node, And) else ast.Or()
+            values = [self.emit(operand, False) for operand in node.operands]
+            expr = values[0] if len(values) == 1 else ast.BoolOp(op=op, values=values)
+            # `and`/`or` yield an operand; comparisons need the boolean result
+            return self.call("_bool", expr) if as_value else expr
+
+        raise RuleDSLSyntaxError(f"Unsupported expression node: {type(node).__name__}")
+
+    def emit_formula(self, node: Node, index: Dict[str, int]) -> ast.expr:
+        """
+        Emit the logical structure of a tree; atoms are read from the memo.
+        """
+        if isinstance(node, (And, Or)):
+            if not node.operands:
+                return ast.Constant(value=isinstance(node, And))
+            op = ast.And() if isinstance(node, And) else ast.Or()
+            values = [self.emit_formula(o, index) for o in node.operands]
+            return values[0] if len(values) == 1 else ast.BoolOp(op=op, values=values)
+
+        if isinstance(node, Not):
+            return ast.UnaryOp(
+                op=ast.Not(), operand=self.emit_formula(node.operand, index)
+            )
+
+        if isinstance(node, Literal):
+            return ast.Constant(value=bool(node.value))
+
+        # (_v if (_v := memo[slots[i]]).__class__ is _bool
+        #  else _predicate(_functions, i, context, memo, slots))
+        i = ast.Constant(value=index[node_key(node)])
+        load = self.load
+        cached = ast.NamedExpr(
+            target=ast.Name(id="_v", ctx=ast.Store()),
+            value=ast.Subscript(
+                value=load("memo"),
+                slice=ast.Subscript(value=load("slots"), slice=i, ctx=ast.Load()),
+                ctx=ast.Load(),
+            ),
+        )
+        test = ast.Compare(
+            left=ast.Attribute(value=cached, attr="__class__", ctx=ast.Load()),
+            ops=[ast.Is()],
+            comparators=[load("_bool")],
+        )
+        compute = self.call(
+            "_predicate",
+            load("_functions"),
+            i,
+            load("context"),
+            load("memo"),
+            load("slots"),
+        )
+        return ast.IfExp(test=test, body=load("_v"), orelse=compute)
+
+    def _emit_comparison(self, node: Comparison) -> ast.expr:
+        left = self.emit(node.left)
+        right = self.emit(node.right)
+
+        if node.operator in _COMPARE_OPS:
+            op = _COMPARE_OPS[node.operator]()
+            return ast.Compare(left=left, ops=[op], comparators=[right])
+
+        if node.operator == "contains":
+            return ast.Compare(left=right, ops=[ast.In()], comparators=[left])
+
+        if node.operator in ("startswith", "endswith"):
+            method = ast.Attribute(
+                value=self.call("_str", left), attr=node.operator, ctx=ast.Load()
+            )
+            return ast.Call(func=method, args=[self.call("_str", right)], keywords=[])
+
+        function = self.bind(node.function)
+        return ast.Call(func=function, args=[left, right], keywords=[])
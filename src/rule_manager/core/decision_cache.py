@@ -0,0 +1,138 @@
+import hashlib
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from .incremental import predicate_dependencies
+from .ruleset import RulesetSnapshot
+from ..models.base import RuleContext
+from ..utils.cache import LRUCache, SizedLRUCache
+
+_CUSTOM_PREFIX = "custom_attributes."
+
+
+class DecisionCache:
+    """
+    Caches evaluation results by the snapshot they were computed against
+    and a fingerprint of the context attributes that snapshot's rules
+    actually read.
+
+    Contexts that differ only in attributes no rule references (such as
+    `session_id` or `timestamp`, unless a rule tests them) share an entry.
+    Entries of several snapshots, such as the per-tenant snapshots, live
+    side by side; those of snapshots the engine no longer uses are never
+    hit again and age out. The cache is bounded by the size of its results
+    as given to `put`.
+    """
+
+    # Referenced attributes are remembered for this many snapshots
+    ATTRIBUTE_SETS = 256
+
+    # Bytes held per entry besides the result: the fingerprint, the
+    # (result, size) tuple and size stored by the LRU, and its
+    # OrderedDict slot and node
+    ENTRY_OVERHEAD = (
+        sys.getsizeof(bytes(16))
+        + sys.getsizeof((None, 0))
+        + sys.getsizeof(1 << 30)
+        + 104
+    )
+
+    def __init__(self, max_bytes: int):
+        self._cache: SizedLRUCache[Any] = SizedLRUCache(max_bytes)
+        # snapshot id -> (attributes,); attributes is None when some
+        # predicate reads attributes that cannot be traced, so the whole
+        # context is fingerprinted
+        self._attributes: LRUCache[Tuple[Optional[Tuple[str, ...]]]] = LRUCache(
+            self.ATTRIBUTE_SETS
+        )
+        self._last_attributes: Optional[Tuple[str, ...]] = None
+        self.snapshots = 0
+
+    def get(self, snapshot: RulesetSnapshot, context: RuleContext, kind: str) -> Any:
+        """
+        Return the cached result of `kind` for a context, or None.
+        """
+        fingerprint = self._fingerprint(snapshot, context, kind)
+        if fingerprint is None:
+            return None
+        return self._cache.get(fingerprint)
+
+    def put(
+        self,
+        snapshot: RulesetSnapshot,
+        context: RuleContext,
+        kind: str,
+        result: Any,
+        size: int,
+    ) -> None:
+        """
+        Cache a result of `kind` for a context. `size` is the memory the
+        result holds; the entry's own overhead is added to it. Contexts
+        that cannot be fingerprinted are not cached.
+        """
+        fingerprint = self._fingerprint(snapshot, context, kind)
+        if fingerprint is not None:
+            self._cache.put(fingerprint, result, size + self.ENTRY_OVERHEAD)
+
+    def _referenced(self, snapshot: RulesetSnapshot) -> Optional[Tuple[str, ...]]:
+        entry = self._attributes.get(snapshot.id)
+        if entry is None:
+            entry = (_referenced_attributes(snapshot),)
+            self._attributes.put(snapshot.id, entry)
+            self.snapshots += 1
+        self._last_attributes = entry[0]
+        return entry[0]
+
+    def _fingerprint(
+        self, snapshot: RulesetSnapshot, context: RuleContext, kind: str
+    ) -> Optional[bytes]:
+        attributes = self._referenced(snapshot)
+        if attributes is None:
+            canonical = context.model_dump_json()
+        else:
+            values: List[Any] = []
+            custom = context.custom_attributes
+            for attribute in attributes:
+                if attribute.startswith(_CUSTOM_PREFIX):
+                    key = attribute[len(_CUSTOM_PREFIX) :]
+                    values.append([key in custom, custom.get(key)])
+                else:
+                    values.append(getattr(context, attribute))
+            try:
+                canonical = json.dumps(values, sort_keys=True, default=repr)
+            except TypeError:
+                # Dicts mixing key types cannot be sorted into a canonical form
+                return None
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(snapshot.id.to_bytes(8, "little"))
+        digest.update(kind.encode())
+        digest.update(canonical.encode())
+        return digest.digest()
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._attributes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats["snapshots"] = self.snapshots
+        stats["fingerprinted_attributes"] = (
+            list(self._last_attributes) if self._last_attributes is not None else None
+        )
+        return stats
+
+
+def _referenced_attributes(snapshot: RulesetSnapshot) -> Optional[Tuple[str, ...]]:
+    attributes = set()
+    for compiled_rule in snapshot.ruleset.rules:
+        conditions = compiled_rule.conditions
+        if conditions is None:
+            continue
+        for atom in conditions.atoms:
+            dependencies = predicate_dependencies(atom)
+            if dependencies is None:
+                return None
+            attributes |= dependencies
+    return tuple(sorted(attributes))
@@ -1,7 +1,167 @@
 import re
-from typing import Any, Dict, List, Optional, Union
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from functools import partial
+from operator import attrgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    NoReturn,
+    Optional,
+    Tuple,
+    Union,
+)
 from ..models.base import RuleContext
 from ..models.errors import RuleDSLSyntaxError
+from ..utils.cache import LRUCache
+from .patterns import PatternCache
+
+_CONTEXT_FIELDS = frozenset(RuleContext.model_fields)
+
+
+class Node(ABC):
+    """Base class for compiled DSL expression nodes."""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def evaluate(self, context: RuleContext) -> Any:
+        """Evaluate the node against a context."""
+
+
+@dataclass(frozen=True, slots=True)
+class Literal(Node):
+    value: Any
+
+    def evaluate(self, context: RuleContext) -> Any:
+        return self.value
+
+
+@dataclass(frozen=True, slots=True)
+class Variable(Node):
+    """
+    A context variable, resolved once into a direct accessor: a RuleContext
+    field, a single custom attribute key, or a pre-split nested path.
+    """
+
+    name: str
+    kind: str = field(init=False, compare=False, repr=False)
+    get: Callable[[RuleContext], Any] = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        kind, get = compile_accessor(self.name)
+        object.__setattr__(self, "kind", kind)
+        object.__setattr__(self, "get", get)
+
+    def evaluate(self, context: RuleContext) -> Any:
+        return self.get(context)
+
+
+@dataclass(frozen=True, slots=True)
+class ListExpr(Node):
+    items: Tuple[Node, ...]
+
+    def evaluate(self, context: RuleContext) -> Any:
+        return [item.evaluate(context) for item in self.items]
+
+
+@dataclass(frozen=True, slots=True)
+class Comparison(Node):
+    operator: str
+    function: Callable[[Any, Any], bool]
+    left: Node
+    right: Node
+
+    def evaluate(self, context: RuleContext) -> Any:
+        left = self.left.evaluate(context)
+        right = self.right.evaluate(context)
+        try:
+            return self.function(left, right)
+        except Exception as e:
+            raise RuleDSLSyntaxError(f"Error in comparison: {e}")
+
+
+@dataclass(frozen=True, slots=True)
+class RegexMatch(Node):
+    """A `matches` comparison whose pattern was compiled at load time."""
+
+    left: Node
+    pattern: str
+    compiled: Any = field(compare=False)
+    patterns: PatternCache = field(compare=False)
+
+    def evaluate(self, context: RuleContext) -> Any:
+        return self.patterns.match(self.compiled, self.left.evaluate(context))
+
+
+@dataclass(frozen=True, slots=True)
+class Membership(Node):
+    """
+    An `in` / `not in` test against a literal list, using a frozenset
+    built at load time. Unhashable values fall back to a linear scan.
+    """
+
+    left: Node
+    operator: str
+    items: Tuple[Any, ...]
+    values: frozenset = field(compare=False)
+
+    def contains(self, value: Any) -> bool:
+        try:
+            found = value in self.values
+        except TypeError:
+            found = value in self.items
+        return found if self.operator == "in" else not found
+
+    def evaluate(self, context: RuleContext) -> Any:
+        return self.contains(self.left.evaluate(context))
+
+
+@dataclass(frozen=True, slots=True)
+class Not(Node):
+    operand: Node
+
+    def evaluate(self, context: RuleContext) -> Any:
+        return not self.operand.evaluate(context)
+
+
+@dataclass(frozen=True, slots=True)
+class And(Node):
+    operands: Tuple[Node, ...]
+
+    def evaluate(self, context: RuleContext) -> Any:
+        return all(operand.evaluate(context) for operand in self.operands)
+
+
+@dataclass(frozen=True, slots=True)
+class Or(Node):
+    operands: Tuple[Node, ...]
+
+    def evaluate(self, context: RuleContext) -> Any:
+        return any(operand.evaluate(context) for operand in self.operands)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledExpression:
+    """
+    An immutable, compiled DSL expression.
+    Safe to share between rules and evaluations.
+    """
+
+    source: str
+    root: Node
+
+    def evaluate(self, context: RuleContext) -> bool:
+        try:
+            return bool(self.root.evaluate(context))
+        except RuleDSLSyntaxError as e:
+            e.expression = e.expression or self.source
+            raise
+        except Exception as e:
+            raise RuleDSLSyntaxError(f"Failed to evaluate expression: {e}", self.source)
 
 
 class DSLEvaluator:
@@ -10,7 +170,18 @@ class DSLEvaluator:
     Uses a simple expression language to avoid eval/exec security issues.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache_size: int = 1024,
+        regex_cache_size: int = 512,
+        regex_max_input_length: int = 10000,
+        regex_timeout_ms: int = 100,
+    ):
+        self.patterns = PatternCache(
+            maxsize=regex_cache_size,
+            max_input_length=regex_max_input_length,
+            timeout_ms=regex_timeout_ms,
+        )
         self.operators = {
             "==": lambda a, b: a == b,
             "!=": lambda a, b: a != b,
@@ -23,14 +194,33 @@ class DSLEvaluator:
             "contains": lambda a, b: b in a,
             "startswith": lambda a, b: str(a).startswith(str(b)),
             "endswith": lambda a, b: str(a).endswith(str(b)),
-            "matches": lambda a, b: bool(re.match(str(b), str(a))),
+            "matches": self.patterns.match_pattern,
         }
 
-        self.logical_operators = {
-            "and": lambda a, b: a and b,
-            "or": lambda a, b: a or b,
-            "not": lambda a: not a,
-        }
+        self._cache: LRUCache[CompiledExpression] = LRUCache(cache_size)
+
+    def compile(self, expression: str) -> CompiledExpression:
+        """
+        Compile an expression into an immutable, reusable evaluable object.
+        Compiled expressions are cached by their source text.
+        """
+        source = expression.strip()
+        compiled = self._cache.get(source)
+        if compiled is not None:
+            return compiled
+
+        if not source:
+            compiled = CompiledExpression(source, Literal(True))
+        else:
+            try:
+                compiled = CompiledExpression(source, self._compile(source))
+            except RuleDSLSyntaxError:
+                raise
+            except Exception as e:
+                raise RuleDSLSyntaxError(f"Failed to compile expression: {e}", source)
+
+        self._cache.put(source, compiled)
+        return compiled
 
     def evaluate(self, expression: str, context: RuleContext) -> bool:
         """
@@ -41,174 +231,375 @@ class DSLEvaluator:
         - Logical operators: user_id == "123" and model_name == "gpt-4"
         - Complex expressions: prompt_length > 1000 or model_name in ["gpt-4", "claude"]
         """
+        return self.compile(expression).evaluate(context)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return the counters of the compiled-expression cache."""
+        return self._cache.stats()
+
+    def _compile(self, expr: str) -> Node:
+        return _Parser(expr, _tokenize(expr), self.operators, self.patterns).parse()
+
+    def validate_expression(self, expression: str) -> List[str]:
+        """
+        Validate an expression and return a list of issues found.
+        Returns empty list if expression is valid.
+        """
+        issues = []
+
         if not expression.strip():
-            return True
+            return issues
 
         try:
-            return self._evaluate_expression(expression.strip(), context)
-        except Exception as e:
-            raise RuleDSLSyntaxError(f"Failed to evaluate expression: {e}", expression)
-
-    def _evaluate_expression(self, expr: str, context: RuleContext) -> bool:
-        # Handle logical operators
-        if " or " in expr:
-            parts = expr.split(" or ")
-            return any(
-                self._evaluate_expression(part.strip(), context) for part in parts
+            # Parse with the same parser used for evaluation
+            self.compile(expression)
+        except RuleDSLSyntaxError as e:
+            issues.append(e.message)
+
+        return issues
+
+
+class Token(NamedTuple):
+    kind: str
+    value: Any
+    position: int
+
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+    | (?P<number>-?\d+(?:\.\d+)?)(?![\w.])
+    | (?P<compare>==|!=|<=|>=|<|>)
+    | (?P<punct>[()\[\],])
+    | (?P<name>[A-Za-z_][\w.]*(?:-[\w.]+)*)
+    """,
+    re.VERBOSE,
+)
+
+_KEYWORDS = {
+    "and",
+    "or",
+    "not",
+    "in",
+    "contains",
+    "startswith",
+    "endswith",
+    "matches",
+}
+
+_CONSTANTS = {"true": True, "false": False, "null": None, "none": None}
+
+
+def _tokenize(expr: str) -> List[Token]:
+    """Split an expression into tokens in a single left-to-right pass."""
+    tokens = []
+    position = 0
+    length = len(expr)
+
+    while position < length:
+        match = _TOKEN_PATTERN.match(expr, position)
+        if match is None:
+            if expr[position] in "\"'":
+                raise RuleDSLSyntaxError(
+                    f"Unterminated string at position {position}", expr
+                )
+            raise RuleDSLSyntaxError(
+                f"Unexpected character '{expr[position]}' at position {position}",
+                expr,
             )
 
-        if " and " in expr:
-            parts = expr.split(" and ")
-            return all(
-                self._evaluate_expression(part.strip(), context) for part in parts
+        kind = match.lastgroup
+        text = match.group()
+        if kind == "string":
+            quote = text[0]
+            tokens.append(
+                Token("literal", text[1:-1].replace("\\" + quote, quote), position)
             )
+        elif kind == "number":
+            value = float(text) if "." in text else int(text)
+            tokens.append(Token("literal", value, position))
+        elif kind == "name":
+            if text in _KEYWORDS:
+                tokens.append(Token(text, text, position))
+            elif text.lower() in _CONSTANTS:
+                tokens.append(Token("literal", _CONSTANTS[text.lower()], position))
+            else:
+                tokens.append(Token("name", text, position))
+        elif kind != "space":
+            tokens.append(Token(text, text, position))
 
-        if expr.startswith("not "):
-            return not self._evaluate_expression(expr[4:].strip(), context)
+        position = match.end()
 
-        # Handle parentheses
-        if "(" in expr and ")" in expr:
-            return self._evaluate_with_parentheses(expr, context)
+    tokens.append(Token("end", None, length))
+    return tokens
 
-        # Handle simple comparison
-        return self._evaluate_comparison(expr, context)
 
-    def _evaluate_with_parentheses(self, expr: str, context: RuleContext) -> bool:
-        # Simple parentheses handling - find innermost parentheses first
-        while "(" in expr:
-            start = expr.rfind("(")
-            end = expr.find(")", start)
-            if end == -1:
-                raise RuleDSLSyntaxError("Unmatched parentheses", expr)
+_COMPARISON_TOKENS = {
+    "==",
+    "!=",
+    "<",
+    "<=",
+    ">",
+    ">=",
+    "in",
+    "contains",
+    "startswith",
+    "endswith",
+    "matches",
+}
 
-            inner_expr = expr[start + 1 : end]
-            result = self._evaluate_expression(inner_expr, context)
-            expr = expr[:start] + str(result) + expr[end + 1 :]
 
-        return self._evaluate_expression(expr, context)
+class _Parser:
+    """
+    Recursive-descent parser producing an expression tree.
+
+    Grammar, lowest precedence first:
+        or_expr    := and_expr ("or" and_expr)*
+        and_expr   := not_expr ("and" not_expr)*
+        not_expr   := "not" not_expr | comparison
+        comparison := operand [operator operand]
+        operand    := literal | name | "[" [operand ("," operand)*] "]"
+                      | "(" or_expr ")"
+    """
 
-    def _evaluate_comparison(self, expr: str, context: RuleContext) -> bool:
-        # Find the operator
-        operator = None
-        for op in sorted(self.operators.keys(), key=len, reverse=True):
-            if op in expr:
-                operator = op
-                break
+    def __init__(
+        self,
+        source: str,
+        tokens: List[Token],
+        operators: Dict[str, Callable[[Any, Any], bool]],
+        patterns: PatternCache,
+    ):
+        self.source = source
+        self.tokens = tokens
+        self.operators = operators
+        self.patterns = patterns
+        self.index = 0
+
+    def parse(self) -> Node:
+        node = self._parse_or()
+        token = self._peek()
+        if token.kind == ")":
+            self._error("Unbalanced parentheses: unexpected ')'", token)
+        if token.kind != "end":
+            self._error(f"Unexpected token '{token.value}'", token)
+        return node
+
+    def _peek(self, offset: int = 0) -> Token:
+        return self.tokens[min(self.index + offset, len(self.tokens) - 1)]
+
+    def _advance(self) -> Token:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def _error(self, message: str, token: Token) -> NoReturn:
+        raise RuleDSLSyntaxError(f"{message} at position {token.position}", self.source)
+
+    def _parse_or(self) -> Node:
+        operands = [self._parse_and()]
+        while self._peek().kind == "or":
+            self._advance()
+            operands.append(self._parse_and())
+        return operands[0] if len(operands) == 1 else _fold_logical(Or, operands)
+
+    def _parse_and(self) -> Node:
+        operands = [self._parse_not()]
+        while self._peek().kind == "and":
+            self._advance()
+            operands.append(self._parse_not())
+        return operands[0] if len(operands) == 1 else _fold_logical(And, operands)
+
+    def _parse_not(self) -> Node:
+        if self._peek().kind == "not":
+            self._advance()
+            operand = self._parse_not()
+            if isinstance(operand, Literal):
+                return Literal(not operand.value)
+            return Not(operand)
+        return self._parse_comparison()
+
+    def _parse_comparison(self) -> Node:
+        left = self._parse_operand()
+
+        token = self._peek()
+        if token.kind == "not" and self._peek(1).kind == "in":
+            self.index += 2
+            operator = "not in"
+        elif token.kind in _COMPARISON_TOKENS:
+            self._advance()
+            operator = token.kind
+        else:
+            # No operator, treat as boolean value
+            return left
+
+        right = self._parse_operand()
+        if operator == "matches" and isinstance(right, Literal):
+            # Compile constant patterns once, when the rule is loaded
+            pattern = str(right.value)
+            try:
+                compiled = self.patterns.compile(pattern)
+            except RuleDSLSyntaxError as e:
+                e.expression = self.source
+                raise
+            return _fold(RegexMatch(left, pattern, compiled, self.patterns))
+        if (
+            operator in ("in", "not in")
+            and isinstance(right, Literal)
+            and isinstance(right.value, list)
+        ):
+            items = tuple(right.value)
+            try:
+                values = frozenset(items)
+            except TypeError:
+                pass
+            else:
+                return _fold(Membership(left, operator, items, values))
+        return _fold(Comparison(operator, self.operators[operator], left, right))
 
-        if not operator:
-            # No operator found, treat as boolean value
-            return self._get_context_value(expr, context)
+    def _parse_operand(self) -> Node:
+        token = self._advance()
 
-        parts = expr.split(operator, 1)
-        if len(parts) != 2:
-            raise RuleDSLSyntaxError(f"Invalid comparison expression", expr)
+        if token.kind == "literal":
+            return Literal(token.value)
 
-        left = self._parse_value(parts[0].strip(), context)
-        right = self._parse_value(parts[1].strip(), context)
+        if token.kind == "name":
+            return Variable(token.value)
 
-        try:
-            return self.operators[operator](left, right)
-        except Exception as e:
-            raise RuleDSLSyntaxError(f"Error in comparison: {e}", expr)
+        if token.kind == "(":
+            node = self._parse_or()
+            closing = self._peek()
+            if closing.kind != ")":
+                self._error("Unbalanced parentheses: expected ')'", closing)
+            self._advance()
+            return node
 
-    def _parse_value(self, value: str, context: RuleContext) -> Any:
-        value = value.strip()
+        if token.kind == "[":
+            return self._parse_list()
 
-        # Handle quoted strings
-        if (value.startswith('"') and value.endswith('"')) or (
-            value.startswith("'") and value.endswith("'")
-        ):
-            return value[1:-1]
-
-        # Handle lists
-        if value.startswith("[") and value.endswith("]"):
-            items = []
-            content = value[1:-1].strip()
-            if content:
-                # Simple list parsing - split by comma and parse each item
-                for item in content.split(","):
-                    items.append(self._parse_value(item.strip(), context))
-            return items
-
-        # Handle numbers
-        try:
-            if "." in value:
-                return float(value)
-            else:
-                return int(value)
-        except ValueError:
-            pass
-
-        # Handle booleans
-        if value.lower() == "true":
-            return True
-        elif value.lower() == "false":
-            return False
-        elif value.lower() == "null" or value.lower() == "none":
-            return None
-
-        # Handle context variables
-        return self._get_context_value(value, context)
-
-    def _get_context_value(self, key: str, context: RuleContext) -> Any:
-        # Direct context attributes
-        if hasattr(context, key):
-            return getattr(context, key)
-
-        # Custom attributes
-        if key in context.custom_attributes:
-            return context.custom_attributes[key]
-
-        # Nested attribute access (e.g., custom_attributes.key)
-        if "." in key:
-            parts = key.split(".")
-            value = context
-            for part in parts:
-                if hasattr(value, part):
-                    value = getattr(value, part)
-                elif isinstance(value, dict) and part in value:
-                    value = value[part]
-                else:
-                    return None
-            return value
+        if token.kind == "end":
+            self._error("Unexpected end of expression", token)
+        self._error(f"Unexpected token '{token.value}'", token)
 
-        return None
+    def _parse_list(self) -> Node:
+        items: List[Node] = []
+        if self._peek().kind != "]":
+            items.append(self._parse_operand())
+            while self._peek().kind == ",":
+                self._advance()
+                items.append(self._parse_operand())
 
-    def validate_expression(self, expression: str) -> List[str]:
-        """
-        Validate an expression and return a list of issues found.
-        Returns empty list if expression is valid.
-        """
-        issues = []
+        closing = self._peek()
+        if closing.kind != "]":
+            self._error("Expected ']' to close list", closing)
+        self._advance()
 
-        if not expression.strip():
-            return issues
+        if all(isinstance(item, Literal) for item in items):
+            return Literal([item.value for item in items])
+        return ListExpr(tuple(items))
 
-        try:
-            # Try to parse the expression structure
-            self._validate_syntax(expression)
-        except RuleDSLSyntaxError as e:
-            issues.append(e.message)
 
-        return issues
+def _fold(node: Union[Comparison, RegexMatch, Membership]) -> Node:
+    """
+    Evaluate a comparison of constants once, at compile time. Comparisons
+    that fail are kept, so the error is raised when the rule is evaluated.
+    """
+    if not isinstance(node.left, Literal):
+        return node
+    if isinstance(node, Comparison) and not isinstance(node.right, Literal):
+        return node
+    try:
+        return Literal(node.evaluate(RuleContext()))
+    except Exception:
+        return node
+
+
+def _fold_logical(kind: type, operands: List[Node]) -> Node:
+    """
+    Drop constant operands that cannot decide an `and` / `or`, and cut the
+    operands after one that always does; they would never be evaluated.
+    """
+    decisive = kind is Or
+    kept: List[Node] = []
+    for operand in operands:
+        if isinstance(operand, Literal):
+            if bool(operand.value) is decisive:
+                if not kept:
+                    return Literal(decisive)
+                kept.append(Literal(decisive))
+                break
+            continue
+        kept.append(operand)
+
+    if not kept:
+        return Literal(not decisive)
+    return kind(tuple(kept))
+
+
+def compile_accessor(key: str) -> Tuple[str, Callable[[RuleContext], Any]]:
+    """
+    Resolve a variable name into (kind, accessor) with the same lookup
+    order as `_get_context_value`. `kind` is one of "field", "custom",
+    "path" or "dynamic".
+    """
+    if key in _CONTEXT_FIELDS:
+        return "field", attrgetter(key)
+
+    if hasattr(RuleContext, key):
+        # Methods and other class attributes of the model
+        return "dynamic", partial(_get_context_value, key)
+
+    if "." not in key:
+        return "custom", lambda context: context.custom_attributes.get(key)
+
+    head, *rest = key.split(".")
+    if head not in _CONTEXT_FIELDS:
+        if hasattr(RuleContext, head):
+            return "dynamic", partial(_get_context_value, key)
+        # Only a custom attribute literally named `key` can match
+        return "custom", lambda context: context.custom_attributes.get(key)
+
+    parts = tuple(rest)
+
+    def get_path(context: RuleContext) -> Any:
+        attributes = context.custom_attributes
+        if key in attributes:
+            return attributes[key]
+        value = getattr(context, head)
+        for part in parts:
+            if isinstance(value, dict):
+                if part in value:
+                    value = value[part]
+                    continue
+            if hasattr(value, part):
+                value = getattr(value, part)
+            else:
+                return None
+        return value
+
+    return "path", get_path
+
+
+def _get_context_value(key: str, context: RuleContext) -> Any:
+    # Direct context attributes
+    if hasattr(context, key):
+        return getattr(context, key)
+
+    # Custom attributes
+    if key in context.custom_attributes:
+        return context.custom_attributes[key]
+
+    # Nested attribute access (e.g., custom_attributes.key)
+    if "." in key:
+        parts = key.split(".")
+        value = context
+        for part in parts:
+            if hasattr(value, part):
+                value = getattr(value, part)
+            elif isinstance(value, dict) and part in value:
+                value = value[part]
+            else:
+                return None
+        return value
 
-    def _validate_syntax(self, expr: str) -> None:
-        """Basic syntax validation"""
-        # Check balanced parentheses
-        open_count = expr.count("(")
-        close_count = expr.count(")")
-        if open_count != close_count:
-            raise RuleDSLSyntaxError("Unbalanced parentheses")
-
-        # Check for empty expressions in logical operations
-        if " and " in expr:
-            parts = expr.split(" and ")
-            for part in parts:
-                if not part.strip():
-                    raise RuleDSLSyntaxError("Empty expression in AND operation")
-
-        if " or " in expr:
-            parts = expr.split(" or ")
-            for part in parts:
-                if not part.strip():
-                    raise RuleDSLSyntaxError("Empty expression in OR operation")
+    return None
@@ -1,27 +1,54 @@
 import time
 import asyncio
-from typing import List, Dict, Any, Optional, Set
+from functools import partial
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 from datetime import datetime
 import semver
 
+from .admission import AdmissionController, Deadline
+from .batch import BatchEvaluationResult, BatchEvaluator, ColumnarContexts
+from .compiler import ConditionCompiler
+from .decision_cache import DecisionCache
 from .dsl import DSLEvaluator
+from .incremental import MATCHING_MODES, SessionMatcher
+from .index import DiscriminationIndex
+from .inheritance import InheritanceMemo, resolve_inheritance
+from .results import VERBOSITY_LEVELS, CompactDecision, CompactSummary, Outcome
+from .ruleset import CompiledRuleset, RulesetSnapshot
+from .selectivity import SelectivityTracker
+from .timing import EvaluationTimings
+from .workers import ProcessPoolEvaluator
 from ..models.base import (
     Rule,
     RuleSet,
     RuleScope,
     RuleAction,
     RuleContext,
-    RuleEvaluationResult,
+    RuleDecision,
     RuleEvaluationSummary,
     PriorityTieBreaking,
 )
 from ..models.errors import (
-    CircularInheritanceError,
+    EvaluationTimeoutError,
     PriorityConflictError,
     InvalidRulesetVersionError,
     UnexpectedError,
 )
 from ..storage.base import RuleStore
+from ..utils.cache import LRUCache
+
+# Scopes whose rules can be limited to a tenant, with the context
+# attribute that names it
+TENANT_KEYS = ((RuleScope.PROJECT, "project_id"), (RuleScope.INDIVIDUAL, "user_id"))
 
 
 class RuleEngine:
@@ -31,237 +58,811 @@ class RuleEngine:
         priority_tie_breaking: PriorityTieBreaking = PriorityTieBreaking.FIFO,
         max_evaluation_time_ms: int = 1000,
         engine_version: str = "2.8.0",
+        expression_cache_size: int = 1024,
+        regex_cache_size: int = 512,
+        regex_max_input_length: int = 10000,
+        regex_timeout_ms: int = 100,
+        evaluation_mode: str = "interpreter",
+        condition_ordering: str = "declared",
+        condition_stats_sample_rate: Optional[int] = None,
+        condition_reorder_interval: int = 10000,
+        pinned_condition_orders: Optional[Dict[str, List[str]]] = None,
+        enable_rule_index: bool = True,
+        matching_mode: str = "stateless",
+        session_cache_size: int = 10000,
+        session_ttl_seconds: float = 1800,
+        decision_cache_mb: int = 0,
+        max_concurrent_evaluations: int = 100,
+        max_queued_evaluations: int = 1000,
+        evaluation_workers: int = 0,
+        worker_batch_size: int = 64,
+        partition_cache_size: int = 10000,
+        tenant_snapshot_cache_size: int = 256,
+        timing_mode: str = "request",
     ):
         self.rule_store = rule_store
         self.priority_tie_breaking = priority_tie_breaking
         self.max_evaluation_time_ms = max_evaluation_time_ms
         self.engine_version = engine_version
-        self.dsl_evaluator = DSLEvaluator()
-        self._rule_cache: Dict[RuleScope, RuleSet] = {}
-        self._inheritance_cache: Dict[str, Rule] = {}
-
-    async def evaluate_rules(self, context: RuleContext) -> RuleEvaluationSummary:
+        self.admission = AdmissionController(
+            max_concurrent=max_concurrent_evaluations,
+            max_queued=max_queued_evaluations,
+            timeout_ms=max_evaluation_time_ms,
+        )
+        self.enable_rule_index = enable_rule_index
+        self.timings = EvaluationTimings(timing_mode)
+        self.dsl_evaluator = DSLEvaluator(
+            cache_size=expression_cache_size,
+            regex_cache_size=regex_cache_size,
+            regex_max_input_length=regex_max_input_length,
+            regex_timeout_ms=regex_timeout_ms,
+        )
+        self.condition_compiler = ConditionCompiler(
+            self.dsl_evaluator, mode=evaluation_mode
+        )
+        self.selectivity = SelectivityTracker(
+            mode=condition_ordering,
+            sample_rate=condition_stats_sample_rate,
+            reorder_interval=condition_reorder_interval,
+            pinned_orders=pinned_condition_orders,
+        )
+        if matching_mode not in MATCHING_MODES:
+            raise ValueError(f"Unknown matching mode: {matching_mode}")
+        self.sessions: Optional[SessionMatcher] = None
+        if matching_mode == "incremental":
+            self.sessions = SessionMatcher(session_cache_size, session_ttl_seconds)
+        self.decision_cache: Optional[DecisionCache] = None
+        if decision_cache_mb > 0:
+            self.decision_cache = DecisionCache(decision_cache_mb * 1024 * 1024)
+        self.workers: Optional[ProcessPoolEvaluator] = None
+        if evaluation_workers > 0:
+            if self.sessions is not None:
+                raise ValueError(
+                    "Incremental matching keeps per-session state in this "
+                    "process and cannot be combined with evaluation workers"
+                )
+            self.workers = ProcessPoolEvaluator(
+                evaluation_workers,
+                worker_batch_size,
+                {
+                    "priority_tie_breaking": priority_tie_breaking,
+                    "engine_version": engine_version,
+                    "expression_cache_size": expression_cache_size,
+                    "regex_cache_size": regex_cache_size,
+                    "regex_max_input_length": regex_max_input_length,
+                    "regex_timeout_ms": regex_timeout_ms,
+                    "evaluation_mode": evaluation_mode,
+                    "enable_rule_index": enable_rule_index,
+                },
+                snapshots=tenant_snapshot_cache_size + 1,
+            )
+        self._snapshot: Optional[RulesetSnapshot] = None
+        self._snapshot_lock = asyncio.Lock()
+        self._snapshot_builds = 0
+        # Rules, parents and resolved rules from the last inheritance resolution
+        self._resolved: InheritanceMemo = {}
+        # Enabled rules shared by all tenants, by scope, as last loaded
+        self._shared_rules: Dict[RuleScope, List[Rule]] = {}
+        # (scope, tenant) -> (partition generation, enabled rules)
+        self._partitions: LRUCache[Tuple[Hashable, List[Rule]]] = LRUCache(
+            partition_cache_size
+        )
+        # (project_id, user_id) -> (shared snapshot, partition generations,
+        # snapshot with the tenants' rules)
+        self._tenant_snapshots: LRUCache[
+            Tuple[RulesetSnapshot, Tuple[Hashable, ...], RulesetSnapshot]
+        ] = LRUCache(tenant_snapshot_cache_size)
+
+    async def evaluate_rules(
+        self, context: RuleContext, verbosity: str = "full"
+    ) -> Union[RuleEvaluationSummary, RuleDecision]:
         """
         Evaluate all applicable rules against the given context.
-        """
-        start_time = time.time()
 
-        try:
-            # Load all applicable rules
-            applicable_rules = await self._get_applicable_rules(context)
+        `verbosity` selects how much of the result is built: "full" returns
+        a summary with a result for every rule, "matched" one with results
+        for the matched (and failed) rules only, and "decision" just the
+        final action and deciding rule.
 
-            # Evaluate each rule
-            results = []
-            for rule in applicable_rules:
-                result = await self._evaluate_rule(rule, context)
-                results.append(result)
+        Evaluations are subject to admission control: at most
+        `max_concurrent_evaluations` run at once, and each must finish within
+        `max_evaluation_time_ms`, including time spent queued but not time
+        spent loading or rebuilding the snapshot.
+        """
+        start_time = time.perf_counter_ns()
+        _check_verbosity(verbosity)
+
+        async with self.admission.admit() as deadline:
+            try:
+                snapshot = await self._load_snapshot(context, deadline)
+                return await self._evaluate(
+                    snapshot, context, start_time, deadline, False, verbosity
+                )
 
-            # Determine final action
-            final_action = self._determine_final_action(results)
+            except EvaluationTimeoutError:
+                raise
+            except Exception as e:
+                execution_time = (time.perf_counter_ns() - start_time) / 1e6
+                raise UnexpectedError(
+                    f"Rule evaluation failed after {execution_time:.2f}ms: {e}"
+                )
 
-            execution_time = (time.time() - start_time) * 1000
+    async def evaluate_decision(self, context: RuleContext) -> RuleDecision:
+        """
+        Evaluate rules in priority and tie-break order, stopping at the
+        first match: no lower-priority rule can change the final action.
+        Returns the decision and the deciding rule only.
+        """
+        start_time = time.perf_counter_ns()
 
-            return RuleEvaluationSummary(
-                context=context,
-                results=results,
-                final_action=final_action,
-                total_execution_time_ms=execution_time,
-                evaluated_at=datetime.utcnow().isoformat(),
-                applicable_rules_count=len(applicable_rules),
-                matched_rules_count=sum(1 for r in results if r.matched),
-            )
+        async with self.admission.admit() as deadline:
+            try:
+                snapshot = await self._load_snapshot(context, deadline)
+                return await self._evaluate(
+                    snapshot, context, start_time, deadline, True, "decision"
+                )
 
-        except Exception as e:
-            execution_time = (time.time() - start_time) * 1000
-            raise UnexpectedError(
-                f"Rule evaluation failed after {execution_time:.2f}ms: {e}"
-            )
+            except EvaluationTimeoutError:
+                raise
+            except Exception as e:
+                execution_time = (time.perf_counter_ns() - start_time) / 1e6
+                raise UnexpectedError(
+                    f"Rule evaluation failed after {execution_time:.2f}ms: {e}"
+                )
 
-    async def _get_applicable_rules(self, context: RuleContext) -> List[Rule]:
+    async def evaluate_rules_batch(
+        self,
+        contexts: Sequence[RuleContext],
+        decision_only: bool = False,
+        verbosity: str = "full",
+    ) -> List[Union[RuleEvaluationSummary, RuleDecision]]:
         """
-        Get all rules that should be evaluated for the given context.
-        Rules are ordered by scope hierarchy and priority.
+        Evaluate many contexts, each against the snapshot for its tenants,
+        loaded before any is evaluated. Returns one summary (or decision,
+        with `decision_only` or the "decision" verbosity) per context, in
+        order.
+
+        The batch takes one evaluation slot, and each context has its own
+        `max_evaluation_time_ms` budget, less the time the batch spent
+        queued.
         """
-        all_rules = []
-
-        # Load rules from all scopes in hierarchy order
-        for scope in [RuleScope.GLOBAL, RuleScope.PROJECT, RuleScope.INDIVIDUAL]:
-            ruleset = await self.rule_store.load_rules(scope)
+        start_time = time.perf_counter_ns()
+        _check_verbosity(verbosity)
+
+        async with self.admission.admit() as deadline:
+            try:
+                loaded = time.monotonic()
+                snapshots = [await self.get_snapshot(context) for context in contexts]
+                if deadline is not None:
+                    deadline.extend(time.monotonic() - loaded)
+                remaining_ms = deadline.remaining() * 1000 if deadline else None
+
+                def context_deadline() -> Optional[Deadline]:
+                    if deadline is None:
+                        return None
+                    return Deadline(deadline.budget_ms, remaining_ms)
+
+                if self.workers is not None:
+                    # Submitted together so the dispatcher can batch them
+                    evaluations = [
+                        self._evaluate(
+                            snapshot,
+                            context,
+                            time.perf_counter_ns(),
+                            context_deadline(),
+                            decision_only,
+                            verbosity,
+                        )
+                        for snapshot, context in zip(snapshots, contexts)
+                    ]
+                    return list(await asyncio.gather(*evaluations))
 
-            # Validate ruleset version
-            self._validate_ruleset_version(ruleset)
+                return [
+                    self.evaluate_snapshot(
+                        snapshot, context, decision_only, context_deadline(), verbosity
+                    )
+                    for snapshot, context in zip(snapshots, contexts)
+                ]
 
-            # Add enabled rules
-            scope_rules = [rule for rule in ruleset.rules if rule.enabled]
-            all_rules.extend(scope_rules)
+            except EvaluationTimeoutError:
+                raise
+            except Exception as e:
+                execution_time = (time.perf_counter_ns() - start_time) / 1e6
+                raise UnexpectedError(
+                    f"Batch rule evaluation failed after {execution_time:.2f}ms: {e}"
+                )
 
-        # Resolve inheritance
-        resolved_rules = await self._resolve_inheritance(all_rules)
+    async def _load_snapshot(
+        self, context: Optional[RuleContext], deadline: Optional[Deadline]
+    ) -> RulesetSnapshot:
+        """
+        Return the snapshot for a context. Loading and rebuilding it is
+        shared work that does not count against the request's deadline.
+        """
+        loaded = time.monotonic()
+        snapshot = await self.get_snapshot(context)
+        if deadline is not None:
+            deadline.extend(time.monotonic() - loaded)
+        return snapshot
 
-        # Sort by priority and tie-breaking
-        return self._sort_rules_by_priority(resolved_rules)
+    def evaluate_snapshot(
+        self,
+        snapshot: RulesetSnapshot,
+        context: RuleContext,
+        decision_only: bool = False,
+        deadline: Optional[Deadline] = None,
+        verbosity: str = "full",
+    ) -> Union[RuleEvaluationSummary, RuleDecision]:
+        """
+        Evaluate a context against a snapshot from `get_snapshot()`,
+        synchronously and in this process.
 
-    async def _evaluate_rule(
-        self, rule: Rule, context: RuleContext
-    ) -> RuleEvaluationResult:
+        This is the evaluation core behind the async API, which awaits
+        only to load the snapshot. Sync callers can hold on to a snapshot
+        and evaluate against it directly; admission control does not apply.
         """
-        Evaluate a single rule against the context.
+        start_time = time.perf_counter_ns()
+        outcome = self._cache_get(snapshot, context, decision_only)
+        if outcome is None:
+            outcome = self._compute(snapshot, context, decision_only, deadline)
+            self._cache_put(snapshot, context, decision_only, outcome)
+        return self._materialize(snapshot, context, outcome, start_time, verbosity)
+
+    async def _evaluate(
+        self,
+        snapshot: RulesetSnapshot,
+        context: RuleContext,
+        start_time: int,
+        deadline: Optional[Deadline],
+        decision_only: bool,
+        verbosity: str,
+    ) -> Union[RuleEvaluationSummary, RuleDecision]:
+        """
+        Evaluate one context in a worker process, or in this process
+        without workers.
         """
-        start_time = time.time()
+        if self.workers is None:
+            return self.evaluate_snapshot(
+                snapshot, context, decision_only, deadline, verbosity
+            )
 
-        try:
-            # Check if rule conditions match
-            matched = True
-            if rule.conditions:
-                for condition_name, condition_expr in rule.conditions.items():
-                    if isinstance(condition_expr, str):
-                        condition_matched = self.dsl_evaluator.evaluate(
-                            condition_expr, context
-                        )
-                        if not condition_matched:
-                            matched = False
-                            break
-                    elif isinstance(condition_expr, dict):
-                        # Handle complex condition objects
-                        matched = self._evaluate_complex_condition(
-                            condition_expr, context
-                        )
-                        if not matched:
-                            break
-
-            execution_time = (time.time() - start_time) * 1000
-
-            return RuleEvaluationResult(
-                rule_name=rule.name,
-                action=rule.action,
-                matched=matched,
-                parameters=rule.parameters.copy() if matched else {},
-                message=self._generate_rule_message(rule, matched),
-                priority=rule.priority,
-                execution_time_ms=execution_time,
+        outcome = self._cache_get(snapshot, context, decision_only)
+        if outcome is None:
+            outcome = await self.workers.evaluate(
+                snapshot, context, decision_only, deadline
             )
+            self._cache_put(snapshot, context, decision_only, outcome)
+        return self._materialize(snapshot, context, outcome, start_time, verbosity)
 
-        except Exception as e:
-            execution_time = (time.time() - start_time) * 1000
-            return RuleEvaluationResult(
-                rule_name=rule.name,
-                action=RuleAction.DENY,
-                matched=False,
-                parameters={},
-                message=f"Rule evaluation error: {e}",
-                priority=rule.priority,
-                execution_time_ms=execution_time,
+    def _compute(
+        self,
+        snapshot: RulesetSnapshot,
+        context: RuleContext,
+        decision_only: bool,
+        deadline: Optional[Deadline],
+    ) -> Union[CompactSummary, CompactDecision]:
+        if decision_only:
+            return self._evaluate_decision(snapshot, context, deadline)
+        return self._evaluate_summary(snapshot, context, deadline)
+
+    def _cache_get(
+        self, snapshot: RulesetSnapshot, context: RuleContext, decision_only: bool
+    ) -> Optional[Union[CompactSummary, CompactDecision]]:
+        if self.decision_cache is None:
+            return None
+        kind = "decision" if decision_only else "summary"
+        return self.decision_cache.get(snapshot, context, kind)
+
+    def _cache_put(
+        self,
+        snapshot: RulesetSnapshot,
+        context: RuleContext,
+        decision_only: bool,
+        outcome: Union[CompactSummary, CompactDecision],
+    ) -> None:
+        if self.decision_cache is not None:
+            kind = "decision" if decision_only else "summary"
+            self.decision_cache.put(snapshot, context, kind, outcome, outcome.nbytes)
+
+    def _evaluate_summary(
+        self,
+        snapshot: RulesetSnapshot,
+        context: RuleContext,
+        deadline: Optional[Deadline] = None,
+    ) -> CompactSummary:
+        ruleset = snapshot.ruleset
+
+        # Only rules whose indexed attribute matches the context can match
+        candidates = snapshot.index.candidates(context) if snapshot.index else None
+
+        # Follow-up evaluations in a session start from its previous state
+        match = None
+        if self.sessions is not None and context.session_id:
+            match = self.sessions.begin(
+                snapshot, context, partial(self.selectivity.new_memo, ruleset)
             )
 
-    def _evaluate_complex_condition(
-        self, condition: Dict[str, Any], context: RuleContext
-    ) -> bool:
+        # Evaluate each candidate rule, sharing predicate results between
+        # rules; the others cannot match
+        rules = ruleset.rules
+        memo = match.memo if match else self.selectivity.new_memo(ruleset)
+        timings = self.timings if self.timings.per_rule else None
+        outcomes: List[Outcome] = [False] * len(rules)
+        evaluated = 0
+        matched_count = 0
+        deciding_position = None
+        for position in range(len(rules)) if candidates is None else candidates:
+            if deadline is not None:
+                deadline.check()
+            if match is not None and match.reuses(position):
+                outcome = match.outcomes[position]
+            else:
+                compiled_rule = rules[position]
+                evaluated += 1
+                rule_start = time.perf_counter_ns() if timings is not None else 0
+                try:
+                    outcome = True if compiled_rule.matches(context, memo) else False
+                except Exception as e:
+                    outcome = str(e)
+                if timings is not None:
+                    timings.rule_histogram(compiled_rule.rule.name).record(
+                        time.perf_counter_ns() - rule_start
+                    )
+            if outcome is True:
+                # The first match in priority and tie-break order decides
+                if deciding_position is None:
+                    deciding_position = position
+                matched_count += 1
+            outcomes[position] = outcome
+
+        if match is None or match.full:
+            self.selectivity.observe(ruleset, memo)
+        if match is not None:
+            self.sessions.commit(match, outcomes)
+
+        return CompactSummary(outcomes, deciding_position, matched_count, evaluated)
+
+    def _evaluate_decision(
+        self,
+        snapshot: RulesetSnapshot,
+        context: RuleContext,
+        deadline: Optional[Deadline] = None,
+    ) -> CompactDecision:
+        ruleset = snapshot.ruleset
+        candidates = snapshot.index.candidates(context) if snapshot.index else None
+
+        rules = ruleset.rules
+        memo = self.selectivity.new_memo(ruleset)
+        timings = self.timings if self.timings.per_rule else None
+        deciding_position = None
+        evaluated = 0
+        for position in range(len(rules)) if candidates is None else candidates:
+            if deadline is not None:
+                deadline.check()
+            compiled_rule = rules[position]
+            evaluated += 1
+            rule_start = time.perf_counter_ns() if timings is not None else 0
+            try:
+                matched = compiled_rule.matches(context, memo)
+            except Exception:
+                # A failing rule does not match; the next one may decide
+                matched = False
+            if timings is not None:
+                timings.rule_histogram(compiled_rule.rule.name).record(
+                    time.perf_counter_ns() - rule_start
+                )
+            if matched:
+                deciding_position = position
+                break
+        self.selectivity.observe(ruleset, memo)
+
+        return CompactDecision(deciding_position, evaluated)
+
+    def _materialize(
+        self,
+        snapshot: RulesetSnapshot,
+        context: RuleContext,
+        outcome: Union[CompactSummary, CompactDecision],
+        start_time: int,
+        verbosity: str,
+    ) -> Union[RuleEvaluationSummary, RuleDecision]:
         """
-        Evaluate complex condition objects.
+        Build the pydantic result of an evaluation at the given verbosity.
+        Results are only built for the rules that verbosity reports.
         """
-        # Handle logical operators
-        if "and" in condition:
-            return all(
-                self._evaluate_condition_item(item, context)
-                for item in condition["and"]
-            )
-        elif "or" in condition:
-            return any(
-                self._evaluate_condition_item(item, context) for item in condition["or"]
+        total_time_ms = self._request_time_ms(start_time)
+        rules = snapshot.ruleset.rules
+        deciding_rule = None
+        final_action = RuleAction.ALLOW
+        if outcome.deciding_position is not None:
+            rule = rules[outcome.deciding_position].rule
+            deciding_rule = self._rule_result(rule, True)
+            final_action = rule.action
+
+        if isinstance(outcome, CompactDecision) or verbosity == "decision":
+            return RuleDecision(
+                context=context,
+                final_action=final_action,
+                deciding_rule=deciding_rule,
+                total_execution_time_ms=total_time_ms,
+                evaluated_at=datetime.utcnow().isoformat(),
+                applicable_rules_count=len(rules),
+                evaluated_rules_count=outcome.evaluated_count,
             )
-        elif "not" in condition:
-            return not self._evaluate_condition_item(condition["not"], context)
-        else:
-            return self._evaluate_condition_item(condition, context)
 
-    def _evaluate_condition_item(self, item: Any, context: RuleContext) -> bool:
+        if verbosity == "full":
+            results = [
+                self._rule_result(compiled_rule.rule, rule_outcome)
+                for compiled_rule, rule_outcome in zip(rules, outcome.outcomes)
+            ]
+        else:
+            # Failed rules are reported along with the matched ones
+            results = [
+                self._rule_result(rules[position].rule, rule_outcome)
+                for position, rule_outcome in enumerate(outcome.outcomes)
+                if rule_outcome is not False
+            ]
+
+        return RuleEvaluationSummary(
+            context=context,
+            results=results,
+            final_action=final_action,
+            total_execution_time_ms=total_time_ms,
+            evaluated_at=datetime.utcnow().isoformat(),
+            applicable_rules_count=len(rules),
+            matched_rules_count=outcome.matched_count,
+        )
+
+    def _request_time_ms(self, start_time: int) -> Optional[float]:
         """
-        Evaluate a single condition item.
+        Record the time since `start_time` (from perf_counter_ns) and return
+        it in ms, or None when request timing is off.
         """
-        if isinstance(item, str):
-            return self.dsl_evaluator.evaluate(item, context)
-        elif isinstance(item, dict):
-            return self._evaluate_complex_condition(item, context)
-        else:
-            return bool(item)
+        if not self.timings.per_request:
+            return None
+        elapsed = time.perf_counter_ns() - start_time
+        self.timings.requests.record(elapsed)
+        return elapsed / 1e6
 
-    async def _resolve_inheritance(self, rules: List[Rule]) -> List[Rule]:
+    def _rule_result(self, rule: Rule, outcome: Outcome) -> Dict[str, Any]:
         """
-        Resolve rule inheritance and detect circular dependencies.
+        Build the fields of one rule's RuleEvaluationResult from its compact
+        outcome. They are validated in bulk with the enclosing model.
         """
-        rule_map = {rule.name: rule for rule in rules}
-        resolved_rules = []
-        visited = set()
+        if isinstance(outcome, str):
+            return {
+                "rule_name": rule.name,
+                "action": RuleAction.DENY,
+                "matched": False,
+                "parameters": {},
+                "message": f"Rule evaluation error: {outcome}",
+                "priority": rule.priority,
+            }
+
+        return {
+            "rule_name": rule.name,
+            "action": rule.action,
+            "matched": outcome,
+            "parameters": rule.parameters.copy() if outcome else {},
+            "message": self._generate_rule_message(rule, outcome),
+            "priority": rule.priority,
+        }
+
+    async def evaluate_columns(
+        self, contexts: Union[ColumnarContexts, Sequence[RuleContext]]
+    ) -> BatchEvaluationResult:
+        """
+        Evaluate all applicable rules against a batch of contexts at once.
+
+        Contexts are given as columns (see ColumnarContexts) or as a list of
+        RuleContext objects, which are transposed first. Each predicate is
+        evaluated once over the whole batch instead of once per context.
+        Rows are grouped by their `project_id` and `user_id` columns, and
+        rows whose tenants have rules of their own are evaluated as a
+        separate batch against their tenant snapshot.
 
-        for rule in rules:
-            if rule.name not in visited:
-                resolved_rule = await self._resolve_rule_inheritance(
-                    rule, rule_map, set()
+        The batch is subject to admission control like single evaluations,
+        with its deadline checked between rules.
+        """
+        start_time = time.perf_counter_ns()
+
+        async with self.admission.admit() as deadline:
+            try:
+                if not isinstance(contexts, ColumnarContexts):
+                    contexts = ColumnarContexts.from_contexts(contexts)
+
+                groups = await self._tenant_groups(contexts, deadline)
+                if len(groups) <= 1:
+                    if groups:
+                        snapshot = groups[0][0]
+                    else:
+                        snapshot = await self._load_snapshot(None, deadline)
+                    return BatchEvaluator(snapshot.ruleset).evaluate(contexts, deadline)
+
+                return BatchEvaluationResult.merge(
+                    contexts.size,
+                    [
+                        (
+                            rows,
+                            BatchEvaluator(snapshot.ruleset).evaluate(
+                                contexts.take(rows), deadline
+                            ),
+                        )
+                        for snapshot, rows in groups
+                    ],
                 )
-                resolved_rules.append(resolved_rule)
-                visited.add(rule.name)
 
-        return resolved_rules
+            except EvaluationTimeoutError:
+                raise
+            except Exception as e:
+                execution_time = (time.perf_counter_ns() - start_time) / 1e6
+                raise UnexpectedError(
+                    f"Batch rule evaluation failed after {execution_time:.2f}ms: {e}"
+                )
 
-    async def _resolve_rule_inheritance(
-        self, rule: Rule, rule_map: Dict[str, Rule], current_path: Set[str]
-    ) -> Rule:
+    async def _tenant_groups(
+        self, contexts: ColumnarContexts, deadline: Optional[Deadline] = None
+    ) -> List[Tuple[RulesetSnapshot, List[int]]]:
         """
-        Resolve inheritance for a single rule.
+        Group the rows of a batch by the snapshot of their tenants.
         """
-        if rule.name in current_path:
-            chain = " -> ".join(current_path) + f" -> {rule.name}"
-            raise CircularInheritanceError(chain)
-
-        if not rule.inherits_from and not rule.parent_rule:
-            return rule
+        tenants: Dict[Tuple[Any, ...], List[int]] = {}
+        columns = [contexts.column(attribute) for _, attribute in TENANT_KEYS]
+        for row, key in enumerate(zip(*columns)):
+            tenants.setdefault(key, []).append(row)
+
+        groups: Dict[int, Tuple[RulesetSnapshot, List[int]]] = {}
+        for key, rows in tenants.items():
+            tenant = RuleContext(
+                **{attribute: value for (_, attribute), value in zip(TENANT_KEYS, key)}
+            )
+            snapshot = await self._load_snapshot(tenant, deadline)
+            groups.setdefault(snapshot.id, (snapshot, []))[1].extend(rows)
+        return [(snapshot, sorted(rows)) for snapshot, rows in groups.values()]
 
-        current_path.add(rule.name)
-        resolved_rule = rule.model_copy(deep=True)
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache and condition ordering statistics.
+        """
+        snapshot = self._snapshot
+        return {
+            "evaluation_mode": self.condition_compiler.mode,
+            "snapshot": {
+                "builds": self._snapshot_builds,
+                **(snapshot.ruleset.stats() if snapshot else {}),
+            },
+            "rule_index": (
+                snapshot.index.stats() if snapshot and snapshot.index else None
+            ),
+            "expression_cache": self.dsl_evaluator.cache_stats(),
+            "pattern_cache": self.dsl_evaluator.patterns.stats(),
+            "condition_ordering": self.selectivity.stats(),
+            "sessions": self.sessions.stats() if self.sessions else None,
+            "admission": self.admission.stats(),
+            "workers": self.workers.stats() if self.workers else None,
+            "decision_cache": (
+                self.decision_cache.stats() if self.decision_cache else None
+            ),
+            "timing": self.timings.stats(),
+            "tenants": {
+                "partitions": self._partitions.stats(),
+                "snapshots": self._tenant_snapshots.stats(),
+            },
+        }
+
+    async def get_snapshot(
+        self, context: Optional[RuleContext] = None
+    ) -> RulesetSnapshot:
+        """
+        Return the compiled snapshot of the rules applicable to a context:
+        the shared rules of every scope plus the rules limited to the
+        context's project and user. Without a context, or when neither has
+        rules of its own, this is the snapshot of the shared rules.
+
+        Snapshots are rebuilt only when the store's generations or the
+        condition orders changed. This is the only part of an evaluation
+        that awaits.
+        """
+        snapshot = await self._get_shared_snapshot()
+        if context is None:
+            return snapshot
+
+        partitions = await self._load_partitions(context)
+        if not any(rules for _, rules in partitions):
+            return snapshot
+
+        key = tuple(getattr(context, attribute) for _, attribute in TENANT_KEYS)
+        generations = tuple(generation for generation, _ in partitions)
+        cached = self._tenant_snapshots.get(key)
+        if (
+            cached is not None
+            and cached[0] is snapshot
+            and cached[1] == generations
+            and None not in generations
+        ):
+            return cached[2]
+
+        tenant_snapshot = self._build_tenant_snapshot(
+            snapshot, [rules for _, rules in partitions]
+        )
+        self._tenant_snapshots.put(key, (snapshot, generations, tenant_snapshot))
+        return tenant_snapshot
+
+    async def _get_shared_snapshot(self) -> RulesetSnapshot:
+        generation = await self.rule_store.generation()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.is_current(
+            generation, self.selectivity.version
+        ):
+            return snapshot
+
+        async with self._snapshot_lock:
+            # Another request may have rebuilt it while we waited
+            snapshot = self._snapshot
+            ordering_version = self.selectivity.version
+            if snapshot is not None and snapshot.is_current(
+                generation, ordering_version
+            ):
+                return snapshot
+
+            # Stamped with the generation read before loading: a concurrent
+            # write makes the next request rebuild rather than be missed
+            applicable_rules = await self._get_applicable_rules()
+            snapshot = self._build_snapshot(
+                applicable_rules, generation, ordering_version, self._snapshot
+            )
+            self._snapshot = snapshot
+            self._snapshot_builds += 1
+            return snapshot
 
-        # Handle parent_rule (single inheritance)
-        if rule.parent_rule and rule.parent_rule in rule_map:
-            parent = await self._resolve_rule_inheritance(
-                rule_map[rule.parent_rule], rule_map, current_path
+    async def _load_partitions(
+        self, context: RuleContext
+    ) -> List[Tuple[Optional[Hashable], List[Rule]]]:
+        """
+        Return the generation and enabled rules of the context's project
+        and user partitions, loading those not cached or changed since.
+        """
+        partitions = []
+        for scope, attribute in TENANT_KEYS:
+            tenant = getattr(context, attribute)
+            if tenant is None:
+                # No tenant, nothing to load or invalidate
+                partitions.append(((), []))
+                continue
+
+            generation = await self.rule_store.partition_generation(scope, tenant)
+            cached = self._partitions.get((scope, tenant))
+            if cached is None or generation is None or cached[0] != generation:
+                ruleset = await self.rule_store.load_rules(scope, tenant)
+                self._validate_ruleset_version(ruleset)
+                cached = (generation, [rule for rule in ruleset.rules if rule.enabled])
+                self._partitions.put((scope, tenant), cached)
+            partitions.append(cached)
+        return partitions
+
+    def _build_tenant_snapshot(
+        self, shared: RulesetSnapshot, partitions: List[List[Rule]]
+    ) -> RulesetSnapshot:
+        """
+        Compile the shared rules with the rules of the context's tenants.
+        The shared rules are carried over from the shared snapshot.
+        """
+        all_rules = list(self._shared_rules.get(RuleScope.GLOBAL, ()))
+        for (scope, _), tenant_rules in zip(TENANT_KEYS, partitions):
+            all_rules.extend(self._shared_rules.get(scope, ()))
+            all_rules.extend(tenant_rules)
+
+        # Resolved against a copy so the shared memo is kept for the next
+        # shared rebuild
+        resolved_rules = resolve_inheritance(
+            all_rules, self._merge_rules, dict(self._resolved)
+        )
+        return self._build_snapshot(
+            self._sort_rules_by_priority(resolved_rules),
+            shared.generation,
+            shared.ordering_version,
+            shared,
+        )
+
+    def _build_snapshot(
+        self,
+        rules: List[Rule],
+        generation: Optional[Hashable],
+        ordering_version: int,
+        previous: Optional[RulesetSnapshot] = None,
+    ) -> RulesetSnapshot:
+        """
+        Compile resolved and sorted rules into a snapshot. Rules unchanged
+        since the `previous` snapshot are carried over without recompiling.
+        """
+        ruleset = CompiledRuleset(
+            rules,
+            self.condition_compiler,
+            orders=self.selectivity.order_for,
+            previous=previous.ruleset if previous else None,
+        )
+        index = None
+        if self.enable_rule_index:
+            index = DiscriminationIndex(
+                ruleset.rules, previous.index if previous else None
             )
-            resolved_rule = self._merge_rules(parent, resolved_rule)
-
-        # Handle inherits_from (multiple inheritance)
-        if rule.inherits_from:
-            for inherited_rule_name in rule.inherits_from:
-                if inherited_rule_name in rule_map:
-                    inherited_rule = await self._resolve_rule_inheritance(
-                        rule_map[inherited_rule_name], rule_map, current_path
-                    )
-                    resolved_rule = self._merge_rules(inherited_rule, resolved_rule)
+        return RulesetSnapshot(generation, ordering_version, ruleset, index)
+
+    def close(self) -> None:
+        """
+        Stop the evaluation worker processes, if any.
+        """
+        if self.workers is not None:
+            self.workers.shutdown()
+
+    def invalidate(self) -> None:
+        """
+        Drop the compiled snapshot; the next evaluation reloads the rules
+        and recompiles all of them.
+        """
+        self._snapshot = None
+        self._resolved.clear()
+        self._partitions.clear()
+        self._tenant_snapshots.clear()
+
+    async def _get_applicable_rules(self) -> List[Rule]:
+        """
+        Get all rules shared by every tenant.
+        Rules are ordered by scope hierarchy and priority.
+        """
+        all_rules = []
+        shared_rules = {}
+
+        # Load rules from all scopes in hierarchy order
+        for scope in [RuleScope.GLOBAL, RuleScope.PROJECT, RuleScope.INDIVIDUAL]:
+            ruleset = await self.rule_store.load_rules(scope)
+
+            # Validate ruleset version
+            self._validate_ruleset_version(ruleset)
+
+            # Add enabled rules
+            scope_rules = [rule for rule in ruleset.rules if rule.enabled]
+            shared_rules[scope] = scope_rules
+            all_rules.extend(scope_rules)
+        self._shared_rules = shared_rules
+
+        # Resolve inheritance
+        resolved_rules = resolve_inheritance(
+            all_rules, self._merge_rules, self._resolved
+        )
 
-        current_path.remove(rule.name)
-        return resolved_rule
+        # Sort by priority and tie-breaking
+        return self._sort_rules_by_priority(resolved_rules)
 
     def _merge_rules(self, base_rule: Rule, derived_rule: Rule) -> Rule:
         """
         Merge a derived rule with its base rule.
         Derived rule takes precedence.
+
+        Neither rule is modified; the merged rule shares the values it does
+        not override with the base rule.
         """
-        merged = base_rule.model_copy(deep=True)
+        update: Dict[str, Any] = {}
 
         # Override with derived rule values
         if derived_rule.name:
-            merged.name = derived_rule.name
+            update["name"] = derived_rule.name
         if derived_rule.scope:
-            merged.scope = derived_rule.scope
+            update["scope"] = derived_rule.scope
         if derived_rule.priority != 50:  # 50 is default
-            merged.priority = derived_rule.priority
+            update["priority"] = derived_rule.priority
         if derived_rule.action:
-            merged.action = derived_rule.action
+            update["action"] = derived_rule.action
         if derived_rule.description:
-            merged.description = derived_rule.description
+            update["description"] = derived_rule.description
 
         # Merge conditions and parameters
-        merged.conditions.update(derived_rule.conditions)
-        merged.parameters.update(derived_rule.parameters)
+        if derived_rule.conditions:
+            update["conditions"] = {**base_rule.conditions, **derived_rule.conditions}
+        if derived_rule.parameters:
+            update["parameters"] = {**base_rule.parameters, **derived_rule.parameters}
 
-        return merged
+        return base_rule.model_copy(update=update)
 
     def _sort_rules_by_priority(self, rules: List[Rule]) -> List[Rule]:
         """
@@ -278,40 +879,6 @@ class RuleEngine:
 
         return sorted(rules, key=sort_key)
 
-    def _determine_final_action(
-        self, results: List[RuleEvaluationResult]
-    ) -> RuleAction:
-        """
-        Determine the final action based on rule evaluation results.
-        """
-        if not results:
-            return RuleAction.ALLOW
-
-        # Find highest priority matched rule
-        matched_results = [r for r in results if r.matched]
-        if not matched_results:
-            return RuleAction.ALLOW
-
-        # Sort by priority (highest first)
-        matched_results.sort(key=lambda r: r.priority, reverse=True)
-
-        # Handle priority conflicts
-        highest_priority = matched_results[0].priority
-        highest_priority_results = [
-            r for r in matched_results if r.priority == highest_priority
-        ]
-
-        if len(highest_priority_results) > 1:
-            if self.priority_tie_breaking == PriorityTieBreaking.FIRST_WINS:
-                return highest_priority_results[0].action
-            elif self.priority_tie_breaking == PriorityTieBreaking.LEXICOGRAPHIC:
-                highest_priority_results.sort(key=lambda r: r.rule_name)
-                return highest_priority_results[0].action
-            else:  # FIFO
-                return highest_priority_results[0].action
-
-        return matched_results[0].action
-
     def _generate_rule_message(self, rule: Rule, matched: bool) -> str:
         """
         Generate a descriptive message for the rule evaluation result.
@@ -339,3 +906,8 @@ class RuleEngine:
             if isinstance(e, InvalidRulesetVersionError):
                 raise
             # If semver parsing fails, just log and continue
+
+
+def _check_verbosity(verbosity: str) -> None:
+    if verbosity not in VERBOSITY_LEVELS:
+        raise ValueError(f"Unknown verbosity: {verbosity}")
@@ -0,0 +1,256 @@
+import copy
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .dsl import (
+    And,
+    Comparison,
+    ListExpr,
+    Membership,
+    Node,
+    Not,
+    Or,
+    RegexMatch,
+    Variable,
+)
+from .ruleset import RulesetSnapshot
+from .results import Outcome
+from ..models.base import RuleContext
+from ..utils.cache import LRUCache
+
+MATCHING_MODES = ("stateless", "incremental")
+
+_SCALAR_FIELDS = tuple(
+    name for name in RuleContext.model_fields if name != "custom_attributes"
+)
+_MISSING = object()
+
+
+class MatchNetwork:
+    """
+    Which rules depend on which context attributes, through the predicates
+    of a snapshot.
+
+    Attributes are RuleContext field names and `custom_attributes.<key>`
+    for custom attributes. Predicates whose variables cannot be traced to
+    attributes are volatile and re-evaluated on every request.
+    """
+
+    def __init__(self, snapshot: RulesetSnapshot):
+        ruleset = snapshot.ruleset
+        slot_count = len(ruleset.predicates)
+        self.slot_rules: List[List[int]] = [[] for _ in range(slot_count)]
+        self.dependents: Dict[str, Set[int]] = {}
+        self.volatile: Set[int] = set()
+
+        seen: Set[int] = set()
+        for position, compiled_rule in enumerate(ruleset.rules):
+            conditions = compiled_rule.conditions
+            if conditions is None:
+                continue
+            for slot, atom in zip(compiled_rule.slots, conditions.atoms):
+                self.slot_rules[slot].append(position)
+                if slot in seen:
+                    continue
+                seen.add(slot)
+                attributes = predicate_dependencies(atom)
+                if attributes is None:
+                    self.volatile.add(slot)
+                    continue
+                for attribute in attributes:
+                    self.dependents.setdefault(attribute, set()).add(slot)
+
+    def dirty_slots(self, changed: Set[str]) -> Set[int]:
+        slots = set(self.volatile)
+        for attribute in changed:
+            slots.update(self.dependents.get(attribute, ()))
+        return slots
+
+    def dirty_rules(self, slots: Set[int]) -> Set[int]:
+        positions: Set[int] = set()
+        for slot in slots:
+            positions.update(self.slot_rules[slot])
+        return positions
+
+
+class SessionMatch:
+    """
+    The state of one evaluation in a session: the predicate memo (alpha
+    memory) and the previous rule outcomes (beta memory). Rules outside
+    `dirty` keep their previous outcome.
+    """
+
+    __slots__ = (
+        "session_id",
+        "snapshot",
+        "attributes",
+        "memo",
+        "outcomes",
+        "dirty",
+    )
+
+    def __init__(
+        self,
+        session_id: str,
+        snapshot: RulesetSnapshot,
+        attributes: Dict[str, Any],
+        memo: List[Any],
+        outcomes: Optional[List[Outcome]] = None,
+        dirty: Optional[Set[int]] = None,
+    ):
+        self.session_id = session_id
+        self.snapshot = snapshot
+        self.attributes = attributes
+        self.memo = memo
+        self.outcomes = outcomes
+        self.dirty = dirty
+
+    @property
+    def full(self) -> bool:
+        return self.dirty is None
+
+    def reuses(self, position: int) -> bool:
+        return self.dirty is not None and position not in self.dirty
+
+
+class SessionMatcher:
+    """
+    Keeps per-session match state so follow-up evaluations in a session
+    only re-evaluate the predicates and rules that depend on attributes
+    that changed. Sessions are evicted by LRU and after `ttl_seconds`
+    without an evaluation.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 1800):
+        self._sessions: LRUCache[SessionMatch] = LRUCache(max_sessions, ttl=ttl_seconds)
+        self._network: Optional[MatchNetwork] = None
+        self._network_snapshot: Optional[RulesetSnapshot] = None
+        self.full_evaluations = 0
+        self.incremental_evaluations = 0
+        self.rules_reused = 0
+
+    def begin(
+        self,
+        snapshot: RulesetSnapshot,
+        context: RuleContext,
+        new_memo: Optional[Callable[[], List[Any]]] = None,
+    ) -> SessionMatch:
+        """
+        Start an evaluation of a session. A full evaluation starts from a
+        memo from `new_memo`, by default an empty memo of the snapshot.
+        """
+        session_id = context.session_id or ""
+        attributes = _attributes(context)
+
+        # Take the session out while it is evaluated; a concurrent request
+        # for the same session starts from scratch instead of sharing it
+        previous = self._sessions.pop(session_id)
+        if (
+            previous is None
+            or previous.snapshot is not snapshot
+            or previous.outcomes is None
+        ):
+            self.full_evaluations += 1
+            memo = new_memo() if new_memo else snapshot.ruleset.new_memo()
+            return SessionMatch(session_id, snapshot, attributes, memo)
+
+        network = self._get_network(snapshot)
+        slots = network.dirty_slots(_changed(previous.attributes, attributes))
+        memo = previous.memo
+        for slot in slots:
+            memo[slot] = None
+        dirty = network.dirty_rules(slots)
+
+        self.incremental_evaluations += 1
+        self.rules_reused += len(snapshot.ruleset.rules) - len(dirty)
+        return SessionMatch(
+            session_id, snapshot, attributes, memo, previous.outcomes, dirty
+        )
+
+    def commit(self, match: SessionMatch, outcomes: List[Outcome]) -> None:
+        match.outcomes = outcomes
+        match.dirty = None
+        self._sessions.put(match.session_id, match)
+
+    def discard(self, session_id: str) -> None:
+        self._sessions.pop(session_id)
+
+    def _get_network(self, snapshot: RulesetSnapshot) -> MatchNetwork:
+        if self._network_snapshot is not snapshot or self._network is None:
+            self._network = MatchNetwork(snapshot)
+            self._network_snapshot = snapshot
+        return self._network
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": self._sessions.stats(),
+            "full_evaluations": self.full_evaluations,
+            "incremental_evaluations": self.incremental_evaluations,
+            "rules_reused": self.rules_reused,
+        }
+
+
+def _attributes(context: RuleContext) -> Dict[str, Any]:
+    attributes = {name: getattr(context, name) for name in _SCALAR_FIELDS}
+    for key, value in context.custom_attributes.items():
+        attributes[f"custom_attributes.{key}"] = value
+    # Copied so later in-place changes to the context are still detected
+    return copy.deepcopy(attributes)
+
+
+def _changed(previous: Dict[str, Any], current: Dict[str, Any]) -> Set[str]:
+    changed = set()
+    for attribute in previous.keys() | current.keys():
+        old = previous.get(attribute, _MISSING)
+        new = current.get(attribute, _MISSING)
+        try:
+            if old is new or old == new:
+                continue
+        except Exception:
+            pass
+        changed.add(attribute)
+    return changed
+
+
+def predicate_dependencies(node: Node) -> Optional[Set[str]]:
+    """
+    Return the attributes a predicate reads, or None if unknown.
+    """
+    if isinstance(node, Variable):
+        return _variable_dependencies(node)
+
+    if isinstance(node, Comparison):
+        children: List[Node] = [node.left, node.right]
+    elif isinstance(node, (RegexMatch, Membership)):
+        children = [node.left]
+    elif isinstance(node, Not):
+        children = [node.operand]
+    elif isinstance(node, (And, Or)):
+        children = list(node.operands)
+    elif isinstance(node, ListExpr):
+        children = list(node.items)
+    else:
+        # Literals read nothing
+        return set()
+
+    attributes: Set[str] = set()
+    for child in children:
+        child_attributes = predicate_dependencies(child)
+        if child_attributes is None:
+            return None
+        attributes |= child_attributes
+    return attributes
+
+
+def _variable_dependencies(variable: Variable) -> Optional[Set[str]]:
+    name = variable.name
+    if variable.kind == "field":
+        return {name}
+    if variable.kind == "custom":
+        return {f"custom_attributes.{name}"}
+    if variable.kind == "path":
+        # A custom attribute literally named `name` is checked first
+        head, first = name.split(".")[:2]
+        if head == "custom_attributes":
+            return {f"custom_attributes.{name}", f"custom_attributes.{first}"}
+        return {f"custom_attributes.{name}", head}
+    return None
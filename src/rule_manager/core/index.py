@@ -0,0 +1,168 @@
+import itertools
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .dsl import And, Comparison, Literal, Membership, Node, Or, Variable
+from .ruleset import CompiledRule
+from ..models.base import RuleContext
+
+# (variable, values): the rule can only match if the variable equals one of
+# the values
+Requirement = Tuple[Variable, FrozenSet[Any]]
+
+
+class DiscriminationIndex:
+    """
+    Hash index from attribute values to the rules that require them.
+
+    A rule is indexed on one equality (`model_name == 'gpt-4'`) or
+    membership (`project_id in ['a', 'b']`) test that every match must
+    satisfy: a top-level condition or one operand of a top-level `and`.
+    When a rule has several, the attribute with the most distinct values
+    across the ruleset is used. Rules without one are residual and always
+    evaluated.
+
+    Requirements of compiled rules carried over from the `previous` index's
+    ruleset are reused rather than extracted again.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[CompiledRule],
+        previous: Optional["DiscriminationIndex"] = None,
+    ):
+        known: Dict[int, List[Requirement]] = {}
+        if previous is not None:
+            known = {
+                id(rule): requirements
+                for rule, requirements in zip(previous._rules, previous._options)
+            }
+        options = []
+        for rule in rules:
+            requirements = known.get(id(rule))
+            if requirements is None:
+                requirements = _requirements(rule)
+            options.append(requirements)
+        self._rules = rules
+        self._options = options
+
+        distinct: Dict[str, Set[Any]] = {}
+        for requirements in options:
+            for variable, values in requirements:
+                distinct.setdefault(variable.name, set()).update(values)
+
+        self._getters: Dict[str, Callable[[RuleContext], Any]] = {}
+        self._buckets: Dict[str, Dict[Any, List[int]]] = {}
+        self._indexed: Dict[str, List[int]] = {}
+        residual: List[int] = []
+
+        for position, requirements in enumerate(options):
+            if not requirements:
+                residual.append(position)
+                continue
+
+            variable, values = max(
+                requirements,
+                key=lambda r: (len(distinct[r[0].name]), -len(r[1])),
+            )
+            name = variable.name
+            self._getters.setdefault(name, variable.get)
+            buckets = self._buckets.setdefault(name, {})
+            for value in values:
+                buckets.setdefault(value, []).append(position)
+            self._indexed.setdefault(name, []).append(position)
+
+        self.residual = tuple(residual)
+        self.size = len(rules)
+
+    def candidates(self, context: RuleContext) -> Sequence[int]:
+        """
+        Return the positions of the rules that may match a context, in
+        ascending order.
+        """
+        # Every rule is in at most one of these lists, each sorted
+        matched: List[Sequence[int]] = []
+        for name, getter in self._getters.items():
+            value = getter(context)
+            try:
+                bucket = self._buckets[name].get(value)
+            except TypeError:
+                # Unhashable value: leave the decision to the conditions
+                matched.append(self._indexed[name])
+                continue
+            if bucket:
+                matched.append(bucket)
+        if not matched:
+            return self.residual
+        return sorted(itertools.chain(self.residual, *matched))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rules": self.size,
+            "residual_rules": len(self.residual),
+            "indexed_attributes": {
+                name: len(buckets) for name, buckets in self._buckets.items()
+            },
+        }
+
+
+def _requirements(rule: CompiledRule) -> List[Requirement]:
+    conditions = rule.conditions
+    if conditions is None or conditions.root is None:
+        return []
+
+    requirements = []
+    for _, node in conditions.conjuncts:
+        operands = node.operands if isinstance(node, And) else (node,)
+        for operand in operands:
+            requirement = _requirement(operand)
+            if requirement is not None:
+                requirements.append(requirement)
+    return requirements
+
+
+def _requirement(node: Node) -> Optional[Requirement]:
+    if isinstance(node, Comparison) and node.operator == "==":
+        if isinstance(node.left, Variable) and isinstance(node.right, Literal):
+            variable, literal = node.left, node.right.value
+        elif isinstance(node.right, Variable) and isinstance(node.left, Literal):
+            variable, literal = node.right, node.left.value
+        else:
+            return None
+        try:
+            return variable, frozenset((literal,))
+        except TypeError:
+            return None
+
+    if (
+        isinstance(node, Membership)
+        and node.operator == "in"
+        and isinstance(node.left, Variable)
+    ):
+        return node.left, node.values
+
+    if isinstance(node, Or) and node.operands:
+        # a == 'x' or a in ['y', 'z'] on a single variable
+        variable: Optional[Variable] = None
+        values: Set[Any] = set()
+        for operand in node.operands:
+            requirement = _requirement(operand)
+            if requirement is None:
+                return None
+            if variable is not None and requirement[0].name != variable.name:
+                return None
+            variable = requirement[0]
+            values.update(requirement[1])
+        if variable is not None:
+            return variable, frozenset(values)
+
+    return None
@@ -0,0 +1,146 @@
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .ruleset import same_definition
+from ..models.base import Rule
+from ..models.errors import CircularInheritanceError
+
+# Name -> (rule, names of its parents, resolved rule) of a resolution
+InheritanceMemo = Dict[str, Tuple[Rule, List[str], Rule]]
+
+
+class InheritanceGraph:
+    """
+    The `parent_rule` and `inherits_from` edges between rules, by name.
+
+    A name defined more than once refers to its last definition, and
+    references to names that are not defined are ignored.
+    """
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rule_map: Dict[str, Rule] = {rule.name: rule for rule in rules}
+        self.parents: Dict[str, List[str]] = {
+            name: self.parents_of(rule) for name, rule in self.rule_map.items()
+        }
+
+    def parents_of(self, rule: Rule) -> List[str]:
+        """Return the rule's parents in merge order."""
+        parents = []
+        if rule.parent_rule and rule.parent_rule in self.rule_map:
+            parents.append(rule.parent_rule)
+        for name in rule.inherits_from or ():
+            if name in self.rule_map:
+                parents.append(name)
+        return parents
+
+    def order(self) -> List[str]:
+        """
+        Return every rule name after all of its ancestors.
+
+        Raises CircularInheritanceError with the full chain, from the
+        first rule of the cycle through its ancestors back to itself.
+        """
+        done: Set[str] = set()
+        order: List[str] = []
+        for root in self.rule_map:
+            if root in done:
+                continue
+
+            # Iterative depth-first search; `path` is the current chain
+            path = [root]
+            on_path = {root}
+            stack: List[Tuple[str, Iterator[str]]] = [(root, iter(self.parents[root]))]
+            while stack:
+                name, parents = stack[-1]
+                for parent in parents:
+                    if parent in on_path:
+                        chain = path[path.index(parent) :] + [parent]
+                        raise CircularInheritanceError(" -> ".join(chain))
+                    if parent not in done:
+                        path.append(parent)
+                        on_path.add(parent)
+                        stack.append((parent, iter(self.parents[parent])))
+                        break
+                else:
+                    stack.pop()
+                    path.pop()
+                    on_path.discard(name)
+                    done.add(name)
+                    order.append(name)
+        return order
+
+
+def resolve_inheritance(
+    rules: Sequence[Rule],
+    merge: Callable[[Rule, Rule], Rule],
+    memo: Optional[InheritanceMemo] = None,
+) -> List[Rule]:
+    """
+    Resolve the inheritance of `rules`, keeping the first rule of each name.
+
+    Rules are resolved in topological order and each one exactly once, so
+    a shared ancestor is merged into each descendant from its single
+    resolved form. `merge(base, derived)` must not modify its arguments;
+    resolved rules may share unchanged structures with the rules they were
+    merged from.
+
+    `memo` holds each rule, its parents and its resolved form from the
+    previous call and is updated in place. A rule with the same definition
+    and the same parents as before whose parents are all unchanged keeps
+    its previous resolved object, so an edit re-resolves only the edited
+    rule and its descendants. Parents are compared as well because a
+    deleted or disabled parent drops out of the graph without changing
+    the rules that referenced it.
+    """
+    graph = InheritanceGraph(rules)
+    previous = memo or {}
+    resolved: Dict[str, Rule] = {}
+    changed: Set[str] = set()
+    for name in graph.order():
+        rule = graph.rule_map[name]
+        entry = previous.get(name)
+        parents = graph.parents[name]
+        if (
+            entry is not None
+            and same_definition(entry[0], rule)
+            and entry[1] == parents
+            and not changed.intersection(parents)
+        ):
+            resolved[name] = entry[2]
+            continue
+        resolved[name] = _resolve_rule(graph, rule, resolved, merge)
+        changed.add(name)
+
+    if memo is not None:
+        memo.clear()
+        memo.update(
+            (name, (graph.rule_map[name], graph.parents[name], rule))
+            for name, rule in resolved.items()
+        )
+
+    result = []
+    seen: Set[str] = set()
+    for rule in rules:
+        if rule.name in seen:
+            continue
+        seen.add(rule.name)
+        if rule is graph.rule_map[rule.name]:
+            result.append(resolved[rule.name])
+        else:
+            # Shadowed by a later rule of the same name in the graph
+            result.append(_resolve_rule(graph, rule, resolved, merge))
+    return result
+
+
+def _resolve_rule(
+    graph: InheritanceGraph,
+    rule: Rule,
+    resolved: Dict[str, Rule],
+    merge: Callable[[Rule, Rule], Rule],
+) -> Rule:
+    if not rule.inherits_from and not rule.parent_rule:
+        return rule
+
+    resolved_rule = rule
+    for parent in graph.parents_of(rule):
+        resolved_rule = merge(resolved[parent], resolved_rule)
+    return resolved_rule
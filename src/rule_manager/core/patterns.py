@@ -0,0 +1,337 @@
+import re
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+from ..models.errors import RuleDSLSyntaxError
+from ..utils.cache import LRUCache
+
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+try:
+    # Optional: the third-party regex module supports match timeouts
+    import regex as _regex
+except ImportError:
+    _regex = None
+
+_REPEAT_OPS = {_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT}
+_POSSESSIVE_REPEAT = getattr(_sre_parse, "POSSESSIVE_REPEAT", None)
+if _POSSESSIVE_REPEAT is not None:
+    _REPEAT_OPS.add(_POSSESSIVE_REPEAT)
+
+# Characters character classes are tested against when looking for
+# ambiguity, in addition to the literals of the pattern itself
+_PROBE_CHARACTERS = frozenset(
+    [chr(code) for code in range(256)] + ["\u0660", "\u2003", "\u4e2d", "\U0001f600"]
+)
+
+_CATEGORIES = {
+    _sre_parse.CATEGORY_DIGIT: str.isdecimal,
+    _sre_parse.CATEGORY_NOT_DIGIT: lambda c: not c.isdecimal(),
+    _sre_parse.CATEGORY_SPACE: str.isspace,
+    _sre_parse.CATEGORY_NOT_SPACE: lambda c: not c.isspace(),
+    _sre_parse.CATEGORY_WORD: lambda c: c.isalnum() or c == "_",
+    _sre_parse.CATEGORY_NOT_WORD: lambda c: not (c.isalnum() or c == "_"),
+}
+
+
+class PatternCache:
+    """
+    Bounded cache of compiled regular expressions for the `matches` operator.
+
+    Every match is guarded by a maximum input length. When the optional
+    `regex` package is installed, matches are also bounded by a time budget.
+    CPython's `re` cannot be interrupted, so without it patterns prone to
+    catastrophic backtracking are rejected when compiled instead: those
+    where an unbounded repeat can split the same input between iterations
+    in more than one way, such as `(a+)+`, `(\w+\s?)*` or `(a|aa)+`.
+    Counted repeats over such bodies, such as `(a+){1,100}` or `(a?){30}`,
+    are treated the same. Nested repeats delimited by a character the inner
+    one cannot match, such as `(\w+\.)*` or `(\d{1,3}\.){3}`, are accepted.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 512,
+        max_input_length: int = 10000,
+        timeout_ms: int = 100,
+    ):
+        self.max_input_length = max_input_length
+        self.timeout_ms = timeout_ms
+        self._cache: LRUCache[Any] = LRUCache(maxsize)
+
+    @property
+    def supports_timeout(self) -> bool:
+        return _regex is not None and self.timeout_ms > 0
+
+    def compile(self, pattern: str) -> Any:
+        """
+        Return the compiled form of a pattern, compiling it on first use.
+        """
+        compiled = self._cache.get(pattern)
+        if compiled is not None:
+            return compiled
+
+        try:
+            if self.supports_timeout:
+                compiled = _regex.compile(pattern)
+            else:
+                if _is_ambiguous(_sre_parse.parse(pattern)):
+                    raise RuleDSLSyntaxError(
+                        f"Pattern {pattern!r} has nested unbounded quantifiers "
+                        f"that can match the same input in many ways"
+                    )
+                compiled = re.compile(pattern)
+        except RuleDSLSyntaxError:
+            raise
+        except Exception as e:
+            raise RuleDSLSyntaxError(f"Invalid regular expression {pattern!r}: {e}")
+
+        self._cache.put(pattern, compiled)
+        return compiled
+
+    def match(self, compiled: Any, value: Any) -> bool:
+        """
+        Match a compiled pattern against the start of a value.
+        """
+        text = str(value)
+        if self.max_input_length and len(text) > self.max_input_length:
+            raise RuleDSLSyntaxError(
+                f"Input of {len(text)} characters exceeds the 'matches' limit "
+                f"of {self.max_input_length}"
+            )
+
+        if self.supports_timeout:
+            try:
+                return bool(compiled.match(text, timeout=self.timeout_ms / 1000))
+            except TimeoutError:
+                raise RuleDSLSyntaxError(
+                    f"Pattern {compiled.pattern!r} exceeded the "
+                    f"{self.timeout_ms}ms match budget"
+                )
+
+        return bool(compiled.match(text))
+
+    def match_pattern(self, value: Any, pattern: Any) -> bool:
+        """
+        Match a pattern that is only known at evaluation time.
+        """
+        return self.match(self.compile(str(pattern)), value)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats["timeout_enforced"] = self.supports_timeout
+        return stats
+
+
+def _is_ambiguous(parsed: Any) -> bool:
+    """
+    Tell whether an unbounded repeat in a parsed pattern contains an
+    unbounded repeat that can also match what follows it (within the same
+    iteration or at the start of the next one), or alternatives that can
+    start with the same character. `re` factors common prefixes out of
+    alternatives, so `(a|aa)` is seen as `a(|a)`. Character classes are compared over
+    a set of probe characters, so this is a heuristic.
+    """
+    universe = _PROBE_CHARACTERS | _literals(parsed)
+    return _check(list(parsed), frozenset(), False, universe)
+
+
+def _check(
+    items: List[Any], follow: FrozenSet[str], inside_repeat: bool, universe: Any
+) -> bool:
+    """
+    Look for ambiguity in a sequence followed by the characters `follow`.
+    """
+    for position, (op, av) in enumerate(items):
+        rest, nullable = _first(items[position + 1 :], universe)
+        item_follow = rest | follow if nullable else rest
+
+        if op in _REPEAT_OPS:
+            _, max_repeat, subpattern = av
+            body = list(subpattern)
+            body_first, body_nullable = _first(body, universe)
+            # Each iteration may be followed by the next one
+            body_follow = item_follow | body_first
+            if not _repeats(max_repeat, body, body_nullable, body_follow, universe):
+                if _check(body, item_follow, inside_repeat, universe):
+                    return True
+                continue
+            body_chars = _chars(body, universe)
+            if inside_repeat and body_chars & item_follow:
+                return True
+            if body_nullable and body_chars & body_follow:
+                # Each iteration may match the characters or leave them
+                return True
+            if _check(body, body_follow, True, universe):
+                return True
+        elif op is _sre_parse.BRANCH and inside_repeat:
+            seen: FrozenSet[str] = frozenset()
+            for branch in av[1]:
+                branch_first, nullable = _first(list(branch), universe)
+                if nullable:
+                    # An empty match leaves the characters to what follows
+                    branch_first |= item_follow
+                if branch_first & seen:
+                    return True
+                seen |= branch_first
+                if _check(list(branch), item_follow, True, universe):
+                    return True
+        else:
+            for subpattern in _subpatterns(op, av):
+                if _check(list(subpattern), item_follow, inside_repeat, universe):
+                    return True
+    return False
+
+
+def _repeats(
+    max_repeat: int,
+    body: List[Any],
+    body_nullable: bool,
+    body_follow: FrozenSet[str],
+    universe: Any,
+) -> bool:
+    """
+    Tell whether a repeat can divide its input between iterations in
+    several ways: it is unbounded, or may run more than once over a body
+    that is nullable, contains an unbounded repeat or is itself ambiguous.
+    """
+    if max_repeat == _sre_parse.MAXREPEAT:
+        return True
+    if max_repeat <= 1:
+        return False
+    return (
+        body_nullable
+        or _has_unbounded(body)
+        or _check(body, body_follow, True, universe)
+    )
+
+
+def _has_unbounded(items: Any) -> bool:
+    for op, av in items:
+        if op in _REPEAT_OPS and av[1] == _sre_parse.MAXREPEAT:
+            return True
+        subpatterns = [av[2]] if op in _REPEAT_OPS else _subpatterns(op, av)
+        if any(_has_unbounded(subpattern) for subpattern in subpatterns):
+            return True
+    return False
+
+
+def _first(items: List[Any], universe: Any) -> Tuple[FrozenSet[str], bool]:
+    """
+    Return the characters a sequence can start with, and whether it can
+    match the empty string.
+    """
+    first: FrozenSet[str] = frozenset()
+    for op, av in items:
+        if op in _REPEAT_OPS:
+            item_first, nullable = _first(list(av[2]), universe)
+            nullable = nullable or av[0] == 0
+        elif op is _sre_parse.BRANCH:
+            item_first, nullable = frozenset(), False
+            for branch in av[1]:
+                branch_first, branch_nullable = _first(list(branch), universe)
+                item_first |= branch_first
+                nullable = nullable or branch_nullable
+        elif op is _sre_parse.SUBPATTERN or op is getattr(
+            _sre_parse, "ATOMIC_GROUP", None
+        ):
+            item_first, nullable = _first(list(_subpatterns(op, av)[0]), universe)
+        elif op in (_sre_parse.AT, _sre_parse.ASSERT, _sre_parse.ASSERT_NOT):
+            item_first, nullable = frozenset(), True
+        elif op in (_sre_parse.GROUPREF, _sre_parse.GROUPREF_EXISTS):
+            item_first, nullable = frozenset(universe), True
+        else:
+            item_first, nullable = _matching(op, av, universe), False
+
+        first |= item_first
+        if not nullable:
+            return first, False
+    return first, True
+
+
+def _chars(items: Any, universe: Any) -> FrozenSet[str]:
+    """Return every character a pattern can consume."""
+    chars: FrozenSet[str] = frozenset()
+    for op, av in items:
+        if op in _REPEAT_OPS:
+            chars |= _chars(av[2], universe)
+        elif op in (_sre_parse.GROUPREF, _sre_parse.GROUPREF_EXISTS):
+            chars |= universe
+        elif op in (_sre_parse.AT, _sre_parse.ASSERT, _sre_parse.ASSERT_NOT):
+            continue
+        else:
+            subpatterns = _subpatterns(op, av)
+            if subpatterns:
+                for subpattern in subpatterns:
+                    chars |= _chars(subpattern, universe)
+            else:
+                chars |= _matching(op, av, universe)
+    return chars
+
+
+def _matching(op: Any, av: Any, universe: Any) -> FrozenSet[str]:
+    """Return the characters of `universe` a single-character item matches."""
+    if op is _sre_parse.LITERAL:
+        return frozenset((chr(av),))
+    if op is _sre_parse.NOT_LITERAL:
+        return frozenset(c for c in universe if c != chr(av))
+    if op is _sre_parse.ANY:
+        return frozenset(universe)
+    if op is _sre_parse.IN:
+        return frozenset(c for c in universe if _in_class(c, av))
+    # Anything else is treated as able to match any character
+    return frozenset(universe)
+
+
+def _in_class(char: str, items: Any) -> bool:
+    negate = False
+    found = False
+    for op, av in items:
+        if op is _sre_parse.NEGATE:
+            negate = True
+        elif op is _sre_parse.LITERAL:
+            found = found or char == chr(av)
+        elif op is _sre_parse.RANGE:
+            found = found or av[0] <= ord(char) <= av[1]
+        elif op is _sre_parse.CATEGORY:
+            test = _CATEGORIES.get(av)
+            found = found or test is None or test(char)
+        else:
+            found = True
+    return found != negate
+
+
+def _literals(items: Any) -> FrozenSet[str]:
+    """Return the characters a pattern names literally."""
+    chars: FrozenSet[str] = frozenset()
+    for op, av in items:
+        if op in (_sre_parse.LITERAL, _sre_parse.NOT_LITERAL):
+            chars |= {chr(av)}
+        elif op is _sre_parse.IN:
+            for item_op, item_av in av:
+                if item_op is _sre_parse.LITERAL:
+                    chars |= {chr(item_av)}
+                elif item_op is _sre_parse.RANGE:
+                    chars |= {chr(item_av[0]), chr(item_av[1])}
+        elif op in _REPEAT_OPS:
+            chars |= _literals(av[2])
+        else:
+            for subpattern in _subpatterns(op, av):
+                chars |= _literals(subpattern)
+    return chars
+
+
+def _subpatterns(op: Any, av: Any) -> List[Any]:
+    if op is _sre_parse.SUBPATTERN:
+        return [av[-1]]
+    if op is _sre_parse.BRANCH:
+        return list(av[1])
+    if op in (_sre_parse.ASSERT, _sre_parse.ASSERT_NOT):
+        return [av[1]]
+    if op is _sre_parse.GROUPREF_EXISTS:
+        return [branch for branch in av[1:] if branch is not None]
+    if op is getattr(_sre_parse, "ATOMIC_GROUP", None):
+        return [av]
+    return []
@@ -0,0 +1,61 @@
+import sys
+from typing import List, Optional, Union
+
+VERBOSITY_LEVELS = ("decision", "matched", "full")
+
+# The outcome of one rule: True (matched), False (not matched or not
+# evaluated) or the message of the error raised by its conditions
+Outcome = Union[bool, str]
+
+
+class CompactSummary:
+    """
+    The result of evaluating a snapshot's rules against a context, as one
+    outcome per rule position.
+
+    It holds no pydantic models and no copies of rule data, and does not
+    refer to the snapshot, so it can be cached and sent between processes
+    cheaply. The engine turns it into a RuleEvaluationSummary or
+    RuleDecision at the verbosity the caller asks for.
+    """
+
+    __slots__ = ("outcomes", "deciding_position", "matched_count", "evaluated_count")
+
+    def __init__(
+        self,
+        outcomes: List[Outcome],
+        deciding_position: Optional[int],
+        matched_count: int,
+        evaluated_count: int,
+    ):
+        self.outcomes = outcomes
+        self.deciding_position = deciding_position
+        self.matched_count = matched_count
+        self.evaluated_count = evaluated_count
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the summary and its outcomes."""
+        errors = sum(
+            sys.getsizeof(outcome)
+            for outcome in self.outcomes
+            if isinstance(outcome, str)
+        )
+        return sys.getsizeof(self) + sys.getsizeof(self.outcomes) + errors
+
+
+class CompactDecision:
+    """
+    The result of a decision-only evaluation: the position of the first
+    matching rule, if any, and how many rules were evaluated to find it.
+    """
+
+    __slots__ = ("deciding_position", "evaluated_count")
+
+    def __init__(self, deciding_position: Optional[int], evaluated_count: int):
+        self.deciding_position = deciding_position
+        self.evaluated_count = evaluated_count
+
+    @property
+    def nbytes(self) -> int:
+        return sys.getsizeof(self)
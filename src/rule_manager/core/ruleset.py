@@ -0,0 +1,211 @@
+import itertools
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .compiler import CompiledConditions, ConditionCompiler, TimedMemo
+from ..models.base import Rule, RuleContext
+
+if TYPE_CHECKING:
+    from .index import DiscriminationIndex
+
+# Rule fields that do not affect evaluation; the store restamps every rule
+# of a scope when any of them is written
+_BOOKKEEPING_FIELDS = frozenset({"created_at", "updated_at"})
+
+
+def same_definition(a: Rule, b: Rule) -> bool:
+    """Whether two rules are the same apart from their timestamps."""
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    fields_a, fields_b = a.__dict__, b.__dict__
+    return all(
+        fields_a[name] == fields_b[name]
+        for name in fields_a
+        if name not in _BOOKKEEPING_FIELDS
+    )
+
+
+class PredicateTable:
+    """
+    Interns atomic predicates by canonical key, so identical predicates in
+    different rules and scopes share a single memo slot.
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.functions: List[Callable[[Any], Any]] = []
+
+    def intern(self, key: str, function: Callable[[Any], Any]) -> int:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = len(self.keys)
+            self.keys.append(key)
+            self.functions.append(function)
+        return slot
+
+    def copy(self) -> "PredicateTable":
+        table = PredicateTable()
+        table._slots = dict(self._slots)
+        table.keys = list(self.keys)
+        table.functions = list(self.functions)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class CompiledRule:
+    """
+    A resolved rule with its conditions compiled against a predicate table,
+    in the conjunct order that was requested for it (None for the default).
+    """
+
+    __slots__ = ("rule", "conditions", "slots", "order")
+
+    def __init__(
+        self,
+        rule: Rule,
+        conditions: Optional[CompiledConditions],
+        slots: Tuple[int, ...],
+        order: Optional[Sequence[str]] = None,
+    ):
+        self.rule = rule
+        self.conditions = conditions
+        self.slots = slots
+        self.order = order
+
+    def matches(self, context: RuleContext, memo: List[Any]) -> bool:
+        if self.conditions is None:
+            return True
+        return self.conditions.evaluate(context, memo, self.slots)
+
+
+class CompiledRuleset:
+    """
+    An ordered list of compiled rules sharing one predicate table.
+
+    Each evaluation allocates a memo with `new_memo()`; every distinct
+    predicate is then evaluated at most once per context, however many
+    rules test it.
+
+    Given the `previous` ruleset, rules that are unchanged (the same resolved
+    definition, with the same requested order) keep their compiled
+    form and predicate slots, and only the others are compiled. Predicates
+    of removed rules stay in the table until more than half of it is
+    unused; the table is then rebuilt from scratch.
+    """
+
+    def __init__(
+        self,
+        rules: List[Rule],
+        compiler: ConditionCompiler,
+        orders: Optional[Callable[[Rule], Optional[Sequence[str]]]] = None,
+        previous: Optional["CompiledRuleset"] = None,
+    ):
+        reusable: Dict[str, CompiledRule] = {}
+        if previous is not None and 2 * previous.live_predicates >= len(
+            previous.predicates
+        ):
+            self.predicates = previous.predicates.copy()
+            reusable = {compiled.rule.name: compiled for compiled in previous.rules}
+        else:
+            self.predicates = PredicateTable()
+
+        self.compiled_rules = 0
+        self.rules: List[CompiledRule] = []
+        for rule in rules:
+            order = orders(rule) if orders else None
+            compiled = reusable.get(rule.name)
+            if (
+                compiled is None
+                or compiled.order != order
+                or not same_definition(compiled.rule, rule)
+            ):
+                compiled = self._compile_rule(rule, compiler, order)
+                self.compiled_rules += 1
+            self.rules.append(compiled)
+
+        self.live_predicates = len(
+            {slot for compiled in self.rules for slot in compiled.slots}
+        )
+
+    def _compile_rule(
+        self,
+        rule: Rule,
+        compiler: ConditionCompiler,
+        order: Optional[Sequence[str]],
+    ) -> CompiledRule:
+        if not rule.conditions:
+            return CompiledRule(rule, None, (), order)
+
+        conditions = compiler.compile(rule.conditions, rule.name, order)
+        slots = tuple(
+            self.predicates.intern(key, function)
+            for key, function in zip(conditions.atom_keys, conditions.functions)
+        )
+        return CompiledRule(rule, conditions, slots, order)
+
+    def new_memo(self, timed: bool = False) -> List[Any]:
+        """
+        Allocate a memo for one evaluation; a `timed` memo also records
+        what each predicate computed into it cost.
+        """
+        if timed:
+            return TimedMemo(len(self.predicates))
+        return [None] * len(self.predicates)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rules": len(self.rules),
+            "predicate_references": sum(len(rule.slots) for rule in self.rules),
+            "distinct_predicates": self.live_predicates,
+            "compiled_rules": self.compiled_rules,
+        }
+
+
+class RulesetSnapshot:
+    """
+    The applicable rules of a store, resolved, sorted and compiled once.
+
+    A snapshot is never modified after it is built; the engine replaces it
+    as a whole when the store's generation or the condition orders change.
+    Each snapshot built in a process has a distinct `id`, which results
+    computed against it can be keyed by.
+    """
+
+    __slots__ = ("id", "generation", "ordering_version", "ruleset", "index")
+
+    _ids = itertools.count(1)
+
+    def __init__(
+        self,
+        generation: Optional[Hashable],
+        ordering_version: int,
+        ruleset: CompiledRuleset,
+        index: Optional["DiscriminationIndex"] = None,
+    ):
+        self.id = next(RulesetSnapshot._ids)
+        self.generation = generation
+        self.ordering_version = ordering_version
+        self.ruleset = ruleset
+        self.index = index
+
+    def is_current(self, generation: Optional[Hashable], ordering_version: int) -> bool:
+        # A store without generations cannot be trusted to be unchanged
+        return (
+            generation is not None
+            and generation == self.generation
+            and ordering_version == self.ordering_version
+        )
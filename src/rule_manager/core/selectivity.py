@@ -0,0 +1,253 @@
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .compiler import TimedMemo, node_key
+from .dsl import And, Literal, Node, Not, Or
+from .ruleset import CompiledRuleset
+from ..models.base import Rule
+
+ORDERING_MODES = ("declared", "adaptive")
+
+
+class PredicateStats:
+    """Sampled cost and outcome counters for one predicate."""
+
+    __slots__ = ("samples", "false_count", "total_cost_ns")
+
+    def __init__(self):
+        self.samples = 0
+        self.false_count = 0
+        self.total_cost_ns = 0
+
+    @property
+    def false_rate(self) -> float:
+        return self.false_count / self.samples if self.samples else 0.0
+
+    @property
+    def cost_ns(self) -> float:
+        return self.total_cost_ns / self.samples if self.samples else 0.0
+
+
+class SelectivityTracker:
+    """
+    Learns per-predicate cost and false-rate, and reorders the conjuncts of
+    each rule's conditions so cheap, highly selective checks run first.
+
+    Every `sample_rate`-th evaluation runs with a timed memo (see
+    `new_memo`), recording the cost and outcome of each predicate it
+    computed as it computes it. Sampling defaults to
+    every 100th evaluation in "adaptive" mode and is off in "declared"
+    mode unless `sample_rate` is given. In "adaptive" mode, every
+    `reorder_interval` evaluations the conjuncts of each rule are sorted by
+    expected cost per rejection (cost / false-rate). Orders listed in
+    `pinned_orders` always take precedence; "declared" mode keeps the YAML
+    order for every other rule.
+    """
+
+    def __init__(
+        self,
+        mode: str = "declared",
+        sample_rate: Optional[int] = None,
+        reorder_interval: int = 10000,
+        min_samples: int = 20,
+        pinned_orders: Optional[Dict[str, Sequence[str]]] = None,
+    ):
+        if mode not in ORDERING_MODES:
+            raise ValueError(f"Unknown condition ordering: {mode}")
+        self.mode = mode
+        if sample_rate is None:
+            sample_rate = 100 if mode == "adaptive" else 0
+        self.sample_rate = sample_rate
+        self.reorder_interval = reorder_interval
+        self.min_samples = min_samples
+        self.pinned_orders = {
+            name: tuple(order) for name, order in (pinned_orders or {}).items()
+        }
+        self.predicates: Dict[str, PredicateStats] = {}
+        self.version = 0
+        self._orders: Dict[str, Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+        self._evaluations = 0
+        self._sampled_evaluations = 0
+        self._sampled_predicate_evaluations = 0
+        self._reorders = 0
+        self._last_reorder: Dict[str, Any] = {}
+
+    def order_for(self, rule: Rule) -> Optional[Tuple[str, ...]]:
+        """Return the conjunct order to compile a rule with, if any."""
+        pinned = self.pinned_orders.get(rule.name)
+        if pinned is not None:
+            return pinned
+        return self._orders.get(rule.name)
+
+    def new_memo(self, ruleset: CompiledRuleset) -> List[Any]:
+        """
+        Allocate the memo of the next evaluation, timed when it is sampled.
+        """
+        due = self.sample_rate > 0 and (self._evaluations + 1) % self.sample_rate == 0
+        return ruleset.new_memo(timed=due)
+
+    def observe(self, ruleset: CompiledRuleset, memo: List[Any]) -> None:
+        """
+        Record one evaluation; sample predicate statistics from its memo
+        when it was timed, and reorder conjuncts when due.
+        """
+        self._evaluations += 1
+        if memo.__class__ is TimedMemo:
+            self._sample(ruleset, memo)
+
+        if (
+            self.mode == "adaptive"
+            and self.reorder_interval > 0
+            and self._evaluations % self.reorder_interval == 0
+        ):
+            self.reorder(ruleset)
+
+    def _sample(self, ruleset: CompiledRuleset, memo: Any) -> None:
+        # Only the predicates the evaluation that just finished computed
+        keys = ruleset.predicates.keys
+        computed = [
+            (keys[slot], cost, memo[slot])
+            for slot, cost in enumerate(memo.costs)
+            if cost is not None
+        ]
+
+        with self._lock:
+            self._sampled_evaluations += 1
+            self._sampled_predicate_evaluations += len(computed)
+
+            for key, cost, value in computed:
+                stats = self.predicates.get(key)
+                if stats is None:
+                    stats = self.predicates[key] = PredicateStats()
+                stats.samples += 1
+                stats.total_cost_ns += cost
+                # Errors count as false, like a failing conjunct
+                if value is not True:
+                    stats.false_count += 1
+
+    def reorder(self, ruleset: CompiledRuleset) -> Dict[str, Tuple[str, ...]]:
+        """
+        Compute new conjunct orders for the rules of a ruleset.
+        Returns the orders that changed.
+        """
+        changed: Dict[str, Tuple[str, ...]] = {}
+        declared_cost = 0.0
+        reordered_cost = 0.0
+
+        with self._lock:
+            for compiled_rule in ruleset.rules:
+                conditions = compiled_rule.conditions
+                rule = compiled_rule.rule
+                if conditions is None or len(conditions.conjuncts) < 2:
+                    continue
+
+                estimates = {}
+                for name, node in conditions.conjuncts:
+                    estimate = self._estimate(node)
+                    if estimate is None:
+                        break
+                    estimates[name] = estimate
+                else:
+                    declared = [name for name in rule.conditions if name in estimates]
+                    declared_cost += _sequence_cost(declared, estimates)
+
+                    if rule.name in self.pinned_orders:
+                        order = list(conditions.order)
+                    else:
+                        order = sorted(declared, key=lambda n: _rank(estimates[n]))
+                    reordered_cost += _sequence_cost(order, estimates)
+
+                    order_tuple = tuple(order)
+                    if (
+                        rule.name not in self.pinned_orders
+                        and order_tuple != conditions.order
+                    ):
+                        self._orders[rule.name] = order_tuple
+                        changed[rule.name] = order_tuple
+
+            self._reorders += 1
+            if changed:
+                self.version += 1
+            self._last_reorder = {
+                "rules_reordered": len(changed),
+                "declared_expected_cost_ns": round(declared_cost, 1),
+                "reordered_expected_cost_ns": round(reordered_cost, 1),
+                "estimated_savings": (
+                    round(1 - reordered_cost / declared_cost, 4)
+                    if declared_cost
+                    else 0.0
+                ),
+            }
+
+        return changed
+
+    def _estimate(self, node: Node) -> Optional[Tuple[float, float]]:
+        """
+        Estimate (cost, pass-rate) for a tree, assuming independent atoms.
+        Returns None if any atom has too few samples.
+        """
+        if isinstance(node, Literal):
+            return 0.0, 1.0 if node.value else 0.0
+        if isinstance(node, Not):
+            estimate = self._estimate(node.operand)
+            if estimate is None:
+                return None
+            return estimate[0], 1.0 - estimate[1]
+        if isinstance(node, (And, Or)):
+            cost = 0.0
+            reach = 1.0
+            for operand in node.operands:
+                estimate = self._estimate(operand)
+                if estimate is None:
+                    return None
+                cost += reach * estimate[0]
+                reach *= estimate[1] if isinstance(node, And) else 1.0 - estimate[1]
+            return cost, reach if isinstance(node, And) else 1.0 - reach
+
+        stats = self.predicates.get(node_key(node))
+        if stats is None or stats.samples < self.min_samples:
+            return None
+        return stats.cost_ns, 1.0 - stats.false_rate
+
+    def current_orders(self) -> Dict[str, List[str]]:
+        """Return the learned and pinned conjunct orders, by rule name."""
+        orders = {name: list(order) for name, order in self._orders.items()}
+        orders.update({name: list(order) for name, order in self.pinned_orders.items()})
+        return orders
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "version": self.version,
+            "evaluations": self._evaluations,
+            "sampled_evaluations": self._sampled_evaluations,
+            "avg_predicates_evaluated": (
+                round(
+                    self._sampled_predicate_evaluations / self._sampled_evaluations, 2
+                )
+                if self._sampled_evaluations
+                else 0.0
+            ),
+            "tracked_predicates": len(self.predicates),
+            "reorders": self._reorders,
+            "last_reorder": dict(self._last_reorder),
+            "orders": self.current_orders(),
+        }
+
+
+def _rank(estimate: Tuple[float, float]) -> float:
+    cost, pass_rate = estimate
+    return cost / max(1.0 - pass_rate, 1e-9)
+
+
+def _sequence_cost(
+    names: Sequence[str], estimates: Dict[str, Tuple[float, float]]
+) -> float:
+    cost = 0.0
+    reach = 1.0
+    for name in names:
+        conjunct_cost, pass_rate = estimates[name]
+        cost += reach * conjunct_cost
+        reach *= pass_rate
+    return cost
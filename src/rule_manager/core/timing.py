@@ -0,0 +1,110 @@
+import threading
+from typing import Any, Dict, Optional
+
+TIMING_MODES = ("off", "request", "rule")
+
+
+class LatencyHistogram:
+    """
+    Counts of durations in power-of-two nanosecond buckets: bucket `b`
+    holds durations below 2**b ns and at least 2**(b - 1) ns. Percentiles
+    are reported as the upper bound of their bucket, so they are within a
+    factor of two of the true value.
+    """
+
+    __slots__ = ("counts", "count", "total_ns", "max_ns")
+
+    BUCKETS = 48  # up to 2**47 ns, about 39 hours
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, elapsed_ns: int) -> None:
+        self.counts[min(elapsed_ns.bit_length(), self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def percentile(self, fraction: float) -> Optional[int]:
+        """Return the upper bound in ns of the bucket holding `fraction`."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(1 << bucket, self.max_ns)
+        return self.max_ns
+
+    def stats(self) -> Dict[str, Any]:
+        def us(ns: Optional[float]) -> Optional[float]:
+            return round(ns / 1000, 3) if ns is not None else None
+
+        return {
+            "count": self.count,
+            "mean_us": us(self.total_ns / self.count if self.count else None),
+            "p50_us": us(self.percentile(0.5)),
+            "p90_us": us(self.percentile(0.9)),
+            "p99_us": us(self.percentile(0.99)),
+            "max_us": us(self.max_ns if self.count else None),
+        }
+
+
+class EvaluationTimings:
+    """
+    Latency histograms of evaluation requests and, in "rule" mode, of each
+    rule by name.
+
+    Timings are only recorded for evaluations computed in this process.
+    Counters are updated without a lock and may lose the odd sample when
+    evaluated from several threads at once.
+    """
+
+    def __init__(self, mode: str = "request"):
+        if mode not in TIMING_MODES:
+            raise ValueError(f"Unknown timing mode: {mode}")
+        self.mode = mode
+        self.requests = LatencyHistogram()
+        self.rules: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def per_request(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def per_rule(self) -> bool:
+        return self.mode == "rule"
+
+    def rule_histogram(self, name: str) -> LatencyHistogram:
+        histogram = self.rules.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.rules.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def stats(self, slowest: int = 10) -> Dict[str, Any]:
+        """
+        Return the request histogram and the `slowest` rules by mean time.
+        """
+        stats: Dict[str, Any] = {"mode": self.mode}
+        if not self.per_request:
+            return stats
+
+        stats["requests"] = self.requests.stats()
+        if self.per_rule:
+            ranked = sorted(
+                self.rules.items(),
+                key=lambda item: item[1].total_ns / max(item[1].count, 1),
+                reverse=True,
+            )
+            stats["rules_timed"] = len(ranked)
+            stats["slowest_rules"] = {
+                name: histogram.stats() for name, histogram in ranked[:slowest]
+            }
+        return stats
@@ -0,0 +1,235 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .admission import Deadline
+from .ruleset import RulesetSnapshot
+from ..models.base import Rule, RuleContext
+from ..models.errors import EvaluationTimeoutError
+from ..utils.cache import LRUCache
+
+# (rule, conjunct order) for every rule of a snapshot, in evaluation order
+Payload = List[Tuple[Rule, Optional[Tuple[str, ...]]]]
+
+# (context, decision_only, remaining budget in ms or None, budget in ms)
+Item = Tuple[RuleContext, bool, Optional[float], int]
+
+# ("ok", result), ("timeout", budget_ms) or ("error", message)
+Outcome = Tuple[str, Any]
+
+
+class ProcessPoolEvaluator:
+    """
+    Evaluates contexts in a pool of worker processes.
+
+    Requests that arrive while the event loop is busy are grouped by
+    snapshot into batches of up to `batch_size` contexts, one IPC round
+    trip each. Every worker keeps compiled copies of up to `snapshots`
+    snapshots, such as the shared and per-tenant ones, by snapshot id.
+    The first `workers` batches of a snapshot carry its rules; later ones
+    carry only the id, and a worker that does not hold that snapshot asks
+    for its rules once before evaluating it.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        batch_size: int,
+        options: Dict[str, Any],
+        snapshots: int = 256,
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.snapshots = snapshots
+        self._options = options
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # snapshot id -> [payload, number of batches it was sent with]
+        self._payloads: LRUCache[List[Any]] = LRUCache(snapshots)
+        # snapshot id -> (snapshot, requests waiting for the next batch)
+        self._pending: Dict[
+            int, Tuple[RulesetSnapshot, List[Tuple[Item, asyncio.Future]]]
+        ] = {}
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.requests = 0
+        self.resyncs = 0
+
+    async def evaluate(
+        self,
+        snapshot: RulesetSnapshot,
+        context: RuleContext,
+        decision_only: bool,
+        deadline: Optional[Deadline],
+    ) -> Any:
+        """
+        Evaluate one context in a worker and return its compact summary,
+        or its compact decision with `decision_only`.
+        """
+        loop = asyncio.get_running_loop()
+        item: Item = (context, decision_only, None, 0)
+        if deadline is not None:
+            remaining_ms = deadline.remaining() * 1000
+            item = (context, decision_only, remaining_ms, deadline.budget_ms)
+        future = loop.create_future()
+        group = self._pending.setdefault(snapshot.id, (snapshot, []))[1]
+        group.append((item, future))
+        self.requests += 1
+
+        if len(group) >= self.batch_size:
+            self._submit_group(snapshot.id)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_soon(self._flush)
+
+        status, value = await future
+        if status == "timeout":
+            raise EvaluationTimeoutError(value)
+        if status == "error":
+            raise RuntimeError(value)
+        return value
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for snapshot_id in list(self._pending):
+            self._submit_group(snapshot_id)
+
+    def _submit_group(self, snapshot_id: int) -> None:
+        snapshot, batch = self._pending.pop(snapshot_id)
+        task = asyncio.ensure_future(self._submit(snapshot, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _submit(
+        self,
+        snapshot: RulesetSnapshot,
+        batch: List[Tuple[Item, asyncio.Future]],
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in batch]
+        try:
+            pool = self._get_pool()
+            self.batches += 1
+            outcomes = await loop.run_in_executor(
+                pool, _evaluate_batch, snapshot.id, self._payload(snapshot, True), items
+            )
+            if outcomes is None:
+                # The worker does not hold this snapshot
+                self.resyncs += 1
+                outcomes = await loop.run_in_executor(
+                    pool, _evaluate_batch, snapshot.id, self._payload(snapshot), items
+                )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), outcome in zip(batch, outcomes):
+            if not future.done():
+                future.set_result(outcome)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._options, self.snapshots),
+            )
+        return self._pool
+
+    def _payload(
+        self, snapshot: RulesetSnapshot, first_only: bool = False
+    ) -> Optional[Payload]:
+        """
+        Return the rules of a snapshot for a worker to compile. With
+        `first_only`, return None once they were sent `workers` times.
+        """
+        entry = self._payloads.get(snapshot.id)
+        if entry is None:
+            payload = [
+                (
+                    compiled_rule.rule,
+                    (
+                        compiled_rule.conditions.order
+                        if compiled_rule.conditions
+                        else None
+                    ),
+                )
+                for compiled_rule in snapshot.ruleset.rules
+            ]
+            entry = [payload, 0]
+            self._payloads.put(snapshot.id, entry)
+        if first_only and entry[1] >= self.workers:
+            return None
+        entry[1] += 1
+        return entry[0]
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "batch_size": self.batch_size,
+            "requests": self.requests,
+            "batches": self.batches,
+            "resyncs": self.resyncs,
+        }
+
+
+# Worker process state
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(options: Dict[str, Any], snapshots: int) -> None:
+    from .engine import RuleEngine
+
+    # Workers never read the store; the dispatcher sends them the rules
+    _worker["engine"] = RuleEngine(
+        None,  # type: ignore[arg-type]
+        max_concurrent_evaluations=0,
+        max_evaluation_time_ms=0,
+        **options,
+    )
+    # dispatcher snapshot id -> compiled snapshot
+    _worker["snapshots"] = LRUCache(snapshots)
+    # The last snapshot built, whose compiled rules the next build reuses
+    _worker["last"] = None
+
+
+def _evaluate_batch(
+    snapshot_id: int, payload: Optional[Payload], items: Sequence[Item]
+) -> Optional[List[Outcome]]:
+    engine = _worker["engine"]
+    snapshot = _worker["snapshots"].get(snapshot_id)
+    if snapshot is None:
+        if payload is None:
+            return None
+        orders = {rule.name: order for rule, order in payload if order is not None}
+        engine.selectivity.pinned_orders = orders
+        snapshot = engine._build_snapshot(
+            [rule for rule, _ in payload], snapshot_id, 0, _worker["last"]
+        )
+        _worker["snapshots"].put(snapshot_id, snapshot)
+        _worker["last"] = snapshot
+
+    outcomes: List[Outcome] = []
+    for context, decision_only, remaining_ms, budget_ms in items:
+        deadline = None
+        if remaining_ms is not None:
+            deadline = Deadline(budget_ms, remaining_ms)
+        try:
+            result = engine._compute(snapshot, context, decision_only, deadline)
+        except EvaluationTimeoutError:
+            outcomes.append(("timeout", budget_ms))
+        except Exception as e:
+            outcomes.append(("error", str(e)))
+        else:
+            outcomes.append(("ok", result))
+    return outcomes
@@ -28,6 +28,9 @@ class Rule(BaseModel):
 
     name: str
     scope: RuleScope
+    # The project_id (project scope) or user_id (individual scope) the rule
+    # is limited to; None applies it to every project or user
+    tenant: Optional[str] = None
     priority: int = Field(ge=0, le=100, default=50)
     conditions: Dict[str, Any] = Field(default_factory=dict)
     action: RuleAction
@@ -46,6 +49,7 @@ class RuleSet(BaseModel):
     ruleset_version: str = "1.1"
     engine_min_version: str = ">=2.8.0"
     scope: RuleScope
+    tenant: Optional[str] = None
     rules: List[Rule] = Field(default_factory=list)
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
@@ -80,7 +84,19 @@ class RuleEvaluationSummary(BaseModel):
     context: RuleContext
     results: List[RuleEvaluationResult]
     final_action: RuleAction
-    total_execution_time_ms: float
+    total_execution_time_ms: Optional[float] = None
     evaluated_at: str
     applicable_rules_count: int
     matched_rules_count: int
+
+
+class RuleDecision(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    context: RuleContext
+    final_action: RuleAction
+    deciding_rule: Optional[RuleEvaluationResult] = None
+    total_execution_time_ms: Optional[float] = None
+    evaluated_at: str
+    applicable_rules_count: int
+    evaluated_rules_count: int
@@ -52,3 +52,19 @@ class InvalidRulesetVersionError(RuleManagerError):
             f"Ruleset version {version} is incompatible with minimum required version {min_version}",
             retry_allowed=False,
         )
+
+
+class EvaluationOverloadedError(RuleManagerError):
+    def __init__(self, message: str):
+        super().__init__(
+            "E301", f"Evaluation overloaded: {message}", retry_allowed=True
+        )
+
+
+class EvaluationTimeoutError(RuleManagerError):
+    def __init__(self, budget_ms: int):
+        super().__init__(
+            "E302",
+            f"Evaluation exceeded its time budget of {budget_ms}ms",
+            retry_allowed=True,
+        )
@@ -1,5 +1,5 @@
 import os
-from typing import Literal, Optional
+from typing import Dict, List, Literal, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -19,6 +19,10 @@ class ServerSettings(BaseSettings):
     host: str = "127.0.0.1"
     port: int = 8000
     rules_dir: str = "config/rules"
+    # Parsed rule files kept in memory by the YAML store
+    store_cache_size: int = 1024
+    # Keep a JSON copy of each parsed rule file to skip YAML parsing
+    store_sidecar_snapshots: bool = True
     async_mode: bool = False
 
     # Storage settings
@@ -30,6 +34,28 @@ class ServerSettings(BaseSettings):
     priority_tie_breaking: PriorityTieBreaking = PriorityTieBreaking.FIFO
     enable_hot_reload: bool = True
     max_evaluation_time_ms: int = 1000
+    evaluation_mode: Literal["interpreter", "codegen"] = "interpreter"
+    expression_cache_size: int = 1024
+    regex_cache_size: int = 512
+    regex_max_input_length: int = 10000
+    regex_timeout_ms: int = 100
+    condition_ordering: Literal["declared", "adaptive"] = "declared"
+    # Every Nth evaluation samples predicate costs; defaults to 100 with
+    # adaptive ordering and to off (0) with declared ordering
+    condition_stats_sample_rate: Optional[int] = None
+    condition_reorder_interval: int = 10000
+    pinned_condition_orders: Dict[str, List[str]] = {}
+    enable_rule_index: bool = True
+    # "off", "request" (total_execution_time_ms) or "rule" (also per-rule
+    # latency histograms in engine stats)
+    timing_mode: Literal["off", "request", "rule"] = "request"
+    matching_mode: Literal["stateless", "incremental"] = "stateless"
+    session_cache_size: int = 10000
+    session_ttl_seconds: int = 1800
+    # Tenant partitions (project and individual rules of one project or
+    # user) and per-tenant snapshots kept in memory
+    partition_cache_size: int = 10000
+    tenant_snapshot_cache_size: int = 256
 
     # Security settings
     enable_auth: bool = False
@@ -47,7 +73,12 @@ class ServerSettings(BaseSettings):
 
     # Performance settings
     max_concurrent_evaluations: int = 100
-    cache_size_mb: int = 64
+    max_queued_evaluations: int = 1000
+    # Worker processes evaluating rules; 0 evaluates on the event loop
+    evaluation_workers: int = 0
+    worker_batch_size: int = 64
+    # Decision cache budget; off by default
+    cache_size_mb: int = 0
 
     def __init__(self, **data):
         # Backward compatibility with old prefix
@@ -1,6 +1,7 @@
 import asyncio
 import json
-from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
 from datetime import datetime
 
 from fastmcp import FastMCP
@@ -24,6 +25,7 @@ from .storage.yaml_store import YAMLRuleStore
 class CreateRuleRequest(BaseModel):
     name: str
     scope: RuleScope
+    tenant: Optional[str] = None
     priority: int = 50
     conditions: Dict[str, Any] = {}
     action: RuleAction
@@ -37,6 +39,7 @@ class CreateRuleRequest(BaseModel):
 class UpdateRuleRequest(BaseModel):
     name: str
     scope: RuleScope
+    tenant: Optional[str] = None
     priority: Optional[int] = None
     conditions: Optional[Dict[str, Any]] = None
     action: Optional[RuleAction] = None
@@ -49,16 +52,28 @@ class UpdateRuleRequest(BaseModel):
 
 class EvaluateRulesRequest(BaseModel):
     context: RuleContext
+    mode: Literal["full", "decision_only"] = "full"
+    verbosity: Literal["decision", "matched", "full"] = "full"
+
+
+class EvaluateRulesBatchRequest(BaseModel):
+    contexts: List[RuleContext]
+    mode: Literal["full", "decision_only"] = "full"
+    verbosity: Literal["decision", "matched", "full"] = "full"
 
 
 class RuleManagerServer:
     def __init__(self, settings: ServerSettings):
         self.settings = settings
-        self.mcp = FastMCP("Rule Manager")
+        self.mcp = FastMCP("Rule Manager", lifespan=self._lifespan)
 
         # Initialize storage
         if settings.storage_backend == "yaml":
-            self.rule_store = YAMLRuleStore(settings.rules_dir)
+            self.rule_store = YAMLRuleStore(
+                settings.rules_dir,
+                cache_size=settings.store_cache_size,
+                sidecar_snapshots=settings.store_sidecar_snapshots,
+            )
         else:
             raise NotImplementedError(
                 f"Storage backend {settings.storage_backend} not implemented"
@@ -69,11 +84,40 @@ class RuleManagerServer:
             rule_store=self.rule_store,
             priority_tie_breaking=settings.priority_tie_breaking,
             max_evaluation_time_ms=settings.max_evaluation_time_ms,
+            expression_cache_size=settings.expression_cache_size,
+            regex_cache_size=settings.regex_cache_size,
+            regex_max_input_length=settings.regex_max_input_length,
+            regex_timeout_ms=settings.regex_timeout_ms,
+            evaluation_mode=settings.evaluation_mode,
+            condition_ordering=settings.condition_ordering,
+            condition_stats_sample_rate=settings.condition_stats_sample_rate,
+            condition_reorder_interval=settings.condition_reorder_interval,
+            pinned_condition_orders=settings.pinned_condition_orders,
+            enable_rule_index=settings.enable_rule_index,
+            timing_mode=settings.timing_mode,
+            matching_mode=settings.matching_mode,
+            session_cache_size=settings.session_cache_size,
+            session_ttl_seconds=settings.session_ttl_seconds,
+            partition_cache_size=settings.partition_cache_size,
+            tenant_snapshot_cache_size=settings.tenant_snapshot_cache_size,
+            decision_cache_mb=settings.cache_size_mb,
+            max_concurrent_evaluations=settings.max_concurrent_evaluations,
+            max_queued_evaluations=settings.max_queued_evaluations,
+            evaluation_workers=settings.evaluation_workers,
+            worker_batch_size=settings.worker_batch_size,
         )
 
         # Register MCP tools
         self._register_tools()
 
+    @asynccontextmanager
+    async def _lifespan(self, mcp: FastMCP) -> AsyncIterator[None]:
+        """Stop the rule engine's worker processes when the server shuts down"""
+        try:
+            yield
+        finally:
+            self.rule_engine.close()
+
     def _register_tools(self):
         """Register all MCP tools"""
 
@@ -83,13 +127,23 @@ class RuleManagerServer:
             Evaluate rules against a given context and return the results.
 
             Args:
-                request: The evaluation request containing the context
+                request: The evaluation request containing the context. With
+                    mode "decision_only", evaluation stops at the first
+                    matching rule and only the deciding rule is returned.
+                    `verbosity` limits the rule results returned to the
+                    matched rules ("matched") or the deciding rule
+                    ("decision").
 
             Returns:
                 Dictionary containing evaluation results
             """
             try:
-                result = await self.rule_engine.evaluate_rules(request.context)
+                if request.mode == "decision_only":
+                    decision = await self.rule_engine.evaluate_decision(request.context)
+                    return decision.model_dump()
+                result = await self.rule_engine.evaluate_rules(
+                    request.context, verbosity=request.verbosity
+                )
                 return result.model_dump()
             except RuleManagerError as e:
                 return {
@@ -108,6 +162,48 @@ class RuleManagerServer:
                     }
                 }
 
+        @self.mcp.tool()
+        async def evaluate_rules_batch(
+            request: EvaluateRulesBatchRequest,
+        ) -> Dict[str, Any]:
+            """
+            Evaluate rules against many contexts in one call.
+
+            Args:
+                request: The contexts to evaluate, all against the same
+                    ruleset snapshot, and the evaluation mode
+
+            Returns:
+                Dictionary containing one evaluation result per context
+            """
+            try:
+                results = await self.rule_engine.evaluate_rules_batch(
+                    request.contexts,
+                    decision_only=request.mode == "decision_only",
+                    verbosity=request.verbosity,
+                )
+                return {
+                    "success": True,
+                    "count": len(results),
+                    "results": [result.model_dump() for result in results],
+                }
+            except RuleManagerError as e:
+                return {
+                    "error": {
+                        "code": e.code,
+                        "message": e.message,
+                        "retry_allowed": e.retry_allowed,
+                    }
+                }
+            except Exception as e:
+                return {
+                    "error": {
+                        "code": "E500",
+                        "message": f"Unexpected error: {str(e)}",
+                        "retry_allowed": True,
+                    }
+                }
+
         @self.mcp.tool()
         async def create_rule(request: CreateRuleRequest) -> Dict[str, Any]:
             """
@@ -123,6 +219,7 @@ class RuleManagerServer:
                 rule = Rule(
                     name=request.name,
                     scope=request.scope,
+                    tenant=request.tenant,
                     priority=request.priority,
                     conditions=request.conditions,
                     action=request.action,
@@ -167,7 +264,7 @@ class RuleManagerServer:
             try:
                 # Get existing rule
                 existing_rule = await self.rule_store.get_rule(
-                    request.name, request.scope
+                    request.name, request.scope, request.tenant
                 )
                 if not existing_rule:
                     return {
@@ -181,9 +278,8 @@ class RuleManagerServer:
                 # Update fields
                 updated_data = existing_rule.model_dump()
                 for field, value in request.model_dump(exclude_unset=True).items():
-                    if (
-                        field != "name" and field != "scope"
-                    ):  # Don't allow changing name/scope
+                    # Don't allow changing name/scope/tenant
+                    if field not in ("name", "scope", "tenant"):
                         updated_data[field] = value
 
                 updated_data["updated_at"] = datetime.utcnow().isoformat()
@@ -209,20 +305,25 @@ class RuleManagerServer:
                 }
 
         @self.mcp.tool()
-        async def delete_rule(rule_name: str, scope: str) -> Dict[str, Any]:
+        async def delete_rule(
+            rule_name: str, scope: str, tenant: Optional[str] = None
+        ) -> Dict[str, Any]:
             """
             Delete a rule.
 
             Args:
                 rule_name: Name of the rule to delete
                 scope: Scope of the rule (global, project, individual)
+                tenant: Project or user the rule is limited to, if any
 
             Returns:
                 Dictionary containing success status or error information
             """
             try:
                 rule_scope = RuleScope(scope)
-                deleted = await self.rule_store.delete_rule(rule_name, rule_scope)
+                deleted = await self.rule_store.delete_rule(
+                    rule_name, rule_scope, tenant
+                )
 
                 if deleted:
                     return {"success": True, "message": f"Rule '{rule_name}' deleted"}
@@ -252,19 +353,23 @@ class RuleManagerServer:
                 }
 
         @self.mcp.tool()
-        async def list_rules(scope: Optional[str] = None) -> Dict[str, Any]:
+        async def list_rules(
+            scope: Optional[str] = None, tenant: Optional[str] = None
+        ) -> Dict[str, Any]:
             """
-            List all rules, optionally filtered by scope.
+            List all rules, optionally filtered by scope and tenant.
 
             Args:
                 scope: Optional scope filter (global, project, individual)
+                tenant: Optional project or user; without it, only the rules
+                    shared by all tenants are listed
 
             Returns:
                 Dictionary containing list of rules or error information
             """
             try:
                 rule_scope = RuleScope(scope) if scope else None
-                rules = await self.rule_store.list_rules(rule_scope)
+                rules = await self.rule_store.list_rules(rule_scope, tenant)
 
                 return {
                     "success": True,
@@ -290,21 +395,23 @@ class RuleManagerServer:
 
         @self.mcp.tool()
         async def get_rule(
-            rule_name: str, scope: Optional[str] = None
+            rule_name: str, scope: Optional[str] = None, tenant: Optional[str] = None
         ) -> Dict[str, Any]:
             """
-            Get a specific rule by name and optional scope.
+            Get a specific rule by name and optional scope and tenant.
 
             Args:
                 rule_name: Name of the rule to retrieve
                 scope: Optional scope filter (global, project, individual)
+                tenant: Optional project or user; required to find a rule
+                    limited to a tenant
 
             Returns:
                 Dictionary containing the rule or error information
             """
             try:
                 rule_scope = RuleScope(scope) if scope else None
-                rule = await self.rule_store.get_rule(rule_name, rule_scope)
+                rule = await self.rule_store.get_rule(rule_name, rule_scope, tenant)
 
                 if rule:
                     return {"success": True, "rule": rule.model_dump()}
@@ -357,6 +464,25 @@ class RuleManagerServer:
                     }
                 }
 
+        @self.mcp.tool()
+        async def engine_stats() -> Dict[str, Any]:
+            """
+            Get rule engine cache and condition ordering statistics.
+
+            Returns:
+                Dictionary containing engine statistics
+            """
+            try:
+                return {"success": True, "stats": self.rule_engine.stats()}
+            except Exception as e:
+                return {
+                    "error": {
+                        "code": "E500",
+                        "message": f"Unexpected error: {str(e)}",
+                        "retry_allowed": True,
+                    }
+                }
+
         @self.mcp.tool()
         async def health_check() -> Dict[str, Any]:
             """
@@ -1,12 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Hashable, List, Optional
 
 from ..models.base import Rule, RuleSet, RuleScope
 
 
 class RuleStore(ABC):
     @abstractmethod
-    async def load_rules(self, scope: RuleScope) -> RuleSet:
+    async def load_rules(
+        self, scope: RuleScope, tenant: Optional[str] = None
+    ) -> RuleSet:
+        """
+        Load the rules of a scope shared by all tenants, or with `tenant`,
+        the rules limited to that project (project scope) or user
+        (individual scope).
+        """
         pass
 
     @abstractmethod
@@ -15,7 +22,10 @@ class RuleStore(ABC):
 
     @abstractmethod
     async def get_rule(
-        self, rule_name: str, scope: Optional[RuleScope] = None
+        self,
+        rule_name: str,
+        scope: Optional[RuleScope] = None,
+        tenant: Optional[str] = None,
     ) -> Optional[Rule]:
         pass
 
@@ -28,11 +38,15 @@ class RuleStore(ABC):
         pass
 
     @abstractmethod
-    async def delete_rule(self, rule_name: str, scope: RuleScope) -> bool:
+    async def delete_rule(
+        self, rule_name: str, scope: RuleScope, tenant: Optional[str] = None
+    ) -> bool:
         pass
 
     @abstractmethod
-    async def list_rules(self, scope: Optional[RuleScope] = None) -> List[Rule]:
+    async def list_rules(
+        self, scope: Optional[RuleScope] = None, tenant: Optional[str] = None
+    ) -> List[Rule]:
         pass
 
     @abstractmethod
@@ -46,3 +60,20 @@ class RuleStore(ABC):
     @abstractmethod
     async def health_check(self) -> bool:
         pass
+
+    async def generation(self) -> Optional[Hashable]:
+        """
+        Return a token that changes whenever the stored rules change, or
+        None if the store cannot tell and rules must be reloaded every time.
+        Rules limited to a tenant are covered by `partition_generation`.
+        """
+        return None
+
+    async def partition_generation(
+        self, scope: RuleScope, tenant: str
+    ) -> Optional[Hashable]:
+        """
+        Return a token that changes whenever the rules of one tenant's
+        partition change, or None if the store cannot tell.
+        """
+        return None
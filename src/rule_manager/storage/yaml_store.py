@@ -1,24 +1,103 @@
 import os
 import asyncio
+import hashlib
+import json
 import yaml
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Hashable, Tuple
 from datetime import datetime
+from urllib.parse import quote, unquote
 import portalocker
 
 from .base import RuleStore
 from ..models.base import Rule, RuleSet, RuleScope
 from ..models.errors import StorageLockError, RuleNotFoundError, UnexpectedError
+from ..utils.cache import LRUCache
+
+# (inode, mtime in ns, size) of a file, or None if it does not exist
+FileSignature = Optional[Tuple[int, int, int]]
+
+# libyaml's loader and dumper are several times faster when available
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeDumper, SafeLoader  # type: ignore[assignment]
+
+SIDECAR_FORMAT = 1
+
+
+# Scopes whose rules can be limited to one project or user
+PARTITIONED_SCOPES = (RuleScope.PROJECT, RuleScope.INDIVIDUAL)
 
 
 class YAMLRuleStore(RuleStore):
-    def __init__(self, rules_dir: str):
+    """
+    Stores each scope's shared rules in `<scope>.yaml`, and the rules of
+    a project or individual tenant in `<scope>/<tenant>.yaml`, so a
+    tenant's rules can be read without reading any other tenant's.
+
+    Parsed rulesets of up to `cache_size` files are cached, and reused
+    as long as their file's inode, mtime and size are unchanged. Writes
+    through the store update the cache. Loaded rules are shared with the
+    cache and must not be modified in place.
+
+    With `sidecar_snapshots`, the parsed content of each file is also kept
+    as JSON in a hidden `.<file>.json` next to it, with a hash of the YAML
+    it was parsed from. Loading a file whose hash matches reads the JSON
+    instead of parsing the YAML.
+    """
+
+    def __init__(
+        self, rules_dir: str, cache_size: int = 1024, sidecar_snapshots: bool = True
+    ):
         self.rules_dir = Path(rules_dir)
+        self.sidecar_snapshots = sidecar_snapshots
         self.rules_dir.mkdir(parents=True, exist_ok=True)
         self._file_locks: Dict[str, asyncio.Lock] = {}
-
-    def _get_file_path(self, scope: RuleScope) -> Path:
-        return self.rules_dir / f"{scope.value}.yaml"
+        # Writes through this store by file
+        self._writes: Dict[Path, int] = {}
+        # File -> (signature when parsed, ruleset)
+        self._parsed: LRUCache[Tuple[FileSignature, RuleSet]] = LRUCache(cache_size)
+
+    def _get_file_path(self, scope: RuleScope, tenant: Optional[str] = None) -> Path:
+        if tenant is None:
+            return self.rules_dir / f"{scope.value}.yaml"
+        if scope not in PARTITIONED_SCOPES:
+            raise UnexpectedError(f"Rules in scope {scope.value} cannot have a tenant")
+        # Quoted so any tenant id is a single, safe file name
+        return self.rules_dir / scope.value / f"{quote(tenant, safe='')}.yaml"
+
+    def _list_tenants(self, scope: RuleScope) -> List[str]:
+        partition_dir = self.rules_dir / scope.value
+        if scope not in PARTITIONED_SCOPES or not partition_dir.is_dir():
+            return []
+        return sorted(unquote(path.stem) for path in partition_dir.glob("*.yaml"))
+
+    def _locations(
+        self, scope: Optional[RuleScope] = None, tenant: Optional[str] = None
+    ) -> List[Tuple[RuleScope, Optional[str]]]:
+        """
+        The files a query reads: the tenant's partitions of the given
+        scopes, or their shared files when no tenant is given. Tenant rules
+        are only found by naming their tenant, so a query never costs a
+        read per tenant.
+        """
+        scopes = [scope] if scope else list(RuleScope)
+        if tenant is None:
+            return [(scope_to_check, None) for scope_to_check in scopes]
+        return [
+            (scope_to_check, tenant)
+            for scope_to_check in scopes
+            if scope_to_check in PARTITIONED_SCOPES
+        ]
+
+    def _all_locations(self) -> List[Tuple[RuleScope, Optional[str]]]:
+        """The shared file and every tenant partition of every scope."""
+        locations: List[Tuple[RuleScope, Optional[str]]] = []
+        for scope in RuleScope:
+            locations.append((scope, None))
+            locations.extend((scope, name) for name in self._list_tenants(scope))
+        return locations
 
     def _get_lock(self, file_path: str) -> asyncio.Lock:
         if file_path not in self._file_locks:
@@ -34,8 +113,7 @@ class YAMLRuleStore(RuleStore):
                 with open(file_path, "r", encoding="utf-8") as f:
                     portalocker.lock(f, portalocker.LOCK_SH)
                     try:
-                        content = yaml.safe_load(f) or {}
-                        return content
+                        text = f.read()
                     finally:
                         portalocker.unlock(f)
         except Exception as e:
@@ -43,32 +121,119 @@ class YAMLRuleStore(RuleStore):
                 raise StorageLockError(f"Failed to acquire read lock for {file_path}")
             raise UnexpectedError(f"Failed to load YAML file {file_path}: {e}")
 
-    async def _save_yaml_file(self, file_path: Path, data: Dict[str, Any]) -> None:
+        if not self.sidecar_snapshots:
+            return self._parse_yaml(file_path, text)
+
+        digest = _content_hash(text)
+        content = self._read_sidecar(file_path, digest)
+        if content is None:
+            content = self._parse_yaml(file_path, text)
+            self._write_sidecar(file_path, digest, content)
+        return content
+
+    def _parse_yaml(self, file_path: Path, text: str) -> Dict[str, Any]:
+        try:
+            return yaml.load(text, Loader=SafeLoader) or {}
+        except Exception as e:
+            raise UnexpectedError(f"Failed to load YAML file {file_path}: {e}")
+
+    async def _save_yaml_file(
+        self, file_path: Path, data: Dict[str, Any]
+    ) -> FileSignature:
+        """Write a file and return its signature right after writing."""
         try:
             async with self._get_lock(str(file_path)):
+                self._parsed.pop(file_path)
+                file_path.parent.mkdir(parents=True, exist_ok=True)
                 with open(file_path, "w", encoding="utf-8") as f:
                     portalocker.lock(f, portalocker.LOCK_EX)
                     try:
-                        yaml.safe_dump(
+                        text = yaml.dump(
                             data,
-                            f,
+                            Dumper=SafeDumper,
                             default_flow_style=False,
                             allow_unicode=True,
                             sort_keys=False,
                         )
+                        f.write(text)
+                        # Still under the exclusive lock, so it is ours
+                        f.flush()
+                        stat = os.fstat(f.fileno())
                     finally:
                         portalocker.unlock(f)
+                self._writes[file_path] = self._writes.get(file_path, 0) + 1
         except Exception as e:
             if "lock" in str(e).lower():
                 raise StorageLockError(f"Failed to acquire write lock for {file_path}")
             raise UnexpectedError(f"Failed to save YAML file {file_path}: {e}")
 
-    async def load_rules(self, scope: RuleScope) -> RuleSet:
-        file_path = self._get_file_path(scope)
-        data = await self._load_yaml_file(file_path)
+        if self.sidecar_snapshots:
+            self._write_sidecar(file_path, _content_hash(text), data)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _sidecar_path(self, file_path: Path) -> Path:
+        return file_path.with_name(f".{file_path.name}.json")
+
+    def _read_sidecar(self, file_path: Path, digest: str) -> Optional[Dict[str, Any]]:
+        """Return the sidecar's content if it was made from this YAML."""
+        try:
+            with open(self._sidecar_path(file_path), "r", encoding="utf-8") as f:
+                sidecar = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (
+            not isinstance(sidecar, dict)
+            or sidecar.get("format") != SIDECAR_FORMAT
+            or sidecar.get("source_hash") != digest
+        ):
+            return None
+        return sidecar.get("content")
+
+    def _write_sidecar(
+        self, file_path: Path, digest: str, content: Dict[str, Any]
+    ) -> None:
+        # The sidecar is only an accelerator: content JSON cannot represent
+        # exactly (dates, non-string keys) and write errors skip it
+        try:
+            encoded = json.dumps(
+                {"format": SIDECAR_FORMAT, "source_hash": digest, "content": content},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            if json.loads(encoded)["content"] != content:
+                return
+            sidecar_path = self._sidecar_path(file_path)
+            temp_path = sidecar_path.with_name(f"{sidecar_path.name}.tmp")
+            temp_path.write_text(encoded, encoding="utf-8")
+            os.replace(temp_path, sidecar_path)
+        except (OSError, TypeError, ValueError):
+            pass
+
+    async def load_rules(
+        self, scope: RuleScope, tenant: Optional[str] = None
+    ) -> RuleSet:
+        file_path = self._get_file_path(scope, tenant)
+
+        # Taken before reading: a change made while the file is read
+        # leaves a stale signature, and the next load parses it again
+        signature = self._stat(file_path)
+        cached = self._parsed.get(file_path)
+        if cached is not None and cached[0] == signature:
+            ruleset = cached[1]
+        else:
+            ruleset = self._parse(file_path, await self._load_yaml_file(file_path))
+            if ruleset is None:
+                ruleset = RuleSet(scope=scope, tenant=tenant, rules=[])
+            self._parsed.put(file_path, (signature, ruleset))
+
+        # Callers may add and remove rules without affecting the cache
+        return ruleset.model_copy(
+            update={"rules": list(ruleset.rules), "metadata": dict(ruleset.metadata)}
+        )
 
+    def _parse(self, file_path: Path, data: Dict[str, Any]) -> Optional[RuleSet]:
         if not data:
-            return RuleSet(scope=scope, rules=[])
+            return None
 
         try:
             return RuleSet(**data)
@@ -76,28 +241,32 @@ class YAMLRuleStore(RuleStore):
             raise UnexpectedError(f"Failed to parse ruleset from {file_path}: {e}")
 
     async def save_rules(self, ruleset: RuleSet) -> None:
-        file_path = self._get_file_path(ruleset.scope)
+        file_path = self._get_file_path(ruleset.scope, ruleset.tenant)
 
-        # Update timestamps
+        # Update timestamps, on copies: loaded rules are shared with the cache
         now = datetime.utcnow().isoformat()
-        for rule in ruleset.rules:
-            if not rule.created_at:
-                rule.created_at = now
-            rule.updated_at = now
+        rules = [
+            rule.model_copy(
+                update={"created_at": rule.created_at or now, "updated_at": now}
+            )
+            for rule in ruleset.rules
+        ]
+        ruleset = ruleset.model_copy(
+            update={"rules": rules, "metadata": dict(ruleset.metadata)}
+        )
 
         ruleset_dict = ruleset.model_dump(mode='json')
-        await self._save_yaml_file(file_path, ruleset_dict)
+        signature = await self._save_yaml_file(file_path, ruleset_dict)
+        self._parsed.put(file_path, (signature, ruleset))
 
     async def get_rule(
-        self, rule_name: str, scope: Optional[RuleScope] = None
+        self,
+        rule_name: str,
+        scope: Optional[RuleScope] = None,
+        tenant: Optional[str] = None,
     ) -> Optional[Rule]:
-        if scope:
-            scopes = [scope]
-        else:
-            scopes = list(RuleScope)
-
-        for scope_to_check in scopes:
-            ruleset = await self.load_rules(scope_to_check)
+        for scope_to_check, tenant_to_check in self._locations(scope, tenant):
+            ruleset = await self.load_rules(scope_to_check, tenant_to_check)
             for rule in ruleset.rules:
                 if rule.name == rule_name:
                     return rule
@@ -105,7 +274,7 @@ class YAMLRuleStore(RuleStore):
         return None
 
     async def add_rule(self, rule: Rule) -> None:
-        ruleset = await self.load_rules(rule.scope)
+        ruleset = await self.load_rules(rule.scope, rule.tenant)
 
         # Check if rule already exists
         existing_rule = next((r for r in ruleset.rules if r.name == rule.name), None)
@@ -120,7 +289,7 @@ class YAMLRuleStore(RuleStore):
         await self.save_rules(ruleset)
 
     async def update_rule(self, rule: Rule) -> None:
-        ruleset = await self.load_rules(rule.scope)
+        ruleset = await self.load_rules(rule.scope, rule.tenant)
 
         for i, existing_rule in enumerate(ruleset.rules):
             if existing_rule.name == rule.name:
@@ -132,8 +301,10 @@ class YAMLRuleStore(RuleStore):
 
         raise RuleNotFoundError(rule.name)
 
-    async def delete_rule(self, rule_name: str, scope: RuleScope) -> bool:
-        ruleset = await self.load_rules(scope)
+    async def delete_rule(
+        self, rule_name: str, scope: RuleScope, tenant: Optional[str] = None
+    ) -> bool:
+        ruleset = await self.load_rules(scope, tenant)
 
         for i, rule in enumerate(ruleset.rules):
             if rule.name == rule_name:
@@ -143,40 +314,60 @@ class YAMLRuleStore(RuleStore):
 
         return False
 
-    async def list_rules(self, scope: Optional[RuleScope] = None) -> List[Rule]:
-        if scope:
-            scopes = [scope]
-        else:
-            scopes = list(RuleScope)
-
+    async def list_rules(
+        self, scope: Optional[RuleScope] = None, tenant: Optional[str] = None
+    ) -> List[Rule]:
         all_rules = []
-        for scope_to_check in scopes:
-            ruleset = await self.load_rules(scope_to_check)
+        for scope_to_check, tenant_to_check in self._locations(scope, tenant):
+            ruleset = await self.load_rules(scope_to_check, tenant_to_check)
             all_rules.extend(ruleset.rules)
 
         return all_rules
 
     async def backup_rules(self, backup_path: str) -> None:
-        backup_dir = Path(backup_path)
-        backup_dir.mkdir(parents=True, exist_ok=True)
+        backup_store = YAMLRuleStore(backup_path)
 
-        for scope in RuleScope:
-            source_path = self._get_file_path(scope)
+        for scope, tenant in self._all_locations():
+            source_path = self._get_file_path(scope, tenant)
             if source_path.exists():
-                dest_path = backup_dir / f"{scope.value}.yaml"
+                dest_path = backup_store._get_file_path(scope, tenant)
                 data = await self._load_yaml_file(source_path)
                 await self._save_yaml_file(dest_path, data)
 
     async def restore_rules(self, backup_path: str) -> None:
-        backup_dir = Path(backup_path)
+        backup_store = YAMLRuleStore(backup_path)
 
-        for scope in RuleScope:
-            backup_file = backup_dir / f"{scope.value}.yaml"
+        for scope, tenant in backup_store._all_locations():
+            backup_file = backup_store._get_file_path(scope, tenant)
             if backup_file.exists():
-                dest_path = self._get_file_path(scope)
+                dest_path = self._get_file_path(scope, tenant)
                 data = await self._load_yaml_file(backup_file)
                 await self._save_yaml_file(dest_path, data)
 
+    async def generation(self) -> Optional[Hashable]:
+        # Covers the shared files only; tenant partitions have their own
+        return tuple(self._signature(self._get_file_path(scope)) for scope in RuleScope)
+
+    async def partition_generation(
+        self, scope: RuleScope, tenant: str
+    ) -> Optional[Hashable]:
+        return self._signature(self._get_file_path(scope, tenant))
+
+    def _signature(self, file_path: Path) -> Hashable:
+        # Writes through this store bump the counter; the file signature
+        # catches edits made by other processes or by hand
+        return self._writes.get(file_path, 0), self._stat(file_path)
+
+    def _stat(self, file_path: Path) -> FileSignature:
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._parsed.stats()
+
     async def health_check(self) -> bool:
         try:
             # Check if directory is accessible
@@ -191,3 +382,7 @@ class YAMLRuleStore(RuleStore):
             return True
         except Exception:
             return False
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
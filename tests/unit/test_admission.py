@@ -0,0 +1,167 @@
+import asyncio
+import time
+
+import pytest
+
+from rule_manager.core.admission import AdmissionController, Deadline
+from rule_manager.core.batch import BatchEvaluator
+from rule_manager.core.engine import RuleEngine
+from rule_manager.models.base import RuleAction
+from rule_manager.models.errors import EvaluationOverloadedError, EvaluationTimeoutError
+
+
+def test_deadline_check():
+    Deadline(1000).check()
+    with pytest.raises(EvaluationTimeoutError) as exc_info:
+        Deadline(0).check()
+    assert exc_info.value.code == "E302"
+    assert exc_info.value.retry_allowed
+
+
+async def test_sheds_when_queue_is_full():
+    controller = AdmissionController(max_concurrent=1, max_queued=0, timeout_ms=0)
+
+    async with controller.admit():
+        with pytest.raises(EvaluationOverloadedError) as exc_info:
+            async with controller.admit():
+                pass
+
+    assert exc_info.value.code == "E301"
+    assert exc_info.value.retry_allowed
+    stats = controller.stats()
+    assert stats["rejected"] == 1
+    assert stats["active"] == 0
+
+
+async def test_queued_requests_run_in_turn():
+    controller = AdmissionController(max_concurrent=2, max_queued=10, timeout_ms=0)
+    running = 0
+    peak = 0
+
+    async def work():
+        nonlocal running, peak
+        async with controller.admit():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+
+    await asyncio.gather(*(work() for _ in range(8)))
+
+    assert peak == 2
+    stats = controller.stats()
+    assert stats["admitted"] == 8
+    assert stats["queued"] == 0
+    assert stats["active"] == 0
+
+
+async def test_queue_wait_counts_against_deadline(populated_store, sample_context):
+    engine = RuleEngine(
+        populated_store,
+        max_evaluation_time_ms=10,
+        max_concurrent_evaluations=1,
+        max_queued_evaluations=10,
+    )
+
+    async with engine.admission.admit():
+        with pytest.raises(EvaluationTimeoutError):
+            await engine.evaluate_rules(sample_context)
+
+    stats = engine.stats()["admission"]
+    assert stats["timed_out"] == 1
+    assert stats["queued"] == 0
+
+    summary = await engine.evaluate_rules(sample_context)
+    assert summary.final_action == RuleAction.ALLOW
+
+
+async def test_evaluation_stops_when_budget_runs_out(
+    populated_store, sample_context, monkeypatch
+):
+    engine = RuleEngine(populated_store, max_evaluation_time_ms=5)
+    evaluate = engine._evaluate
+
+    async def slow_evaluate(*args, **kwargs):
+        await asyncio.sleep(0.02)
+        return await evaluate(*args, **kwargs)
+
+    monkeypatch.setattr(engine, "_evaluate", slow_evaluate)
+
+    with pytest.raises(EvaluationTimeoutError):
+        await engine.evaluate_rules(sample_context)
+    with pytest.raises(EvaluationTimeoutError):
+        await engine.evaluate_decision(sample_context)
+
+    stats = engine.stats()["admission"]
+    assert stats["timed_out"] == 2
+    assert stats["active"] == 0
+
+
+async def test_snapshot_loading_does_not_count_against_budget(
+    populated_store, sample_context, monkeypatch
+):
+    engine = RuleEngine(populated_store, max_evaluation_time_ms=5)
+    get_snapshot = engine.get_snapshot
+
+    async def slow_snapshot(context=None):
+        snapshot = await get_snapshot(context)
+        await asyncio.sleep(0.02)
+        return snapshot
+
+    monkeypatch.setattr(engine, "get_snapshot", slow_snapshot)
+
+    summary = await engine.evaluate_rules(sample_context)
+    assert summary.final_action == RuleAction.ALLOW
+    results = await engine.evaluate_rules_batch([sample_context] * 2)
+    assert all(r.final_action == RuleAction.ALLOW for r in results)
+    columns = await engine.evaluate_columns([sample_context] * 2)
+    assert columns.final_actions == [RuleAction.ALLOW] * 2
+    assert engine.stats()["admission"]["timed_out"] == 0
+
+
+async def test_columns_stop_when_budget_runs_out(
+    populated_store, sample_context, monkeypatch
+):
+    engine = RuleEngine(populated_store, max_evaluation_time_ms=5)
+    evaluate_rule = BatchEvaluator._evaluate_rule
+
+    def slow_evaluate_rule(*args):
+        time.sleep(0.005)
+        return evaluate_rule(*args)
+
+    monkeypatch.setattr(BatchEvaluator, "_evaluate_rule", slow_evaluate_rule)
+
+    with pytest.raises(EvaluationTimeoutError) as exc_info:
+        await engine.evaluate_columns([sample_context] * 10)
+
+    assert exc_info.value.code == "E302"
+    assert engine.stats()["admission"]["timed_out"] == 1
+
+
+async def test_batch_contexts_have_their_own_budget(
+    populated_store, sample_context, monkeypatch
+):
+    engine = RuleEngine(populated_store, max_evaluation_time_ms=20)
+    evaluate_snapshot = engine.evaluate_snapshot
+
+    def slow_evaluate_snapshot(*args, **kwargs):
+        time.sleep(0.005)
+        return evaluate_snapshot(*args, **kwargs)
+
+    monkeypatch.setattr(engine, "evaluate_snapshot", slow_evaluate_snapshot)
+
+    # Together the contexts take longer than one budget
+    results = await engine.evaluate_rules_batch([sample_context] * 10)
+
+    assert all(r.final_action == RuleAction.ALLOW for r in results)
+    assert engine.stats()["admission"]["timed_out"] == 0
+
+
+async def test_unlimited_without_limits(populated_store, sample_context):
+    engine = RuleEngine(
+        populated_store, max_evaluation_time_ms=0, max_concurrent_evaluations=0
+    )
+    results = await asyncio.gather(
+        *(engine.evaluate_rules(sample_context) for _ in range(5))
+    )
+    assert all(r.final_action == RuleAction.ALLOW for r in results)
@@ -0,0 +1,239 @@
+import random
+
+import pytest
+
+from rule_manager.core.batch import BatchEvaluator, ColumnarContexts
+from rule_manager.core.compiler import ConditionCompiler
+from rule_manager.core.dsl import DSLEvaluator
+from rule_manager.core.engine import RuleEngine
+from rule_manager.core.ruleset import CompiledRuleset
+from rule_manager.models.base import Rule, RuleSet, RuleScope, RuleAction, RuleContext
+
+RULES = [
+    Rule(
+        name="deny_blocked_models",
+        scope=RuleScope.GLOBAL,
+        priority=90,
+        action=RuleAction.DENY,
+        conditions={"model": "model_name in ['gpt-3.5', 'legacy']"},
+    ),
+    Rule(
+        name="warn_large_prompts",
+        scope=RuleScope.GLOBAL,
+        priority=50,
+        action=RuleAction.WARN,
+        conditions={
+            "size": "prompt_length > 2000",
+            "who": {"or": ["user_role == 'guest'", {"not": "environment"}]},
+        },
+    ),
+    Rule(
+        name="deny_bad_counts",
+        scope=RuleScope.GLOBAL,
+        priority=50,
+        action=RuleAction.DENY,
+        # Raises when request_count is missing or not a number
+        conditions={"count": "request_count > 10", "user": "user_id matches 'u\\d'"},
+    ),
+    Rule(
+        name="not_error",
+        scope=RuleScope.GLOBAL,
+        priority=40,
+        action=RuleAction.DENY,
+        conditions={"count": {"not": "request_count < 5"}},
+    ),
+    Rule(
+        name="default",
+        scope=RuleScope.GLOBAL,
+        priority=10,
+        action=RuleAction.ALLOW,
+        conditions={},
+    ),
+]
+
+
+def make_contexts(count, seed=7):
+    rng = random.Random(seed)
+    contexts = []
+    for i in range(count):
+        attributes = {
+            "user_role": rng.choice(["admin", "guest", "member"]),
+            "environment": rng.choice(["production", "", None]),
+        }
+        if rng.random() < 0.8:
+            attributes["request_count"] = rng.choice([0, 3, 20, "many"])
+        contexts.append(
+            RuleContext(
+                user_id=rng.choice(["u1", "u22", "admin"]),
+                model_name=rng.choice(["gpt-4", "gpt-3.5", "legacy", None]),
+                prompt_length=rng.randrange(4000),
+                custom_attributes=attributes,
+            )
+        )
+    return contexts
+
+
+class TestBatchEvaluator:
+    def setup_method(self):
+        self.ruleset = CompiledRuleset(RULES, ConditionCompiler(DSLEvaluator()))
+        self.contexts = make_contexts(300)
+
+    def expected(self, context):
+        memo = self.ruleset.new_memo()
+        matched = []
+        for compiled_rule in self.ruleset.rules:
+            try:
+                matched.append(compiled_rule.matches(context, memo))
+            except Exception:
+                matched.append(False)
+        return matched
+
+    def test_matches_per_context_evaluation(self):
+        batch = ColumnarContexts.from_contexts(self.contexts)
+        result = BatchEvaluator(self.ruleset).evaluate(batch)
+
+        for row, context in enumerate(self.contexts):
+            expected = self.expected(context)
+            assert [result.matched(name)[row] for name in result.rule_names] == expected
+            first = expected.index(True)
+            assert result.final_actions[row] == RULES[first].action
+
+        assert result.errors["deny_bad_counts"]
+        assert result.errors["not_error"]
+
+    def test_numpy_columns(self):
+        np = pytest.importorskip("numpy")
+        lengths = [100, 2500, 3000, 50]
+        batch = ColumnarContexts(
+            {
+                "model_name": np.array(["gpt-4", "legacy", "gpt-4", "gpt-4"]),
+                "prompt_length": np.array(lengths),
+                "user_role": ["guest", "admin", "guest", "guest"],
+                "environment": ["production"] * 4,
+                "request_count": np.array([1, 2, 30, 4]),
+                "user_id": np.array(["u1", "u2", "u3", "x"]),
+            }
+        )
+        result = BatchEvaluator(self.ruleset).evaluate(batch)
+
+        assert result.matched("warn_large_prompts") == [False, False, True, False]
+        assert result.matched("deny_bad_counts") == [False, False, True, False]
+        assert result.final_actions == [
+            RuleAction.ALLOW,
+            RuleAction.DENY,
+            RuleAction.WARN,
+            RuleAction.ALLOW,
+        ]
+        assert result.matched_rules(2) == [
+            "warn_large_prompts",
+            "deny_bad_counts",
+            "not_error",
+            "default",
+        ]
+
+    def test_mismatched_column_lengths(self):
+        with pytest.raises(ValueError, match="same length"):
+            ColumnarContexts({"a": [1, 2], "b": [1]})
+
+
+class TestEngineBatch:
+    async def test_evaluate_columns(self, yaml_store):
+        await yaml_store.save_rules(RuleSet(scope=RuleScope.GLOBAL, rules=RULES))
+        engine = RuleEngine(yaml_store)
+        contexts = make_contexts(50, seed=3)
+
+        result = await engine.evaluate_columns(contexts)
+
+        for row, context in enumerate(contexts):
+            summary = await engine.evaluate_rules(context)
+            assert result.final_actions[row] == summary.final_action
+            assert result.matched_rules(row) == [
+                r.rule_name for r in summary.results if r.matched
+            ]
+
+    async def test_evaluate_columns_with_tenant_rules(self, yaml_store):
+        await yaml_store.save_rules(RuleSet(scope=RuleScope.GLOBAL, rules=RULES))
+        await yaml_store.add_rule(
+            Rule(
+                name="block_project",
+                scope=RuleScope.PROJECT,
+                tenant="p1",
+                priority=100,
+                action=RuleAction.DENY,
+                conditions={"env": "environment == 'production'"},
+            )
+        )
+        await yaml_store.add_rule(
+            Rule(
+                name="warn_user",
+                scope=RuleScope.INDIVIDUAL,
+                tenant="u1",
+                priority=95,
+                action=RuleAction.WARN,
+            )
+        )
+        engine = RuleEngine(yaml_store)
+        contexts = [
+            context.model_copy(update={"project_id": ["p0", "p1", None][row % 3]})
+            for row, context in enumerate(make_contexts(60, seed=5))
+        ]
+
+        result = await engine.evaluate_columns(contexts)
+
+        assert result.rule_names[:2] == ["block_project", "warn_user"]
+        assert result.match_count("block_project") > 0
+        for row, context in enumerate(contexts):
+            summary = await engine.evaluate_rules(context)
+            assert result.final_actions[row] == summary.final_action
+            assert result.matched_rules(row) == [
+                r.rule_name for r in summary.results if r.matched
+            ]
+
+    async def test_evaluate_columns_with_nested_attributes(self, yaml_store):
+        await yaml_store.save_rules(
+            RuleSet(
+                scope=RuleScope.GLOBAL,
+                rules=[
+                    Rule(
+                        name="deny_gold",
+                        scope=RuleScope.GLOBAL,
+                        priority=90,
+                        action=RuleAction.DENY,
+                        conditions={"tier": "custom_attributes.org.tier == 'gold'"},
+                    ),
+                    Rule(
+                        name="warn_region",
+                        scope=RuleScope.GLOBAL,
+                        priority=50,
+                        action=RuleAction.WARN,
+                        conditions={
+                            "region": "custom_attributes.org.region.name == 'eu'"
+                        },
+                    ),
+                ],
+            )
+        )
+        engine = RuleEngine(yaml_store)
+        rng = random.Random(11)
+        contexts = [
+            RuleContext(
+                user_id="u1",
+                custom_attributes={
+                    "org": {
+                        "tier": rng.choice(["gold", "silver"]),
+                        "region": rng.choice([{"name": "eu"}, {"name": "us"}, None]),
+                    }
+                },
+            )
+            for _ in range(40)
+        ]
+
+        result = await engine.evaluate_columns(contexts)
+
+        assert result.match_count("deny_gold") > 0
+        for row, context in enumerate(contexts):
+            summary = await engine.evaluate_rules(context)
+            assert result.final_actions[row] == summary.final_action
+            assert result.matched_rules(row) == [
+                r.rule_name for r in summary.results if r.matched
+            ]
@@ -0,0 +1,85 @@
+import pytest
+
+from rule_manager.core.compiler import ConditionCompiler
+from rule_manager.core.dsl import DSLEvaluator
+from rule_manager.models.base import RuleContext
+from rule_manager.models.errors import RuleDSLSyntaxError
+
+CONDITIONS = [
+    {},
+    {"model": "model_name == 'gpt-4'"},
+    {"model": "model_name == 'gpt-4'", "length": "prompt_length > 2000"},
+    {"env": "environment", "role": "user_role != 'guest'"},
+    {"list": "model_name in ['gpt-4', 'claude']", "dyn": "model_name in models"},
+    {"text": "notes contains 'urgent'", "prefix": "user_id startswith 'user'"},
+    {"suffix": "user_id endswith '123'", "regex": "user_id matches 'user\\d+'"},
+    {"nested": "(prompt_length > 1000 and not (model_name == 'x')) == true"},
+    {"complex": {"or": ["prompt_length > 2000", {"not": "environment == 'dev'"}]}},
+    {"complex": {"and": ["user_role == 'admin'", True, {"or": []}]}},
+    {"complex": {"not": {"and": ["prompt_length < 10", "model_name == 'gpt-4'"]}}},
+    {"values": "[prompt_length, 5] contains 1500"},
+    {"deny": "model_name not in ['gpt-3.5', 'claude']", "any": "models in [1, 2]"},
+    {"folded": "1 < 2 and (model_name == 'gpt-4' or false)", "const": "not true"},
+]
+
+
+class TestConditionCompiler:
+    def setup_method(self):
+        self.dsl = DSLEvaluator()
+        self.context = RuleContext(
+            user_id="user123",
+            model_name="gpt-4",
+            prompt_length=1500,
+            custom_attributes={
+                "environment": "production",
+                "user_role": "admin",
+                "models": ["gpt-4"],
+                "notes": "this is urgent",
+            },
+        )
+
+    @pytest.mark.parametrize("conditions", CONDITIONS)
+    def test_codegen_matches_interpreter(self, conditions):
+        interpreter = ConditionCompiler(self.dsl, mode="interpreter")
+        codegen = ConditionCompiler(self.dsl, mode="codegen")
+
+        for context in (self.context, RuleContext(model_name="claude")):
+            try:
+                expected = interpreter.compile(conditions).evaluate(context)
+            except RuleDSLSyntaxError:
+                with pytest.raises(RuleDSLSyntaxError):
+                    codegen.compile(conditions).evaluate(context)
+                continue
+            assert codegen.compile(conditions).evaluate(context) is expected
+
+    def test_compiled_conditions_are_cached(self):
+        compiler = ConditionCompiler(self.dsl, mode="codegen")
+        conditions = {"model": "model_name == 'gpt-4'"}
+        assert compiler.compile(conditions) is compiler.compile(dict(conditions))
+
+    def test_codegen_has_no_builtins(self):
+        compiler = ConditionCompiler(self.dsl, mode="codegen")
+        function = compiler.compile({"model": "model_name == 'gpt-4'"}).function
+        assert function.__globals__["__builtins__"] == {}
+
+    @pytest.mark.parametrize("mode", ["interpreter", "codegen"])
+    def test_compile_errors_raised_on_evaluation(self, mode):
+        compiler = ConditionCompiler(self.dsl, mode=mode)
+        compiled = compiler.compile({"bad": "model_name == == 'x'"})
+        with pytest.raises(RuleDSLSyntaxError):
+            compiled.evaluate(self.context)
+
+        compiled = compiler.compile({"bad": {"xor": ["true"]}})
+        with pytest.raises(RuleDSLSyntaxError):
+            compiled.evaluate(self.context)
+
+    @pytest.mark.parametrize("mode", ["interpreter", "codegen"])
+    def test_comparison_errors(self, mode):
+        compiler = ConditionCompiler(self.dsl, mode=mode)
+        compiled = compiler.compile({"length": "prompt_length > 10"})
+        with pytest.raises(RuleDSLSyntaxError, match="Error in comparison"):
+            compiled.evaluate(RuleContext())
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            ConditionCompiler(self.dsl, mode="jit")
@@ -0,0 +1,186 @@
+from rule_manager.core.decision_cache import DecisionCache
+from rule_manager.core.engine import RuleEngine
+from rule_manager.core.results import CompactDecision
+from rule_manager.models.base import Rule, RuleSet, RuleScope, RuleAction, RuleContext
+from rule_manager.utils.cache import SizedLRUCache
+
+
+def test_sized_lru_cache_evicts_by_bytes():
+    cache = SizedLRUCache(max_bytes=10)
+    cache.put("a", 1, 4)
+    cache.put("b", 2, 4)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3, 4)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.bytes == 8
+
+    cache.put("huge", 4, 11)
+    assert cache.get("huge") is None
+    assert cache.stats()["evictions"] == 1
+
+
+async def test_hit_when_only_unreferenced_attributes_differ(
+    populated_store, sample_context
+):
+    engine = RuleEngine(populated_store, decision_cache_mb=1)
+
+    first = await engine.evaluate_rules(sample_context)
+    other = sample_context.model_copy(
+        update={"session_id": "another", "user_id": "someone_else"}
+    )
+    second = await engine.evaluate_rules(other)
+
+    assert second.context is other
+    assert second.final_action == first.final_action
+    assert [r.matched for r in second.results] == [r.matched for r in first.results]
+
+    stats = engine.stats()["decision_cache"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert "user_id" not in stats["fingerprinted_attributes"]
+
+
+async def test_miss_when_referenced_attribute_differs(populated_store, sample_context):
+    engine = RuleEngine(populated_store, decision_cache_mb=1)
+
+    await engine.evaluate_rules(sample_context)
+    other = sample_context.model_copy(
+        update={"custom_attributes": {"user_role": "user", "request_count": 500}}
+    )
+    summary = await engine.evaluate_rules(other)
+
+    assert summary.final_action == RuleAction.DENY
+    assert engine.stats()["decision_cache"]["hits"] == 0
+
+
+async def test_summary_and_decision_are_cached_separately(
+    populated_store, sample_context
+):
+    engine = RuleEngine(populated_store, decision_cache_mb=1)
+
+    await engine.evaluate_rules(sample_context)
+    decision = await engine.evaluate_decision(sample_context)
+    again = await engine.evaluate_decision(sample_context)
+
+    assert decision.deciding_rule.rule_name == "allow_admins"
+    assert again.deciding_rule.rule_name == "allow_admins"
+    assert engine.stats()["decision_cache"]["hits"] == 1
+
+
+async def test_invalidated_when_rules_change(populated_store, sample_context):
+    engine = RuleEngine(populated_store, decision_cache_mb=1)
+    assert (
+        await engine.evaluate_rules(sample_context)
+    ).final_action == RuleAction.ALLOW
+
+    ruleset = RuleSet(
+        scope=RuleScope.GLOBAL,
+        rules=[
+            Rule(
+                name="deny_all",
+                scope=RuleScope.GLOBAL,
+                priority=100,
+                action=RuleAction.DENY,
+                conditions={"always": "true"},
+            )
+        ],
+    )
+    await populated_store.save_rules(ruleset)
+
+    summary = await engine.evaluate_rules(sample_context)
+    assert summary.final_action == RuleAction.DENY
+    stats = engine.stats()["decision_cache"]
+    assert stats["hits"] == 0
+    assert stats["snapshots"] == 2
+
+
+async def test_tenant_snapshots_keep_their_entries(populated_store, sample_context):
+    await populated_store.add_rule(
+        Rule(
+            name="block_project",
+            scope=RuleScope.PROJECT,
+            tenant="test_project",
+            priority=100,
+            action=RuleAction.DENY,
+        )
+    )
+    engine = RuleEngine(populated_store, decision_cache_mb=1)
+    other = sample_context.model_copy(update={"project_id": "other"})
+
+    for _ in range(3):
+        tenant = await engine.evaluate_rules(sample_context)
+        shared = await engine.evaluate_rules(other)
+
+    assert tenant.final_action == RuleAction.DENY
+    assert shared.final_action == RuleAction.ALLOW
+    stats = engine.stats()["decision_cache"]
+    assert stats["misses"] == 2
+    assert stats["hits"] == 4
+    assert stats["snapshots"] == 2
+
+
+async def test_entries_account_for_their_overhead(populated_store, sample_context):
+    engine = RuleEngine(populated_store, decision_cache_mb=1)
+    await engine.evaluate_decision(sample_context)
+
+    entry = CompactDecision(0, 1).nbytes + DecisionCache.ENTRY_OVERHEAD
+    assert engine.stats()["decision_cache"]["bytes"] == entry
+
+
+async def test_whole_context_fingerprinted_for_untraceable_variables(yaml_store):
+    ruleset = RuleSet(
+        scope=RuleScope.GLOBAL,
+        rules=[
+            Rule(
+                name="by_fields",
+                scope=RuleScope.GLOBAL,
+                priority=50,
+                action=RuleAction.DENY,
+                conditions={"fields": "model_fields != None"},
+            )
+        ],
+    )
+    await yaml_store.save_rules(ruleset)
+    engine = RuleEngine(yaml_store, decision_cache_mb=1)
+
+    await engine.evaluate_rules(RuleContext(session_id="a"))
+    await engine.evaluate_rules(RuleContext(session_id="b"))
+
+    stats = engine.stats()["decision_cache"]
+    assert stats["fingerprinted_attributes"] is None
+    assert stats["hits"] == 0
+
+
+async def test_unsortable_attributes_are_not_cached(yaml_store):
+    ruleset = RuleSet(
+        scope=RuleScope.GLOBAL,
+        rules=[
+            Rule(
+                name="deny_mapped",
+                scope=RuleScope.GLOBAL,
+                priority=50,
+                action=RuleAction.DENY,
+                conditions={"mapped": "m"},
+            )
+        ],
+    )
+    await yaml_store.save_rules(ruleset)
+    engine = RuleEngine(yaml_store, decision_cache_mb=1)
+    context = RuleContext(custom_attributes={"m": {1: "a", "b": 2}})
+
+    for _ in range(2):
+        summary = await engine.evaluate_rules(context)
+        assert summary.final_action == RuleAction.DENY
+
+    stats = engine.stats()["decision_cache"]
+    assert stats["hits"] == 0
+    assert stats["size"] == 0
+
+
+async def test_disabled_by_default(populated_store, sample_context):
+    engine = RuleEngine(populated_store)
+    await engine.evaluate_rules(sample_context)
+    assert engine.decision_cache is None
+    assert engine.stats()["decision_cache"] is None
@@ -137,6 +137,19 @@ class TestDSLEvaluator:
         )
         assert self.evaluator.evaluate('user_role == "admin"', self.context) is True
 
+    def test_hyphenated_attribute_names(self):
+        context = RuleContext(
+            custom_attributes={"my-key": 3, "x-tier": {"level-1": "gold"}}
+        )
+        assert self.evaluator.evaluate("my-key == 3", context) is True
+        assert (
+            self.evaluator.evaluate(
+                "custom_attributes.x-tier.level-1 == 'gold'", context
+            )
+            is True
+        )
+        assert self.evaluator.evaluate("my-key==-3", context) is False
+
     def test_list_handling(self):
         assert (
             self.evaluator.evaluate("model_name in available_models", self.context)
@@ -213,3 +226,170 @@ class TestDSLEvaluator:
         context = RuleContext(user_id="user123")
         assert self.evaluator.evaluate('user_id matches "user\\d+"', context) is True
         assert self.evaluator.evaluate('user_id matches "admin\\w+"', context) is False
+
+    def test_compile_returns_reusable_expression(self):
+        compiled = self.evaluator.compile('model_name == "gpt-4"')
+        assert compiled.evaluate(self.context) is True
+        assert compiled.evaluate(RuleContext(model_name="claude")) is False
+
+    def test_compiled_expression_cache(self):
+        evaluator = DSLEvaluator(cache_size=2)
+        first = evaluator.compile("prompt_length > 1000")
+        assert evaluator.compile("  prompt_length > 1000 ") is first
+        assert evaluator.cache_stats()["hits"] == 1
+
+        evaluator.compile("prompt_length > 2000")
+        evaluator.compile("prompt_length > 3000")
+        assert evaluator.cache_stats()["evictions"] == 1
+        assert evaluator.compile("prompt_length > 1000") is not first
+
+    def test_quoted_literals_with_keywords_and_parentheses(self):
+        context = RuleContext(custom_attributes={"title": "salt and (pepper)"})
+        assert self.evaluator.evaluate('title == "salt and (pepper)"', context) is True
+        assert self.evaluator.evaluate("title contains ' or '", context) is False
+        assert self.evaluator.evaluate('title contains "=="', context) is False
+
+    def test_operator_substrings_in_identifiers(self):
+        context = RuleContext(custom_attributes={"contains_pii": True, "index": 3})
+        assert self.evaluator.evaluate("contains_pii == true", context) is True
+        assert self.evaluator.evaluate("index in [1, 2, 3]", context) is True
+
+    def test_logical_precedence(self):
+        # and binds tighter than or, not binds tighter than and
+        expr = 'user_id == "other" and model_name == "x" or prompt_length > 1000'
+        assert self.evaluator.evaluate(expr, self.context) is True
+        expr = 'not user_id == "other" and model_name == "gpt-4"'
+        assert self.evaluator.evaluate(expr, self.context) is True
+        expr = 'not (user_id == "user123" and model_name == "gpt-4")'
+        assert self.evaluator.evaluate(expr, self.context) is False
+
+    def test_nested_parentheses(self):
+        expr = "((((prompt_length > 1000))) and (user_role == 'admin' or (false)))"
+        assert self.evaluator.evaluate(expr, self.context) is True
+
+    def test_list_with_quoted_commas(self):
+        context = RuleContext(custom_attributes={"name": "a, b"})
+        assert self.evaluator.evaluate('name in ["a, b", "c"]', context) is True
+
+    def test_validation_reports_position(self):
+        issues = self.evaluator.validate_expression("user_id == == 'test'")
+        assert len(issues) == 1
+        assert "position 11" in issues[0]
+
+        issues = self.evaluator.validate_expression("user_id == 'test')")
+        assert "parentheses" in issues[0].lower()
+
+        issues = self.evaluator.validate_expression("user_id == 'test")
+        assert "unterminated" in issues[0].lower()
+
+    def test_matches_pattern_compiled_at_load_time(self):
+        evaluator = DSLEvaluator()
+        compiled = evaluator.compile('user_id matches "user\\d+"')
+        assert evaluator.patterns.stats()["size"] == 1
+
+        compiled.evaluate(RuleContext(user_id="user1"))
+        evaluator.compile('model_name matches "user\\d+"')
+        assert evaluator.patterns.stats()["hits"] == 1
+
+    def test_matches_dynamic_pattern(self):
+        context = RuleContext(user_id="user123", custom_attributes={"p": "user\\d+"})
+        assert self.evaluator.evaluate("user_id matches p", context) is True
+
+    def test_matches_invalid_pattern(self):
+        issues = self.evaluator.validate_expression('user_id matches "user("')
+        assert len(issues) == 1
+        assert "regular expression" in issues[0]
+
+    def test_matches_input_length_guard(self):
+        evaluator = DSLEvaluator(regex_max_input_length=10)
+        context = RuleContext(user_id="user" + "1" * 20)
+        with pytest.raises(RuleDSLSyntaxError, match="exceeds"):
+            evaluator.evaluate('user_id matches "user\\d+"', context)
+
+    @pytest.mark.parametrize(
+        "pattern",
+        [
+            "(a+)+$",
+            "(a|aa)+$",
+            "^(\\w+\\s?)*$",
+            "(x+x+)+y",
+            "(a+){1,100}$",
+            "(a?){30}a{30}",
+        ],
+    )
+    def test_matches_backtracking_guard(self, pattern):
+        evaluator = DSLEvaluator()
+        if evaluator.patterns.supports_timeout:
+            pytest.skip("time budget enforced by the regex module")
+        issues = evaluator.validate_expression(f'user_id matches "{pattern}"')
+        assert "nested" in issues[0]
+
+    @pytest.mark.parametrize(
+        "pattern",
+        [
+            "^(\\w+\\.)*example\\.com$",
+            "^([a-z]+-)*[a-z]+$",
+            "(ab|a)+",
+            "(\\d+,)*",
+            "(\\d{1,3}\\.){3}\\d{1,3}",
+        ],
+    )
+    def test_matches_accepts_delimited_repeats(self, pattern):
+        assert DSLEvaluator().validate_expression(f'user_id matches "{pattern}"') == []
+
+    @pytest.mark.parametrize(
+        "name, kind",
+        [
+            ("user_id", "field"),
+            ("environment", "custom"),
+            ("missing", "custom"),
+            ("custom_attributes.user_role", "path"),
+            ("custom_attributes.settings.tier", "path"),
+            ("custom_attributes.settings.missing", "path"),
+            ("tier.level", "custom"),
+            ("model_dump", "dynamic"),
+        ],
+    )
+    def test_variable_accessors(self, name, kind):
+        from rule_manager.core.dsl import Variable, _get_context_value
+
+        context = RuleContext(
+            user_id="user123",
+            custom_attributes={
+                "environment": "production",
+                "user_role": "admin",
+                "settings": {"tier": "gold"},
+                "tier.level": 3,
+            },
+        )
+        variable = Variable(name)
+        assert variable.kind == kind
+        assert variable.evaluate(context) == _get_context_value(name, context)
+
+    def test_in_literal_list_uses_frozenset(self):
+        from rule_manager.core.dsl import Membership
+
+        compiled = self.evaluator.compile("model_name not in ['gpt-3.5', 'claude']")
+        assert isinstance(compiled.root, Membership)
+        assert compiled.root.values == frozenset({"gpt-3.5", "claude"})
+        assert compiled.evaluate(self.context) is True
+
+    def test_in_literal_list_with_unhashable_value(self):
+        context = RuleContext(custom_attributes={"tags": ["a", "b"]})
+        assert self.evaluator.evaluate("tags in [1, 2]", context) is False
+        assert self.evaluator.evaluate("tags not in [1, 2]", context) is True
+
+    def test_constant_folding(self):
+        from rule_manager.core.dsl import And, Literal
+
+        assert self.evaluator.compile("1 < 2").root == Literal(True)
+        assert self.evaluator.compile("not (1 in [2, 3])").root == Literal(True)
+        assert self.evaluator.compile("user_id == 'a' and false").root == And(
+            (self.evaluator.compile("user_id == 'a'").root, Literal(False))
+        )
+        assert self.evaluator.compile("false and user_id == 'a'").root == Literal(False)
+        assert self.evaluator.compile("true or user_id == 'a'").root == Literal(True)
+
+        # Comparisons that fail at runtime are not folded away
+        with pytest.raises(RuleDSLSyntaxError, match="Error in comparison"):
+            self.evaluator.evaluate("1 < 'a'", self.context)
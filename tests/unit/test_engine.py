@@ -0,0 +1,313 @@
+import pytest
+
+from rule_manager.core.engine import RuleEngine
+from rule_manager.models.base import (
+    Rule,
+    RuleSet,
+    RuleScope,
+    RuleAction,
+    RuleContext,
+)
+
+
+class TestRuleEngine:
+    @pytest.mark.parametrize("mode", ["interpreter", "codegen"])
+    async def test_evaluate_rules(self, populated_store, sample_context, mode):
+        engine = RuleEngine(populated_store, evaluation_mode=mode)
+        summary = await engine.evaluate_rules(sample_context)
+
+        assert summary.applicable_rules_count == 3
+        assert summary.matched_rules_count == 2
+        assert summary.final_action == RuleAction.ALLOW
+        assert [r.rule_name for r in summary.results] == [
+            "allow_admins",
+            "rate_limit",
+            "default_allow",
+        ]
+
+    @pytest.mark.parametrize("mode", ["interpreter", "codegen"])
+    async def test_complex_conditions(self, yaml_store, sample_context, mode):
+        rule = Rule(
+            name="deny_large_non_admin",
+            scope=RuleScope.GLOBAL,
+            action=RuleAction.DENY,
+            conditions={
+                "size": "prompt_length >= 1000",
+                "who": {"or": ["user_role == 'guest'", {"not": "environment"}]},
+            },
+        )
+        await yaml_store.save_rules(RuleSet(scope=RuleScope.GLOBAL, rules=[rule]))
+        engine = RuleEngine(yaml_store, evaluation_mode=mode)
+
+        summary = await engine.evaluate_rules(sample_context)
+        assert summary.results[0].matched is False
+
+        context = sample_context.model_copy(
+            update={"custom_attributes": {"user_role": "guest"}}
+        )
+        summary = await engine.evaluate_rules(context)
+        assert summary.results[0].matched is True
+        assert summary.final_action == RuleAction.DENY
+
+    async def test_invalid_condition_reports_error(self, yaml_store):
+        rule = Rule(
+            name="broken",
+            scope=RuleScope.GLOBAL,
+            action=RuleAction.ALLOW,
+            conditions={"bad": "user_id == == 'x'"},
+        )
+        await yaml_store.save_rules(RuleSet(scope=RuleScope.GLOBAL, rules=[rule]))
+        engine = RuleEngine(yaml_store)
+
+        summary = await engine.evaluate_rules(RuleContext())
+        result = summary.results[0]
+        assert result.matched is False
+        assert result.action == RuleAction.DENY
+        assert "Rule evaluation error" in result.message
+
+    async def test_snapshot_reused_until_store_changes(
+        self, populated_store, sample_context
+    ):
+        engine = RuleEngine(populated_store)
+
+        await engine.evaluate_rules(sample_context)
+        await engine.evaluate_rules(sample_context)
+        assert engine.stats()["snapshot"]["builds"] == 1
+
+        await populated_store.add_rule(
+            Rule(
+                name="deny_everything",
+                scope=RuleScope.PROJECT,
+                priority=100,
+                action=RuleAction.DENY,
+            )
+        )
+        summary = await engine.evaluate_rules(sample_context)
+        assert engine.stats()["snapshot"]["builds"] == 2
+        assert summary.applicable_rules_count == 4
+        assert summary.final_action == RuleAction.DENY
+
+        engine.invalidate()
+        await engine.evaluate_rules(sample_context)
+        assert engine.stats()["snapshot"]["builds"] == 3
+
+    async def test_store_change_recompiles_only_changed_rules(
+        self, populated_store, sample_context
+    ):
+        engine = RuleEngine(populated_store)
+        await engine.evaluate_rules(sample_context)
+        assert engine.stats()["snapshot"]["compiled_rules"] == 3
+
+        rule = await populated_store.get_rule("rate_limit", RuleScope.GLOBAL)
+        await populated_store.update_rule(
+            rule.model_copy(update={"conditions": {"limit": "request_count > 10"}})
+        )
+        await engine.evaluate_rules(sample_context)
+        assert engine.stats()["snapshot"]["compiled_rules"] == 1
+
+        await populated_store.add_rule(rule.model_copy(update={"name": "copy"}))
+        await engine.evaluate_rules(sample_context)
+        assert engine.stats()["snapshot"]["compiled_rules"] == 1
+
+        await populated_store.delete_rule("allow_admins", RuleScope.GLOBAL)
+        summary = await engine.evaluate_rules(sample_context)
+        assert engine.stats()["snapshot"]["compiled_rules"] == 0
+
+        rebuilt = await RuleEngine(populated_store).evaluate_rules(sample_context)
+        assert summary.final_action == rebuilt.final_action
+        assert [r.model_dump() for r in summary.results] == [
+            r.model_dump() for r in rebuilt.results
+        ]
+
+    async def test_tenant_rules_apply_to_their_tenant_only(
+        self, populated_store, sample_context
+    ):
+        await populated_store.add_rule(
+            Rule(
+                name="block_project",
+                scope=RuleScope.PROJECT,
+                tenant="test_project",
+                priority=100,
+                action=RuleAction.DENY,
+            )
+        )
+        await populated_store.add_rule(
+            Rule(
+                name="warn_user",
+                scope=RuleScope.INDIVIDUAL,
+                tenant="other_user",
+                priority=100,
+                action=RuleAction.WARN,
+            )
+        )
+        engine = RuleEngine(populated_store)
+
+        summary = await engine.evaluate_rules(sample_context)
+        assert [r.rule_name for r in summary.results] == [
+            "block_project",
+            "allow_admins",
+            "rate_limit",
+            "default_allow",
+        ]
+        assert summary.final_action == RuleAction.DENY
+
+        # Other tenants get the shared snapshot or their own
+        other = sample_context.model_copy(update={"project_id": "other"})
+        summary = await engine.evaluate_rules(other)
+        assert summary.applicable_rules_count == 3
+        assert summary.final_action == RuleAction.ALLOW
+        other_user = other.model_copy(update={"user_id": "other_user"})
+        summary = await engine.evaluate_rules(other_user)
+        assert summary.final_action == RuleAction.WARN
+
+        # Tenant snapshots are cached until the tenant's partition changes
+        await engine.evaluate_rules(sample_context)
+        assert engine.stats()["tenants"]["snapshots"]["hits"] == 1
+        await populated_store.delete_rule(
+            "block_project", RuleScope.PROJECT, "test_project"
+        )
+        summary = await engine.evaluate_rules(sample_context)
+        assert summary.final_action == RuleAction.ALLOW
+        assert engine.stats()["snapshot"]["builds"] == 1
+
+    async def test_rule_index_skips_non_candidates(self, yaml_store, sample_context):
+        rules = [
+            Rule(
+                name=f"project_{i}",
+                scope=RuleScope.PROJECT,
+                action=RuleAction.DENY,
+                conditions={"project": f"project_id == 'p{i}'"},
+            )
+            for i in range(3)
+        ]
+        await yaml_store.save_rules(RuleSet(scope=RuleScope.PROJECT, rules=rules))
+
+        for enable_rule_index in (True, False):
+            engine = RuleEngine(yaml_store, enable_rule_index=enable_rule_index)
+            context = sample_context.model_copy(update={"project_id": "p1"})
+            summary = await engine.evaluate_rules(context)
+
+            assert summary.applicable_rules_count == 3
+            assert [r.matched for r in summary.results] == [False, True, False]
+            assert summary.final_action == RuleAction.DENY
+
+    async def test_decision_only_stops_at_first_match(
+        self, populated_store, sample_context
+    ):
+        engine = RuleEngine(populated_store)
+        decision = await engine.evaluate_decision(sample_context)
+
+        assert decision.final_action == RuleAction.ALLOW
+        assert decision.deciding_rule.rule_name == "allow_admins"
+        assert decision.evaluated_rules_count == 1
+        assert decision.applicable_rules_count == 3
+
+        context = sample_context.model_copy(
+            update={"custom_attributes": {"user_role": "guest", "request_count": 500}}
+        )
+        decision = await engine.evaluate_decision(context)
+        summary = await engine.evaluate_rules(context)
+        assert decision.final_action == summary.final_action == RuleAction.DENY
+        assert decision.deciding_rule.rule_name == "rate_limit"
+        # allow_admins is ruled out by the index without being evaluated
+        assert decision.evaluated_rules_count == 1
+
+    async def test_decision_only_without_match(self, yaml_store):
+        engine = RuleEngine(yaml_store)
+        decision = await engine.evaluate_decision(RuleContext())
+        assert decision.final_action == RuleAction.ALLOW
+        assert decision.deciding_rule is None
+
+    async def test_evaluate_rules_batch(self, populated_store, sample_context):
+        engine = RuleEngine(populated_store)
+        contexts = [
+            sample_context,
+            sample_context.model_copy(
+                update={"custom_attributes": {"request_count": 500}}
+            ),
+        ]
+
+        summaries = await engine.evaluate_rules_batch(contexts)
+        assert [s.final_action for s in summaries] == [
+            RuleAction.ALLOW,
+            RuleAction.DENY,
+        ]
+        assert summaries[1].context is contexts[1]
+
+        decisions = await engine.evaluate_rules_batch(contexts, decision_only=True)
+        assert [d.deciding_rule.rule_name for d in decisions] == [
+            "allow_admins",
+            "rate_limit",
+        ]
+        assert engine.stats()["snapshot"]["builds"] == 1
+
+    async def test_evaluate_snapshot_from_sync_code(
+        self, populated_store, sample_context
+    ):
+        engine = RuleEngine(populated_store)
+        snapshot = await engine.get_snapshot()
+
+        def evaluate_sync():
+            summary = engine.evaluate_snapshot(snapshot, sample_context)
+            decision = engine.evaluate_snapshot(
+                snapshot, sample_context, decision_only=True
+            )
+            return summary, decision
+
+        summary, decision = evaluate_sync()
+        assert summary.final_action == RuleAction.ALLOW
+        assert summary.matched_rules_count == 2
+        assert decision.deciding_rule.rule_name == "allow_admins"
+
+    async def test_verbosity(self, populated_store, sample_context):
+        engine = RuleEngine(populated_store)
+
+        full = await engine.evaluate_rules(sample_context)
+        assert len(full.results) == 3
+
+        matched = await engine.evaluate_rules(sample_context, verbosity="matched")
+        assert [r.rule_name for r in matched.results] == [
+            "allow_admins",
+            "default_allow",
+        ]
+        assert matched.matched_rules_count == full.matched_rules_count == 2
+        assert matched.applicable_rules_count == 3
+
+        decision = await engine.evaluate_rules(sample_context, verbosity="decision")
+        assert decision.final_action == full.final_action
+        assert decision.deciding_rule.rule_name == "allow_admins"
+        assert decision.deciding_rule.parameters == full.results[0].parameters
+
+        with pytest.raises(ValueError):
+            await engine.evaluate_rules(sample_context, verbosity="everything")
+
+    async def test_failed_rules_are_reported_as_matched(self, yaml_store):
+        ruleset = RuleSet(
+            scope=RuleScope.GLOBAL,
+            rules=[
+                Rule(
+                    name="broken",
+                    scope=RuleScope.GLOBAL,
+                    priority=60,
+                    action=RuleAction.ALLOW,
+                    conditions={"bad": "prompt_length > 'long'"},
+                ),
+                Rule(
+                    name="unmatched",
+                    scope=RuleScope.GLOBAL,
+                    priority=50,
+                    action=RuleAction.DENY,
+                    conditions={"role": "user_role == 'nobody'"},
+                ),
+            ],
+        )
+        await yaml_store.save_rules(ruleset)
+        engine = RuleEngine(yaml_store)
+
+        summary = await engine.evaluate_rules(
+            RuleContext(prompt_length=10), verbosity="matched"
+        )
+        assert [r.rule_name for r in summary.results] == ["broken"]
+        assert summary.results[0].action == RuleAction.DENY
+        assert summary.results[0].message.startswith("Rule evaluation error")
+        assert summary.final_action == RuleAction.ALLOW
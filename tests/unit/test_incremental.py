@@ -0,0 +1,106 @@
+import random
+
+from rule_manager.core.engine import RuleEngine
+from rule_manager.models.base import Rule, RuleSet, RuleScope, RuleAction, RuleContext
+
+RULES = [
+    Rule(
+        name="deny_long_prompts",
+        scope=RuleScope.GLOBAL,
+        priority=90,
+        action=RuleAction.DENY,
+        conditions={"length": "prompt_length > 2000"},
+    ),
+    Rule(
+        name="warn_production",
+        scope=RuleScope.GLOBAL,
+        priority=50,
+        action=RuleAction.WARN,
+        conditions={
+            "env": "environment == 'production'",
+            "tier": "custom_attributes.limits.tier != 'gold'",
+        },
+    ),
+    Rule(
+        name="deny_model",
+        scope=RuleScope.GLOBAL,
+        priority=40,
+        action=RuleAction.DENY,
+        conditions={"model": "model_name in ['legacy']", "n": "request_count > 3"},
+    ),
+]
+
+
+def make_context(rng):
+    return RuleContext(
+        session_id="s1",
+        model_name=rng.choice(["gpt-4", "legacy"]),
+        prompt_length=rng.randrange(4000),
+        custom_attributes={
+            "environment": rng.choice(["production", "dev"]),
+            "limits": {"tier": rng.choice(["gold", "silver"])},
+            "request_count": rng.choice([1, 5, "x"]),
+        },
+    )
+
+
+class TestIncrementalMatching:
+    async def test_follow_up_reevaluates_only_dependent_rules(self, yaml_store):
+        await yaml_store.save_rules(RuleSet(scope=RuleScope.GLOBAL, rules=RULES))
+        engine = RuleEngine(yaml_store, matching_mode="incremental")
+
+        context = RuleContext(
+            session_id="s1",
+            model_name="gpt-4",
+            prompt_length=100,
+            custom_attributes={"environment": "production", "limits": {"tier": "x"}},
+        )
+        first = await engine.evaluate_rules(context)
+        assert first.final_action == RuleAction.WARN
+
+        context = context.model_copy(update={"prompt_length": 3000})
+        second = await engine.evaluate_rules(context)
+        assert second.final_action == RuleAction.DENY
+        assert second.results[1] == first.results[1]
+        assert second.results[2] == first.results[2]
+
+        stats = engine.stats()["sessions"]
+        assert stats["full_evaluations"] == 1
+        assert stats["incremental_evaluations"] == 1
+        assert stats["rules_reused"] == 2
+
+        # Nested custom attributes changed in place are detected
+        context.custom_attributes["limits"]["tier"] = "gold"
+        third = await engine.evaluate_rules(context)
+        assert third.results[1].matched is False
+
+    async def test_matches_stateless_evaluation(self, yaml_store):
+        await yaml_store.save_rules(RuleSet(scope=RuleScope.GLOBAL, rules=RULES))
+        incremental = RuleEngine(yaml_store, matching_mode="incremental")
+        stateless = RuleEngine(yaml_store)
+
+        rng = random.Random(5)
+        for _ in range(50):
+            context = make_context(rng)
+            expected = await stateless.evaluate_rules(context)
+            actual = await incremental.evaluate_rules(context)
+            assert [r.matched for r in actual.results] == [
+                r.matched for r in expected.results
+            ]
+            assert [r.message for r in actual.results] == [
+                r.message for r in expected.results
+            ]
+            assert actual.final_action == expected.final_action
+
+    async def test_session_ttl(self, yaml_store):
+        await yaml_store.save_rules(RuleSet(scope=RuleScope.GLOBAL, rules=RULES))
+        engine = RuleEngine(
+            yaml_store, matching_mode="incremental", session_ttl_seconds=0.000001
+        )
+        context = make_context(random.Random(1))
+        await engine.evaluate_rules(context)
+        await engine.evaluate_rules(context)
+
+        stats = engine.stats()["sessions"]
+        assert stats["full_evaluations"] == 2
+        assert stats["sessions"]["expirations"] == 1
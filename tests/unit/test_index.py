@@ -0,0 +1,75 @@
+from rule_manager.core.compiler import ConditionCompiler
+from rule_manager.core.dsl import DSLEvaluator
+from rule_manager.core.index import DiscriminationIndex
+from rule_manager.core.ruleset import CompiledRuleset
+from rule_manager.models.base import Rule, RuleScope, RuleAction, RuleContext
+
+
+def make_rule(name, conditions):
+    return Rule(
+        name=name,
+        scope=RuleScope.PROJECT,
+        action=RuleAction.DENY,
+        conditions=conditions,
+    )
+
+
+class TestDiscriminationIndex:
+    def setup_method(self):
+        rules = [
+            make_rule("p1", {"project": "project_id == 'p1'", "env": "environment"}),
+            make_rule("p2_or_p3", {"project": "project_id in ['p2', 'p3']"}),
+            make_rule(
+                "gpt4_admin",
+                {"both": "model_name == 'gpt-4' and user_role == 'admin'"},
+            ),
+            make_rule(
+                "claude",
+                {"m": {"or": ["model_name == 'claude'", "'o1' == model_name"]}},
+            ),
+            make_rule("not_p1", {"project": "project_id != 'p1'"}),
+            make_rule("always", {}),
+        ]
+        self.ruleset = CompiledRuleset(rules, ConditionCompiler(DSLEvaluator()))
+        self.index = DiscriminationIndex(self.ruleset.rules)
+
+    def test_candidates(self):
+        assert self.index.residual == (4, 5)
+        assert list(self.index.candidates(RuleContext(project_id="p1"))) == [0, 4, 5]
+        assert list(
+            self.index.candidates(RuleContext(project_id="p3", model_name="o1"))
+        ) == [1, 3, 4, 5]
+        assert list(
+            self.index.candidates(
+                RuleContext(model_name="gpt-4", custom_attributes={"user_role": "x"})
+            )
+        ) == [2, 4, 5]
+        assert list(self.index.candidates(RuleContext())) == [4, 5]
+
+    def test_unhashable_value_keeps_indexed_rules(self):
+        ruleset = CompiledRuleset(
+            [make_rule("gold", {"tier": "tier == 'gold'"})],
+            ConditionCompiler(DSLEvaluator()),
+        )
+        index = DiscriminationIndex(ruleset.rules)
+        context = RuleContext(custom_attributes={"tier": ["gold"]})
+        assert list(index.candidates(context)) == [0]
+
+    def test_candidates_cover_all_matches(self):
+        contexts = [
+            RuleContext(
+                project_id=project,
+                model_name=model,
+                custom_attributes={"user_role": "admin", "environment": "prod"},
+            )
+            for project in ("p1", "p2", "p3", "p4", None)
+            for model in ("gpt-4", "claude", "o1", None)
+        ]
+        for context in contexts:
+            memo = self.ruleset.new_memo()
+            matching = {
+                position
+                for position, rule in enumerate(self.ruleset.rules)
+                if rule.matches(context, memo)
+            }
+            assert matching <= set(self.index.candidates(context))
@@ -0,0 +1,193 @@
+import pytest
+
+from rule_manager.core.engine import RuleEngine
+from rule_manager.core.inheritance import InheritanceGraph, resolve_inheritance
+from rule_manager.models.base import Rule, RuleAction, RuleContext, RuleScope, RuleSet
+from rule_manager.models.errors import CircularInheritanceError
+
+
+def make_rule(name, **fields):
+    fields.setdefault("scope", RuleScope.GLOBAL)
+    fields.setdefault("action", RuleAction.ALLOW)
+    return Rule(name=name, **fields)
+
+
+@pytest.fixture
+def merge(yaml_store):
+    return RuleEngine(yaml_store)._merge_rules
+
+
+def test_merges_parents_in_order(merge):
+    base = make_rule(
+        "base",
+        priority=20,
+        conditions={"a": "prompt_length > 1", "b": "prompt_length > 2"},
+        parameters={"limit": 1},
+    )
+    mixin = make_rule("mixin", conditions={"c": "user_id == 'x'"})
+    child = make_rule(
+        "child",
+        parent_rule="base",
+        inherits_from=["mixin", "missing"],
+        conditions={"b": "prompt_length > 3"},
+        parameters={"extra": True},
+    )
+
+    resolved = resolve_inheritance([child, base, mixin], merge)
+
+    assert [r.name for r in resolved] == ["child", "base", "mixin"]
+    merged = resolved[0]
+    assert merged.conditions == {
+        "a": "prompt_length > 1",
+        "b": "prompt_length > 3",
+        "c": "user_id == 'x'",
+    }
+    assert merged.parameters == {"limit": 1, "extra": True}
+    assert merged.priority == 20
+    # Inputs are left untouched and rules without parents are reused as is
+    assert base.conditions == {"a": "prompt_length > 1", "b": "prompt_length > 2"}
+    assert child.conditions == {"b": "prompt_length > 3"}
+    assert resolved[1] is base
+
+
+def test_shared_ancestors_are_resolved_once(merge):
+    calls = []
+
+    def counting_merge(base, derived):
+        calls.append((base.name, derived.name))
+        return merge(base, derived)
+
+    rules = [make_rule("root", conditions={"r": "user_id == 'r'"})]
+    rules.append(make_rule("middle", parent_rule="root"))
+    rules += [make_rule(f"leaf_{i}", parent_rule="middle") for i in range(10)]
+
+    resolved = resolve_inheritance(rules, counting_merge)
+
+    assert len(calls) == 11
+    assert all(r.conditions == {"r": "user_id == 'r'"} for r in resolved)
+    # Unchanged structures are shared rather than copied
+    assert resolved[2].conditions is resolved[1].conditions
+
+
+def test_deep_hierarchies(merge):
+    rules = [make_rule("r0", conditions={"c0": "prompt_length > 0"})]
+    rules += [
+        make_rule(f"r{i}", parent_rule=f"r{i - 1}", conditions={f"c{i}": "true"})
+        for i in range(1, 3000)
+    ]
+
+    resolved = resolve_inheritance(rules, merge)
+
+    assert len(resolved[-1].conditions) == 3000
+
+
+def test_cycles_report_the_full_chain():
+    rules = [
+        make_rule("a", parent_rule="b"),
+        make_rule("b", inherits_from=["c"]),
+        make_rule("c", parent_rule="a"),
+        make_rule("d", parent_rule="a"),
+    ]
+
+    with pytest.raises(CircularInheritanceError) as exc_info:
+        InheritanceGraph(rules).order()
+
+    assert exc_info.value.code == "E002"
+    assert "a -> b -> c -> a" in exc_info.value.message
+
+
+def test_order_puts_ancestors_first():
+    rules = [
+        make_rule("child", inherits_from=["left", "right"]),
+        make_rule("left", parent_rule="root"),
+        make_rule("right", parent_rule="root"),
+        make_rule("root"),
+    ]
+
+    order = InheritanceGraph(rules).order()
+
+    assert order.index("root") < order.index("left") < order.index("child")
+    assert order.index("right") < order.index("child")
+
+
+async def test_engine_resolves_inheritance_once_per_snapshot(yaml_store):
+    ruleset = RuleSet(
+        scope=RuleScope.GLOBAL,
+        rules=[
+            make_rule(
+                "deny_long",
+                action=RuleAction.DENY,
+                priority=80,
+                conditions={"length": "prompt_length > 100"},
+            ),
+            make_rule(
+                "deny_long_for_guests",
+                action=RuleAction.DENY,
+                priority=90,
+                parent_rule="deny_long",
+                conditions={"role": "user_role == 'guest'"},
+            ),
+        ],
+    )
+    await yaml_store.save_rules(ruleset)
+    engine = RuleEngine(yaml_store)
+
+    guest = RuleContext(prompt_length=500, custom_attributes={"user_role": "guest"})
+    short = RuleContext(prompt_length=50, custom_attributes={"user_role": "guest"})
+
+    assert (await engine.evaluate_rules(guest)).final_action == RuleAction.DENY
+    assert (await engine.evaluate_rules(short)).final_action == RuleAction.ALLOW
+    assert engine.stats()["snapshot"]["builds"] == 1
+
+
+def test_memo_reresolves_changed_rules_and_descendants(merge):
+    base = make_rule("base", conditions={"a": "prompt_length > 1"})
+    child = make_rule("child", parent_rule="base")
+    other = make_rule("other", parent_rule="unrelated")
+    unrelated = make_rule("unrelated", conditions={"b": "user_id == 'x'"})
+    memo = {}
+    first = resolve_inheritance([base, child, other, unrelated], merge, memo)
+
+    # Reloaded rules are equal but distinct objects
+    reloaded = [r.model_copy() for r in (child, other, unrelated)]
+    changed_base = make_rule("base", conditions={"a": "prompt_length > 5"})
+    second = resolve_inheritance([changed_base] + reloaded, merge, memo)
+
+    assert second[0] is changed_base
+    assert second[1] is not first[1]
+    assert second[1].conditions == {"a": "prompt_length > 5"}
+    assert second[2] is first[2]
+    assert second[3] is first[3]
+    assert set(memo) == {"base", "child", "other", "unrelated"}
+
+
+def test_memo_reresolves_children_of_removed_parent(merge):
+    parent = make_rule("p", conditions={"env": "environment == 'prod'"})
+    child = make_rule("c", parent_rule="p", priority=90)
+    memo = {}
+    first = resolve_inheritance([parent, child], merge, memo)
+    assert first[1].conditions == {"env": "environment == 'prod'"}
+
+    # The parent is deleted; the child no longer inherits its conditions
+    second = resolve_inheritance([child.model_copy()], merge, memo)
+    assert second[0].conditions == {}
+
+
+async def test_engine_picks_up_deleted_parent(yaml_store):
+    await yaml_store.save_rules(
+        RuleSet(
+            scope=RuleScope.GLOBAL,
+            rules=[
+                make_rule("p", conditions={"env": "environment == 'prod'"}),
+                make_rule("c", parent_rule="p", priority=90, action=RuleAction.DENY),
+            ],
+        )
+    )
+    engine = RuleEngine(yaml_store)
+    context = RuleContext(custom_attributes={"environment": "dev"})
+    assert (await engine.evaluate_rules(context)).final_action == RuleAction.ALLOW
+
+    await yaml_store.delete_rule("p", RuleScope.GLOBAL)
+    summary = await engine.evaluate_rules(context)
+    assert summary.final_action == RuleAction.DENY
+    assert summary.results[0].matched is True
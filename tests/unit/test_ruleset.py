@@ -0,0 +1,126 @@
+import pytest
+
+from rule_manager.core.compiler import ConditionCompiler
+from rule_manager.core.dsl import DSLEvaluator
+from rule_manager.core.ruleset import CompiledRuleset
+from rule_manager.models.base import Rule, RuleScope, RuleAction, RuleContext
+from rule_manager.models.errors import RuleDSLSyntaxError
+
+
+def make_rule(name, scope, conditions):
+    return Rule(name=name, scope=scope, action=RuleAction.ALLOW, conditions=conditions)
+
+
+class TestCompiledRuleset:
+    def setup_method(self):
+        self.rules = [
+            make_rule(
+                "global_prod",
+                RuleScope.GLOBAL,
+                {"env": "environment == 'production'", "len": "prompt_length > 10"},
+            ),
+            make_rule(
+                "project_prod",
+                RuleScope.PROJECT,
+                {"env": 'environment == "production"', "role": "user_role == 'admin'"},
+            ),
+            make_rule(
+                "user_admin",
+                RuleScope.INDIVIDUAL,
+                {"any": {"or": ["user_role == 'admin'", "prompt_length > 10"]}},
+            ),
+            make_rule("always", RuleScope.GLOBAL, {}),
+        ]
+        self.context = RuleContext(
+            prompt_length=100,
+            custom_attributes={"environment": "production", "user_role": "admin"},
+        )
+
+    @pytest.mark.parametrize("mode", ["interpreter", "codegen"])
+    def test_predicates_shared_across_scopes(self, mode):
+        compiler = ConditionCompiler(DSLEvaluator(), mode=mode)
+        ruleset = CompiledRuleset(self.rules, compiler)
+
+        assert ruleset.stats() == {
+            "rules": 4,
+            "predicate_references": 6,
+            "distinct_predicates": 3,
+            "compiled_rules": 4,
+        }
+        assert ruleset.rules[0].slots[0] == ruleset.rules[1].slots[0]
+
+        memo = ruleset.new_memo()
+        assert [rule.matches(self.context, memo) for rule in ruleset.rules] == [
+            True,
+            True,
+            True,
+            True,
+        ]
+        assert memo == [True, True, True]
+
+    @pytest.mark.parametrize("mode", ["interpreter", "codegen"])
+    def test_memoized_predicate_reused(self, mode):
+        compiler = ConditionCompiler(DSLEvaluator(), mode=mode)
+        ruleset = CompiledRuleset(self.rules, compiler)
+
+        # A memo entry is trusted without re-evaluating the predicate
+        memo = ruleset.new_memo()
+        memo[ruleset.rules[0].slots[0]] = False
+        assert ruleset.rules[1].matches(self.context, memo) is False
+
+    @pytest.mark.parametrize("mode", ["interpreter", "codegen"])
+    def test_predicate_errors_are_memoized(self, mode):
+        compiler = ConditionCompiler(DSLEvaluator(), mode=mode)
+        rules = [
+            make_rule("a", RuleScope.GLOBAL, {"len": "prompt_length > 10"}),
+            make_rule("b", RuleScope.PROJECT, {"len": "prompt_length > 10"}),
+        ]
+        ruleset = CompiledRuleset(rules, compiler)
+
+        memo = ruleset.new_memo()
+        for rule in ruleset.rules:
+            with pytest.raises(RuleDSLSyntaxError, match="Error in comparison"):
+                rule.matches(RuleContext(), memo)
+
+    def test_unchanged_rules_carried_over(self):
+        compiler = ConditionCompiler(DSLEvaluator())
+        previous = CompiledRuleset(self.rules, compiler)
+
+        changed = make_rule(
+            "user_admin", RuleScope.INDIVIDUAL, {"len": "prompt_length > 50"}
+        )
+        rules = [self.rules[0], self.rules[1], changed, self.rules[3]]
+        ruleset = CompiledRuleset(rules, compiler, previous=previous)
+
+        assert ruleset.compiled_rules == 1
+        assert ruleset.rules[0] is previous.rules[0]
+        assert ruleset.rules[2] is not previous.rules[2]
+        # The previous ruleset's table is not modified
+        assert len(previous.predicates) == 3
+        assert ruleset.stats()["distinct_predicates"] == 4
+
+        memo = ruleset.new_memo()
+        assert [rule.matches(self.context, memo) for rule in ruleset.rules] == [
+            True,
+            True,
+            True,
+            True,
+        ]
+
+    def test_unused_predicates_compacted(self):
+        compiler = ConditionCompiler(DSLEvaluator())
+        ruleset = CompiledRuleset(self.rules, compiler)
+
+        # Replacing every condition leaves most of the table unused; the
+        # next build starts from an empty table
+        rules = [
+            make_rule(rule.name, rule.scope, {"len": "prompt_length > 20"})
+            for rule in self.rules
+        ]
+        ruleset = CompiledRuleset(rules, compiler, previous=ruleset)
+        assert len(ruleset.predicates) == 4
+        assert ruleset.live_predicates == 1
+
+        ruleset = CompiledRuleset(rules, compiler, previous=ruleset)
+        assert ruleset.compiled_rules == 4
+        assert len(ruleset.predicates) == 1
@@ -0,0 +1,151 @@
+import pytest
+
+from rule_manager.core.compiler import ConditionCompiler
+from rule_manager.core.dsl import DSLEvaluator
+from rule_manager.core.ruleset import CompiledRuleset
+from rule_manager.core.selectivity import SelectivityTracker
+from rule_manager.models.base import Rule, RuleScope, RuleAction, RuleContext
+
+
+def make_rule(name, conditions):
+    return Rule(
+        name=name, scope=RuleScope.GLOBAL, action=RuleAction.DENY, conditions=conditions
+    )
+
+
+def evaluate(ruleset, context, tracker=None):
+    memo = tracker.new_memo(ruleset) if tracker else ruleset.new_memo()
+    matched = [rule.matches(context, memo) for rule in ruleset.rules]
+    return matched, memo
+
+
+class TestSelectivityTracker:
+    def setup_method(self):
+        # "rare" almost never holds, so it should be tested first
+        self.rule = make_rule(
+            "guarded",
+            {
+                "common": "prompt_length > 0",
+                "pattern": "user_id matches 'user_[0-9]+'",
+                "rare": "environment == 'production'",
+            },
+        )
+        self.context = RuleContext(
+            user_id="user_1",
+            prompt_length=10,
+            custom_attributes={"environment": "development"},
+        )
+
+    @pytest.mark.parametrize("mode", ["interpreter", "codegen"])
+    def test_compile_with_order(self, mode):
+        compiler = ConditionCompiler(DSLEvaluator(), mode=mode)
+        conditions = compiler.compile(self.rule.conditions, order=["rare"])
+
+        assert conditions.order == ("rare", "common", "pattern")
+        assert conditions.evaluate(self.context) is False
+
+        # Only the first conjunct is evaluated once it fails
+        memo = [None] * len(conditions.atoms)
+        conditions.evaluate(self.context, memo)
+        assert sum(value is not None for value in memo) == 1
+
+    def test_adaptive_reorders_selective_conjunct_first(self):
+        compiler = ConditionCompiler(DSLEvaluator())
+        tracker = SelectivityTracker(
+            mode="adaptive", sample_rate=1, reorder_interval=25, min_samples=5
+        )
+
+        for _ in range(25):
+            ruleset = CompiledRuleset([self.rule], compiler, tracker.order_for)
+            matched, memo = evaluate(ruleset, self.context, tracker)
+            assert matched == [False]
+            tracker.observe(ruleset, memo)
+
+        assert tracker.order_for(self.rule)[0] == "rare"
+        stats = tracker.stats()
+        assert stats["reorders"] == 1
+        assert stats["last_reorder"]["rules_reordered"] == 1
+        assert stats["last_reorder"]["estimated_savings"] > 0
+
+        ruleset = CompiledRuleset([self.rule], compiler, tracker.order_for)
+        matched, memo = evaluate(ruleset, self.context)
+        assert matched == [False]
+        assert sum(value is not None for value in memo) == 1
+
+    def test_declared_mode_keeps_order(self):
+        compiler = ConditionCompiler(DSLEvaluator())
+        tracker = SelectivityTracker(sample_rate=1, reorder_interval=1, min_samples=1)
+
+        ruleset = CompiledRuleset([self.rule], compiler, tracker.order_for)
+        for _ in range(10):
+            _, memo = evaluate(ruleset, self.context, tracker)
+            tracker.observe(ruleset, memo)
+
+        assert tracker.order_for(self.rule) is None
+        assert tracker.stats()["sampled_evaluations"] == 10
+        assert tracker.stats()["avg_predicates_evaluated"] == 3
+
+    def test_declared_mode_does_not_sample_by_default(self):
+        compiler = ConditionCompiler(DSLEvaluator())
+        ruleset = CompiledRuleset([self.rule], compiler)
+
+        for mode, sampled in (("declared", 0), ("adaptive", 1)):
+            tracker = SelectivityTracker(mode=mode)
+            for _ in range(100):
+                _, memo = evaluate(ruleset, self.context, tracker)
+                tracker.observe(ruleset, memo)
+            assert tracker.stats()["sampled_evaluations"] == sampled
+
+    def test_samples_only_computed_predicates(self):
+        compiler = ConditionCompiler(DSLEvaluator())
+        tracker = SelectivityTracker(sample_rate=1, pinned_orders={"guarded": ["rare"]})
+
+        ruleset = CompiledRuleset([self.rule], compiler, tracker.order_for)
+        _, memo = evaluate(ruleset, self.context, tracker)
+        tracker.observe(ruleset, memo)
+
+        assert len(tracker.predicates) == 1
+        assert "environment" in next(iter(tracker.predicates))
+        assert tracker.stats()["avg_predicates_evaluated"] == 1
+
+    def test_samples_without_evaluating_again(self):
+        compiler = ConditionCompiler(DSLEvaluator())
+        tracker = SelectivityTracker(sample_rate=2)
+        ruleset = CompiledRuleset([self.rule], compiler)
+
+        memos = []
+        for _ in range(2):
+            _, memo = evaluate(ruleset, self.context, tracker)
+            memos.append(memo)
+            # Sampling reads the timings recorded by the evaluation itself
+            ruleset.predicates.functions = []
+            tracker.observe(ruleset, memo)
+
+        assert [memo.__class__ is list for memo in memos] == [True, False]
+        assert tracker.stats()["sampled_evaluations"] == 1
+        stats = tracker.predicates
+        assert len(stats) == 3
+        assert all(s.samples == 1 and s.total_cost_ns > 0 for s in stats.values())
+        assert sum(s.false_count for s in stats.values()) == 1
+
+    def test_pinned_order_takes_precedence(self):
+        compiler = ConditionCompiler(DSLEvaluator())
+        tracker = SelectivityTracker(
+            mode="adaptive",
+            sample_rate=1,
+            reorder_interval=5,
+            min_samples=1,
+            pinned_orders={"guarded": ["pattern"]},
+        )
+
+        for _ in range(5):
+            ruleset = CompiledRuleset([self.rule], compiler, tracker.order_for)
+            _, memo = evaluate(ruleset, self.context, tracker)
+            tracker.observe(ruleset, memo)
+
+        assert ruleset.rules[0].conditions.order == ("pattern", "common", "rare")
+        assert tracker.stats()["orders"] == {"guarded": ["pattern"]}
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError, match="Unknown condition ordering"):
+            SelectivityTracker(mode="random")
@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip("fastmcp")
+
+from fastmcp import Client
+
+from rule_manager.models.settings import ServerSettings
+from rule_manager.server import RuleManagerServer
+
+
+async def test_shutdown_stops_worker_processes(populated_store, temp_rules_dir):
+    server = RuleManagerServer(
+        ServerSettings(rules_dir=temp_rules_dir, evaluation_workers=1)
+    )
+    workers = server.rule_engine.workers
+
+    async with Client(server.mcp) as client:
+        result = await client.call_tool(
+            "evaluate_rules",
+            {"request": {"context": {"custom_attributes": {"user_role": "admin"}}}},
+        )
+        assert result.data["final_action"] == "allow"
+        assert workers._pool is not None
+
+    assert workers._pool is None
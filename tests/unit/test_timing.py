@@ -0,0 +1,63 @@
+import pytest
+
+from rule_manager.core.engine import RuleEngine
+from rule_manager.core.timing import EvaluationTimings, LatencyHistogram
+from rule_manager.models.base import RuleAction
+
+
+def test_histogram_percentiles_are_bucket_bounds():
+    histogram = LatencyHistogram()
+    for elapsed_ns in [100] * 90 + [5000] * 9 + [70000]:
+        histogram.record(elapsed_ns)
+
+    assert histogram.percentile(0.5) == 128
+    assert histogram.percentile(0.9) == 128
+    assert histogram.percentile(0.99) == 8192
+    assert histogram.percentile(1.0) == 70000
+    stats = histogram.stats()
+    assert stats["count"] == 100
+    assert stats["max_us"] == 70.0
+    assert LatencyHistogram().stats()["p50_us"] is None
+
+
+def test_unknown_timing_mode():
+    with pytest.raises(ValueError):
+        EvaluationTimings("sometimes")
+
+
+async def test_timing_off(populated_store, sample_context):
+    engine = RuleEngine(populated_store, timing_mode="off")
+
+    summary = await engine.evaluate_rules(sample_context)
+    decision = await engine.evaluate_decision(sample_context)
+
+    assert summary.total_execution_time_ms is None
+    assert decision.total_execution_time_ms is None
+    assert engine.stats()["timing"] == {"mode": "off"}
+
+
+async def test_timing_per_request(populated_store, sample_context):
+    engine = RuleEngine(populated_store)
+
+    summary = await engine.evaluate_rules(sample_context)
+
+    assert summary.total_execution_time_ms > 0
+    stats = engine.stats()["timing"]
+    assert stats["requests"]["count"] == 1
+    assert "slowest_rules" not in stats
+
+
+async def test_timing_per_rule(populated_store, sample_context):
+    engine = RuleEngine(populated_store, timing_mode="rule")
+
+    await engine.evaluate_rules(sample_context)
+    decision = await engine.evaluate_decision(sample_context)
+
+    assert decision.final_action == RuleAction.ALLOW
+    stats = engine.stats()["timing"]
+    assert stats["requests"]["count"] == 2
+    assert stats["rules_timed"] == 3
+    # The decision stopped at the first rule
+    rules = stats["slowest_rules"]
+    assert rules["allow_admins"]["count"] == 2
+    assert rules["rate_limit"]["count"] == 1
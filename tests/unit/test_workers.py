@@ -0,0 +1,100 @@
+import pytest
+
+from rule_manager.core.engine import RuleEngine
+from rule_manager.models.base import Rule, RuleSet, RuleScope, RuleAction, RuleContext
+
+
+@pytest.fixture
+async def pool_engine(populated_store):
+    engine = RuleEngine(populated_store, evaluation_workers=2, worker_batch_size=8)
+    yield engine
+    engine.close()
+
+
+async def test_matches_in_process_evaluation(
+    pool_engine, populated_store, sample_context
+):
+    local = await RuleEngine(populated_store).evaluate_rules(sample_context)
+    remote = await pool_engine.evaluate_rules(sample_context)
+
+    assert remote.context is sample_context
+    assert remote.final_action == local.final_action
+    assert [(r.rule_name, r.matched) for r in remote.results] == [
+        (r.rule_name, r.matched) for r in local.results
+    ]
+
+    decision = await pool_engine.evaluate_decision(sample_context)
+    assert decision.deciding_rule.rule_name == "allow_admins"
+
+
+async def test_batches_requests(pool_engine):
+    contexts = [
+        RuleContext(custom_attributes={"user_role": "user", "request_count": n})
+        for n in range(0, 400, 20)
+    ]
+    results = await pool_engine.evaluate_rules_batch(contexts)
+
+    assert [r.final_action for r in results] == [
+        RuleAction.DENY if n > 100 else RuleAction.ALLOW for n in range(0, 400, 20)
+    ]
+    stats = pool_engine.stats()["workers"]
+    assert stats["requests"] == len(contexts)
+    assert stats["batches"] < len(contexts)
+
+
+async def test_workers_follow_rule_changes(
+    pool_engine, populated_store, sample_context
+):
+    assert (await pool_engine.evaluate_rules(sample_context)).final_action == (
+        RuleAction.ALLOW
+    )
+
+    ruleset = RuleSet(
+        scope=RuleScope.GLOBAL,
+        rules=[
+            Rule(
+                name="deny_all",
+                scope=RuleScope.GLOBAL,
+                priority=100,
+                action=RuleAction.DENY,
+                conditions={"always": "true"},
+            )
+        ],
+    )
+    await populated_store.save_rules(ruleset)
+
+    summary = await pool_engine.evaluate_rules(sample_context)
+    assert summary.final_action == RuleAction.DENY
+
+
+async def test_workers_hold_tenant_snapshots(
+    pool_engine, populated_store, sample_context
+):
+    await populated_store.add_rule(
+        Rule(
+            name="block_project",
+            scope=RuleScope.PROJECT,
+            tenant="test_project",
+            priority=100,
+            action=RuleAction.DENY,
+        )
+    )
+    other = sample_context.model_copy(update={"project_id": "other"})
+    contexts = [sample_context, other] * 20
+
+    for _ in range(2):
+        results = await pool_engine.evaluate_rules_batch(contexts)
+        assert [r.final_action for r in results] == [
+            RuleAction.DENY,
+            RuleAction.ALLOW,
+        ] * 20
+
+    # Batches are grouped by snapshot and workers keep both snapshots
+    stats = pool_engine.stats()["workers"]
+    assert stats["batches"] <= 2 * 2 * 3
+    assert stats["resyncs"] < stats["batches"]
+
+
+def test_incremental_matching_is_rejected(yaml_store):
+    with pytest.raises(ValueError):
+        RuleEngine(yaml_store, matching_mode="incremental", evaluation_workers=2)
@@ -1,3 +1,5 @@
+import datetime
+import json
 import pytest
 import tempfile
 import shutil
@@ -5,7 +7,7 @@ from pathlib import Path
 
 from rule_manager.storage.yaml_store import YAMLRuleStore
 from rule_manager.models.base import Rule, RuleSet, RuleScope, RuleAction
-from rule_manager.models.errors import RuleNotFoundError
+from rule_manager.models.errors import RuleNotFoundError, UnexpectedError
 
 
 class TestYAMLRuleStore:
@@ -258,6 +260,138 @@ class TestYAMLRuleStore:
         assert rules[0].name == "backup_test"
         assert rules[0].description == "Test rule for backup"
 
+    async def test_generation_changes_on_write(self):
+        initial = await self.store.generation()
+        assert await self.store.generation() == initial
+
+        await self.store.add_rule(
+            Rule(name="gen_test", scope=RuleScope.GLOBAL, action=RuleAction.ALLOW)
+        )
+        saved = await self.store.generation()
+        assert saved != initial
+
+        # Edits made outside the store are detected too
+        path = Path(self.temp_dir) / "project.yaml"
+        path.write_text("scope: project\nrules: []\n")
+        assert await self.store.generation() != saved
+
+    async def test_tenant_partitions(self):
+        shared = Rule(name="shared", scope=RuleScope.PROJECT, action=RuleAction.ALLOW)
+        tenant_rule = Rule(
+            name="mine",
+            scope=RuleScope.PROJECT,
+            tenant="team/a",
+            action=RuleAction.DENY,
+        )
+        await self.store.add_rule(shared)
+        await self.store.add_rule(tenant_rule)
+
+        # Each tenant's rules live in their own file
+        assert (Path(self.temp_dir) / "project" / "team%2Fa.yaml").exists()
+        shared_rules = await self.store.load_rules(RuleScope.PROJECT)
+        assert [r.name for r in shared_rules.rules] == ["shared"]
+        partition = await self.store.load_rules(RuleScope.PROJECT, "team/a")
+        assert [r.name for r in partition.rules] == ["mine"]
+        assert (await self.store.load_rules(RuleScope.PROJECT, "b")).rules == []
+
+        # Queries without a tenant read the shared files only
+        assert [r.name for r in await self.store.list_rules()] == ["shared"]
+        assert [r.name for r in await self.store.list_rules(tenant="team/a")] == [
+            "mine"
+        ]
+        assert await self.store.get_rule("mine") is None
+        assert (await self.store.get_rule("mine", tenant="team/a")).tenant == "team/a"
+
+        # A partition write changes its own generation only
+        shared_generation = await self.store.generation()
+        partition_generation = await self.store.partition_generation(
+            RuleScope.PROJECT, "team/a"
+        )
+        await self.store.delete_rule("mine", RuleScope.PROJECT, "team/a")
+        assert await self.store.generation() == shared_generation
+        assert (
+            await self.store.partition_generation(RuleScope.PROJECT, "team/a")
+            != partition_generation
+        )
+
+    async def test_global_rules_cannot_have_a_tenant(self):
+        with pytest.raises(UnexpectedError):
+            await self.store.add_rule(
+                Rule(
+                    name="global",
+                    scope=RuleScope.GLOBAL,
+                    tenant="a",
+                    action=RuleAction.ALLOW,
+                )
+            )
+
+    async def test_parsed_rules_cached_until_file_changes(self):
+        await self.store.add_rule(
+            Rule(name="cached", scope=RuleScope.GLOBAL, action=RuleAction.ALLOW)
+        )
+        # The write put the parsed ruleset in the cache
+        first = await self.store.load_rules(RuleScope.GLOBAL)
+        second = await self.store.load_rules(RuleScope.GLOBAL)
+        assert second.rules[0] is first.rules[0]
+        assert self.store.cache_stats()["misses"] == 1  # by add_rule
+
+        # Loaded rulesets can be changed without affecting the cache
+        first.rules.clear()
+        assert len((await self.store.load_rules(RuleScope.GLOBAL)).rules) == 1
+
+        # Edits made outside the store are picked up
+        path = Path(self.temp_dir) / "global.yaml"
+        path.write_text(
+            "scope: global\n"
+            "rules:\n"
+            "- {name: edited, scope: global, action: deny}\n"
+        )
+        rules = (await self.store.load_rules(RuleScope.GLOBAL)).rules
+        assert [r.name for r in rules] == ["edited"]
+
+        path.unlink()
+        assert (await self.store.load_rules(RuleScope.GLOBAL)).rules == []
+
+    async def test_sidecar_snapshot_used_while_yaml_unchanged(self):
+        await self.store.add_rule(
+            Rule(name="original", scope=RuleScope.GLOBAL, action=RuleAction.ALLOW)
+        )
+        sidecar_path = Path(self.temp_dir) / ".global.yaml.json"
+        sidecar = json.loads(sidecar_path.read_text())
+
+        # A store with an empty cache reads the sidecar, not the YAML
+        sidecar["content"]["rules"][0]["name"] = "from_sidecar"
+        sidecar_path.write_text(json.dumps(sidecar))
+        rules = await YAMLRuleStore(self.temp_dir).list_rules(RuleScope.GLOBAL)
+        assert [r.name for r in rules] == ["from_sidecar"]
+
+        # Once the YAML changes, it is parsed and the sidecar replaced
+        path = Path(self.temp_dir) / "global.yaml"
+        path.write_text(path.read_text().replace("original", "edited"))
+        rules = await YAMLRuleStore(self.temp_dir).list_rules(RuleScope.GLOBAL)
+        assert [r.name for r in rules] == ["edited"]
+        assert (
+            json.loads(sidecar_path.read_text())["content"]["rules"][0]["name"]
+            == "edited"
+        )
+
+    async def test_no_sidecar_for_content_json_cannot_represent(self):
+        path = Path(self.temp_dir) / "global.yaml"
+        path.write_text(
+            "scope: global\n"
+            "rules:\n"
+            "- {name: dated, scope: global, action: allow,"
+            " parameters: {since: 2024-01-01, levels: {1: one}}}\n"
+        )
+
+        rules = await self.store.list_rules(RuleScope.GLOBAL)
+
+        assert rules[0].parameters == {
+            "since": datetime.date(2024, 1, 1),
+            "levels": {1: "one"},
+        }
+        assert not (Path(self.temp_dir) / ".global.yaml.json").exists()
+
     async def test_health_check(self):
         # Health check should pass for accessible directory
         healthy = await self.store.health_check()